@@ -0,0 +1,357 @@
+"""静态资源缓存模块
+
+通过 Playwright 路由在所有浏览器上下文之间共享带指纹的静态资源
+（如 Discourse 的 JS/CSS 包、SPA 的 /assets/index-<hash>.js）。
+资源按内容哈希存储在磁盘上，按总大小做 LRU 淘汰。
+
+多个进程可以共用同一个缓存目录：写回索引时在文件锁内重新读取磁盘上的索引，
+与本进程的新增、访问和删除合并后再写入，随后按合并后的索引淘汰，并清理不再被引用的资源文件。
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from playwright.async_api import BrowserContext, Route
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 上没有 fcntl，写回时不加锁（仍会先合并磁盘上的索引）
+    fcntl = None
+
+# 带指纹（内容哈希）的静态资源 URL 特征，这类资源内容不会变化
+FINGERPRINT_PATTERNS = [
+    re.compile(r'[-_.][0-9a-f]{8,}\.(?:js|mjs|css|woff2?|ttf|otf|svg|png|jpe?g|gif|webp)(?:$|\?)', re.IGNORECASE),
+    re.compile(r'/assets/[^?]*-[0-9a-f]{16,}'),
+    re.compile(r'/theme-javascripts/[0-9a-f]{16,}\.js'),
+    re.compile(r'/stylesheets/[^/?]+_[0-9a-f]{16,}\.css'),
+    re.compile(r'/_next/static/'),
+    re.compile(r'[?&]v=[0-9a-f]{8,}'),
+]
+
+# 默认缓存的资源类型
+DEFAULT_CACHE_TYPES = ['script', 'stylesheet', 'font', 'image']
+
+# 缓存命中时回放的响应头（响应体已解压，不能保留编码和长度相关的头）
+REPLAY_HEADERS = {
+    'content-type',
+    'cache-control',
+    'access-control-allow-origin',
+    'timing-allow-origin',
+    'last-modified',
+    'etag',
+}
+
+# 未被索引引用的资源文件保留时间（秒）：其他进程可能刚写入文件、尚未写回索引
+ORPHAN_GRACE_SECONDS = 600
+
+
+class AssetCache:
+    """内容寻址的静态资源磁盘缓存"""
+
+    def __init__(
+        self,
+        cache_dir: str = "storage/asset_cache",
+        max_size_mb: float = 200,
+        resource_types: Optional[List[str]] = None,
+        extra_url_patterns: Optional[List[str]] = None
+    ):
+        """
+        初始化资源缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_size_mb: 缓存总大小上限（MB）
+            resource_types: 缓存的资源类型
+            extra_url_patterns: 额外视为不可变资源的 URL 正则
+        """
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / 'blobs'
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.resource_types = set(resource_types or DEFAULT_CACHE_TYPES)
+        self.url_patterns = FINGERPRINT_PATTERNS + [re.compile(p) for p in (extra_url_patterns or [])]
+
+        # url -> {hash, size, headers, last_access}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        # 本进程删除的条目 url -> hash（合并磁盘索引时同样删除）
+        self._removed: Dict[str, str] = {}
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['AssetCache']:
+        """
+        从配置字典创建缓存
+
+        Args:
+            config: browser.asset_cache 配置节
+
+        Returns:
+            资源缓存，未配置或未启用时返回 None
+        """
+        if not config or not config.get('enabled', True):
+            return None
+
+        return cls(
+            cache_dir=config.get('dir', 'storage/asset_cache'),
+            max_size_mb=config.get('max_size_mb', 200),
+            resource_types=config.get('resource_types'),
+            extra_url_patterns=config.get('url_patterns')
+        )
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        """读取磁盘上的索引，丢弃对应文件已不存在的条目"""
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        return {
+            url: entry for url, entry in entries.items()
+            if self._blob_path(entry['hash']).exists()
+        }
+
+    def _load_index(self):
+        """加载缓存索引"""
+        self.entries = self._read_index()
+
+    @contextmanager
+    def _index_lock(self):
+        """跨进程的索引文件锁（没有 fcntl 时不加锁）"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / 'index.lock', 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _merge_index(self, disk_entries: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        合并磁盘上的索引与本进程的索引
+
+        其他进程新增的条目保留，本进程删除的条目删除（对方已换成其他内容的除外），
+        同一 URL 保留最近访问的条目
+        """
+        merged = dict(disk_entries)
+        for url, content_hash in self._removed.items():
+            if url in merged and merged[url]['hash'] == content_hash:
+                del merged[url]
+        for url, entry in self.entries.items():
+            existing = merged.get(url)
+            if existing is None or existing['last_access'] <= entry['last_access']:
+                merged[url] = entry
+        return merged
+
+    def flush(self):
+        """
+        将索引原子地写回磁盘
+
+        在文件锁内与磁盘上的索引合并，按合并后的索引淘汰超出大小上限的条目，并清理不再被引用的资源文件
+        """
+        if not self._dirty:
+            return
+        with self._index_lock():
+            self.entries = self._merge_index(self._read_index())
+            self._evict()
+            tmp_file = self.index_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.index_file)
+            self._sweep_orphans()
+        self._removed.clear()
+        self._dirty = False
+
+    def _blob_path(self, content_hash: str) -> Path:
+        """内容哈希对应的文件路径"""
+        return self.blob_dir / content_hash[:2] / content_hash
+
+    def is_cacheable(self, url: str, resource_type: str, method: str = 'GET') -> bool:
+        """
+        判断请求是否可使用缓存
+
+        Args:
+            url: 请求 URL
+            resource_type: 资源类型
+            method: 请求方法
+
+        Returns:
+            是否可缓存
+        """
+        if method != 'GET' or resource_type not in self.resource_types:
+            return False
+        return any(pattern.search(url) for pattern in self.url_patterns)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的资源
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            包含 body 和 headers 的字典，未命中返回 None
+        """
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+
+        try:
+            body = self._blob_path(entry['hash']).read_bytes()
+        except OSError:
+            del self.entries[url]
+            self._removed[url] = entry['hash']
+            self._dirty = True
+            return None
+
+        entry['last_access'] = time.time()
+        self._dirty = True
+        return {'body': body, 'headers': entry['headers']}
+
+    def put(self, url: str, body: bytes, headers: Dict[str, str]):
+        """
+        写入资源（相同内容只存一份）
+
+        Args:
+            url: 请求 URL
+            body: 响应体
+            headers: 响应头
+        """
+        if len(body) > self.max_size:
+            return
+
+        content_hash = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(content_hash)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, blob_path)
+
+        self.entries[url] = {
+            'hash': content_hash,
+            'size': len(body),
+            'headers': {k: v for k, v in headers.items() if k.lower() in REPLAY_HEADERS},
+            'last_access': time.time()
+        }
+        self.stores += 1
+        self._dirty = True
+
+    def _total_size(self) -> int:
+        """缓存文件总大小（同一内容只计一次）"""
+        sizes = {entry['hash']: entry['size'] for entry in self.entries.values()}
+        return sum(sizes.values())
+
+    def _evict(self):
+        """超出大小上限时按最近访问时间淘汰（在 flush 中按合并后的索引执行）"""
+        total_size = self._total_size()
+        if total_size <= self.max_size:
+            return
+
+        references = Counter(entry['hash'] for entry in self.entries.values())
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_access']):
+            if total_size <= self.max_size:
+                break
+            del self.entries[url]
+            self.evictions += 1
+            # 没有其他 URL 引用同一内容时才删除文件
+            references[entry['hash']] -= 1
+            if references[entry['hash']] == 0:
+                self._blob_path(entry['hash']).unlink(missing_ok=True)
+                total_size -= entry['size']
+
+    def _sweep_orphans(self):
+        """删除索引中没有引用的资源文件和残留的临时文件（只删除超过 ORPHAN_GRACE_SECONDS 未修改的文件）"""
+        if not self.blob_dir.exists():
+            return
+        referenced = {entry['hash'] for entry in self.entries.values()}
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for path in self.blob_dir.glob('*/*'):
+            if path.name in referenced:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    async def handle_route(self, route: Route):
+        """
+        路由处理：命中时从磁盘返回，未命中时下载并写入缓存
+
+        Args:
+            route: Playwright 路由
+        """
+        request = route.request
+        if not self.is_cacheable(request.url, request.resource_type, request.method):
+            await route.fallback()
+            return
+
+        cached = self.get(request.url)
+        if cached:
+            self.hits += 1
+            self.bytes_served += len(cached['body'])
+            await route.fulfill(status=200, headers=cached['headers'], body=cached['body'])
+            return
+
+        self.misses += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            await route.fallback()
+            return
+
+        if response.status == 200:
+            self.put(request.url, body, response.headers)
+        await route.fulfill(response=response, body=body)
+
+    async def install(self, context: BrowserContext):
+        """
+        在浏览器上下文上安装缓存路由
+
+        Args:
+            context: 浏览器上下文
+        """
+        await context.route('**/*', self.handle_route)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'bytes_served': self.bytes_served,
+            'entries': len(self.entries),
+            'size_bytes': self._total_size(),
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        return (
+            f"命中 {self.hits} / 未命中 {self.misses}（命中率 {hit_rate:.0f}%），"
+            f"从磁盘返回 {self.bytes_served / 1024 / 1024:.2f} MB，"
+            f"淘汰 {self.evictions} 个，缓存占用 {self._total_size() / 1024 / 1024:.1f} MB"
+        )
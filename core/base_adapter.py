@@ -1,7 +1,8 @@
 """模块适配器基类"""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from playwright.async_api import BrowserContext, Page
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from playwright.async_api import BrowserContext, Page, ElementHandle
+from core.wait_strategy import WaitCondition, WaitStats, SelectorPresent, wait_until
 import asyncio
 import logging
 
@@ -36,9 +37,17 @@ class TaskResult:
 CheckinResult = TaskResult
 
 
+class SessionExpiredError(Exception):
+    """任务执行中发现会话已失效（需要重新登录，不做普通重试）"""
+    pass
+
+
 class BaseAdapter(ABC):
     """模块适配器抽象基类"""
 
+    # 登录凭证 cookie 名称，用于记录会话过期时间（子类覆盖）
+    AUTH_COOKIE_NAMES: List[str] = []
+
     def __init__(
         self,
         site_name: str,
@@ -64,13 +73,18 @@ class BaseAdapter(ABC):
         self.logger = logger or logging.getLogger(__name__)
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self.wait_stats = WaitStats()
 
-    async def run(self, context: BrowserContext) -> TaskResult:
+    async def run(self, context: BrowserContext, session_validity=None) -> TaskResult:
         """
         执行完整的任务流程
 
+        会话在有效期内（最近验证过且登录 cookie 未过期）时跳过登录检查直接执行任务，
+        任务遇到会话失效时再回退到完整的登录流程
+
         Args:
             context: 浏览器上下文
+            session_validity: 会话有效性缓存（SessionValidityCache），为空时每次都检查登录
 
         Returns:
             任务结果
@@ -79,23 +93,40 @@ class BaseAdapter(ABC):
         self.page = await context.new_page()
 
         try:
-            # 检查是否已登录
-            is_logged_in = await self.is_logged_in()
-
-            if not is_logged_in:
-                self.logger.info(f"[{self.site_name}] 用户 {self.username} 未登录，开始登录")
-                login_result = await self._retry_operation(self.login, max_retries=3)
-                if not login_result:
-                    return TaskResult(False, "登录失败")
-                self.logger.info(f"[{self.site_name}] 登录成功")
-            else:
-                self.logger.info(f"[{self.site_name}] 用户 {self.username} 已登录")
+            probe_skipped = bool(
+                session_validity and session_validity.is_fresh(self.site_name, self.username)
+            )
+
+            if probe_skipped:
+                self.logger.info(f"[{self.site_name}] 用户 {self.username} 会话在有效期内，跳过登录检查")
+            elif not await self._ensure_logged_in():
+                return TaskResult(False, "登录失败")
+            elif session_validity:
+                session_validity.mark_valid(self.site_name, self.username)
 
             # 执行主任务
             self.logger.info(f"[{self.site_name}] 开始执行任务")
-            result = await self._retry_operation(self.checkin, max_retries=3)
+            try:
+                result = await self._retry_operation(self.checkin, max_retries=3)
+                session_expired = False
+            except SessionExpiredError as e:
+                self.logger.info(f"[{self.site_name}] {str(e)}")
+                result = None
+                session_expired = True
+
+            # 跳过了登录检查且任务失败：确认登录状态，会话失效时重新登录后再执行一次
+            if probe_skipped and not (result and result.success):
+                session_validity.invalidate(self.site_name, self.username)
+                logged_in = False if session_expired else await self.is_logged_in()
+                if not logged_in:
+                    self.logger.info(f"[{self.site_name}] 会话可能已失效，回退到完整登录流程")
+                    if not await self._ensure_logged_in():
+                        return TaskResult(False, "登录失败")
+                    result = await self._retry_operation(self.checkin, max_retries=3)
 
             if result:
+                if result.success and session_validity:
+                    session_validity.mark_valid(self.site_name, self.username)
                 self.logger.info(f"[{self.site_name}] {result}")
                 return result
             else:
@@ -106,9 +137,32 @@ class BaseAdapter(ABC):
             return TaskResult(False, f"执行出错: {str(e)}")
 
         finally:
+            if self.wait_stats.waits:
+                self.logger.info(f"[{self.site_name}] 条件等待: {self.wait_stats.format_summary()}")
             if self.page:
                 await self.page.close()
 
+    async def _ensure_logged_in(self) -> bool:
+        """
+        检查登录状态，未登录时执行登录
+
+        Returns:
+            是否已登录
+        """
+        # 检查是否已登录
+        is_logged_in = await self.is_logged_in()
+
+        if not is_logged_in:
+            self.logger.info(f"[{self.site_name}] 用户 {self.username} 未登录，开始登录")
+            login_result = await self._retry_operation(self.login, max_retries=3)
+            if not login_result:
+                return False
+            self.logger.info(f"[{self.site_name}] 登录成功")
+        else:
+            self.logger.info(f"[{self.site_name}] 用户 {self.username} 已登录")
+
+        return True
+
     async def _retry_operation(self, operation, max_retries: int = 3):
         """
         重试操作（带指数退避）
@@ -130,6 +184,10 @@ class BaseAdapter(ABC):
                     self.logger.info(f"操作在第 {attempt + 1} 次尝试后成功")
                 return result
 
+            except SessionExpiredError:
+                # 会话失效重试无意义，交给 run() 重新登录
+                raise
+
             except Exception as e:
                 last_exception = e
                 self.logger.warning(
@@ -151,6 +209,82 @@ class BaseAdapter(ABC):
         self.logger.error(f"操作在 {max_retries} 次尝试后仍然失败")
         raise last_exception
 
+    async def wait_for(
+        self,
+        *conditions: WaitCondition,
+        timeout: float,
+        replaces: Optional[float] = None,
+        description: str = '',
+        page: Optional[Page] = None
+    ) -> Optional[WaitCondition]:
+        """
+        等待页面就绪条件（任一条件满足即返回，代替固定等待）
+
+        Args:
+            *conditions: 就绪条件（同时满足时按顺序优先）
+            timeout: 上限时间（秒）
+            replaces: 被替换的固定等待时长（秒），用于统计节省的时间
+            description: 等待描述（用于日志）
+            page: 页面（默认为主页面）
+
+        Returns:
+            满足的条件，超时返回 None
+        """
+        matched, elapsed = await wait_until(page or self.page, conditions, timeout)
+        self._record_wait(description, matched, elapsed, replaces)
+        return matched
+
+    async def wait_for_any_selector(
+        self,
+        selectors: Sequence[str],
+        timeout: float,
+        sequential_timeout: Optional[float] = None,
+        description: str = '',
+        page: Optional[Page] = None,
+        visible: bool = True
+    ) -> Tuple[Optional[str], Optional[ElementHandle]]:
+        """
+        一次等待多个候选选择器（代替逐个 wait_for_selector 的循环）
+
+        Args:
+            selectors: 候选选择器（同时出现时按顺序优先）
+            timeout: 上限时间（秒）
+            sequential_timeout: 原来逐个尝试时每个选择器的超时（秒），用于统计节省的时间
+            description: 等待描述（用于日志）
+            page: 页面（默认为主页面）
+            visible: 是否要求元素可见
+
+        Returns:
+            (匹配的选择器, 元素)，超时返回 (None, None)
+        """
+        page = page or self.page
+        conditions = [SelectorPresent(selector, visible=visible) for selector in selectors]
+        matched, elapsed = await wait_until(page, conditions, timeout)
+
+        replaces = None
+        if sequential_timeout is not None:
+            # 逐个尝试时，排在匹配项前面的选择器都要等满超时
+            skipped = conditions.index(matched) if matched else len(conditions)
+            replaces = skipped * sequential_timeout + (elapsed if matched else 0)
+        self._record_wait(description, matched, elapsed, replaces)
+
+        if not matched:
+            return None, None
+        return matched.selector, await page.query_selector(matched.selector)
+
+    def _record_wait(
+        self,
+        description: str,
+        matched: Optional[WaitCondition],
+        elapsed: float,
+        replaces: Optional[float]
+    ):
+        """记录等待统计并输出节省的时间"""
+        self.wait_stats.record(elapsed, replaces, matched is not None)
+        status = f"就绪（{matched}）" if matched else "超时"
+        saved = f"，节省 {replaces - elapsed:.2f}s" if replaces is not None else ""
+        self.logger.debug(f"等待{description or '页面'}: {status}，用时 {elapsed:.2f}s{saved}")
+
     @abstractmethod
     async def login(self) -> bool:
         """
@@ -181,14 +315,16 @@ class BaseAdapter(ABC):
         """
         pass
 
-    async def take_screenshot(self, name: str):
+    async def take_screenshot(self, name: str, page: Optional[Page] = None):
         """
         截图用于调试
 
         Args:
             name: 截图文件名
+            page: 截图的页面（默认为主页面）
         """
-        if self.page:
+        page = page or self.page
+        if page:
             try:
                 from pathlib import Path
                 # 确保日志目录存在
@@ -196,7 +332,7 @@ class BaseAdapter(ABC):
                 log_dir.mkdir(exist_ok=True)
 
                 screenshot_path = log_dir / f"{self.site_name}_{self.username}_{name}.png"
-                await self.page.screenshot(path=str(screenshot_path), timeout=60000)  # 增加超时到 60 秒
+                await page.screenshot(path=str(screenshot_path), timeout=60000)  # 增加超时到 60 秒
                 self.logger.debug(f"截图已保存: {screenshot_path}")
             except Exception as e:
                 self.logger.debug(f"截图失败: {str(e)}")  # 降级为 debug，不影响主流程
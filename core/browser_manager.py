@@ -1,28 +1,80 @@
 """浏览器管理模块"""
 import asyncio
 import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Dict, Any
 from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+from core.network_policy import ResourcePolicy, NetworkStats, install_resource_policy
+from core.asset_cache import AssetCache
+from core.session_store import create_session_store, SessionValidityCache
+
+# 浏览器启动参数（常驻浏览器服务共用）
+BROWSER_LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-site-isolation-trials'
+]
 
 
 class BrowserManager:
-    """Playwright 浏览器管理器"""
+    """Playwright 浏览器管理器
+
+    支持两种启动方式：
+    - 冷启动：每次运行启动新的 Chromium（默认）
+    - 连接模式：连接到常驻浏览器服务（core/browser_server.py），
+      只需创建上下文，省去浏览器启动耗时
+    """
 
-    def __init__(self, storage_dir: str = "storage/sessions", headless: bool = True):
+    def __init__(
+        self,
+        storage_dir: str = "storage/sessions",
+        headless: bool = True,
+        endpoint: Optional[str] = None,
+        attach: bool = True,
+        session_backend: str = "sqlite",
+        session_freshness_hours: float = 0
+    ):
         """
         初始化浏览器管理器
 
         Args:
             storage_dir: 会话存储目录
             headless: 是否无头模式运行
+            endpoint: 常驻浏览器服务的 CDP 端点（如 http://127.0.0.1:9222），
+                      为空时依次尝试环境变量 BROWSER_ENDPOINT 和服务状态文件
+            attach: 是否尝试连接常驻浏览器（调试模式需要可见窗口时关闭）
+            session_backend: 会话存储后端（sqlite/json）
+            session_freshness_hours: 会话有效期（小时），期内跳过登录检查，0 表示每次都检查
         """
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.session_store = create_session_store(session_backend, str(self.storage_dir))
+        self.session_validity: Optional[SessionValidityCache] = (
+            SessionValidityCache(self.session_store, session_freshness_hours * 3600)
+            if session_freshness_hours > 0 else None
+        )
         self.headless = headless
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
 
+        # 常驻浏览器服务端点
+        self.endpoint = endpoint or os.getenv('BROWSER_ENDPOINT')
+        self.attach = attach
+        self.attached = False
+        self.startup_seconds: Optional[float] = None
+
+        # 按站点的资源拦截策略和网络统计
+        self.resource_policies: Dict[str, ResourcePolicy] = {}
+        self.network_stats: Dict[str, NetworkStats] = {}
+
+        # 所有上下文共享的静态资源缓存
+        self.asset_cache: Optional[AssetCache] = None
+
         # 自动检测代理配置
         self.proxy = self._detect_proxy()
 
@@ -47,6 +99,66 @@ class BrowserManager:
             return {"server": proxy_url}
         return None
 
+    def set_resource_policy(self, site_name: str, config: Optional[Dict[str, Any]]):
+        """
+        设置站点的资源拦截策略
+
+        Args:
+            site_name: 站点名称
+            config: browser.resource_blocking 配置节，为空或未启用时不拦截
+        """
+        policy = ResourcePolicy.from_config(config)
+        if policy:
+            self.resource_policies[site_name] = policy
+            self.network_stats.setdefault(site_name, NetworkStats())
+        else:
+            self.resource_policies.pop(site_name, None)
+
+    def enable_asset_cache(self, config: Optional[Dict[str, Any]]):
+        """
+        启用所有上下文共享的静态资源缓存
+
+        Args:
+            config: browser.asset_cache 配置节，为空或未启用时不缓存
+        """
+        self.asset_cache = AssetCache.from_config(config)
+
+    def get_network_stats(self, site_name: str) -> Optional[NetworkStats]:
+        """
+        获取站点本次运行的网络统计
+
+        Args:
+            site_name: 站点名称
+
+        Returns:
+            网络统计，未启用拦截时返回 None
+        """
+        return self.network_stats.get(site_name)
+
+    async def _setup_context(self, context: BrowserContext, site_name: str):
+        """
+        为新上下文安装反检测脚本、资源缓存和资源拦截
+
+        Args:
+            context: 浏览器上下文
+            site_name: 站点名称
+        """
+        # 添加反检测脚本
+        await context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+            Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+            Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en']});
+            window.chrome = {runtime: {}};
+        """)
+
+        # 路由按注册的逆序执行：先执行资源拦截，放行的请求再交给资源缓存
+        if self.asset_cache:
+            await self.asset_cache.install(context)
+
+        policy = self.resource_policies.get(site_name)
+        if policy:
+            await install_resource_policy(context, policy, self.network_stats[site_name])
+
     async def __aenter__(self):
         """异步上下文管理器入口"""
         await self.start()
@@ -57,21 +169,77 @@ class BrowserManager:
         await self.close()
 
     async def start(self):
-        """启动浏览器"""
+        """
+        启动浏览器
+
+        优先连接常驻浏览器服务，连接失败时回退到冷启动
+        """
+        start_time = time.perf_counter()
         self.playwright = await async_playwright().start()
 
-        # 浏览器启动参数
+        endpoint = self._resolve_endpoint()
+        if endpoint and await self._attach(endpoint):
+            mode = "连接常驻浏览器"
+        else:
+            await self._launch()
+            mode = "冷启动浏览器"
+
+        self.startup_seconds = time.perf_counter() - start_time
+        print(f"[BrowserManager] {mode}，耗时 {self.startup_seconds * 1000:.0f} ms")
+
+    def _resolve_endpoint(self) -> Optional[str]:
+        """
+        确定常驻浏览器服务端点
+
+        优先级：构造参数 > BROWSER_ENDPOINT 环境变量 > 服务状态文件
+
+        Returns:
+            CDP 端点或 None
+        """
+        if not self.attach:
+            return None
+
+        if self.endpoint:
+            return self.endpoint
+
+        from core.browser_server import read_endpoint
+        return read_endpoint()
+
+    async def _attach(self, endpoint: str) -> bool:
+        """
+        连接到常驻浏览器服务
+
+        Args:
+            endpoint: CDP 端点
+
+        Returns:
+            是否连接成功
+        """
+        from core.browser_server import check_health
+
+        if not await check_health(endpoint):
+            print(f"[BrowserManager] 常驻浏览器不可用: {endpoint}，改为冷启动")
+            return False
+
+        try:
+            self.browser = await self.playwright.chromium.connect_over_cdp(endpoint, timeout=10000)
+            self.attached = True
+            return True
+        except Exception as e:
+            print(f"[BrowserManager] 连接常驻浏览器失败: {e}，改为冷启动")
+            self.browser = None
+            return False
+
+    async def _launch(self, extra_args: Optional[List[str]] = None):
+        """
+        冷启动 Chromium
+
+        Args:
+            extra_args: 额外的浏览器启动参数
+        """
         launch_options = {
             "headless": self.headless,
-            "args": [
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=IsolateOrigins,site-per-process',
-                '--disable-site-isolation-trials'
-            ]
+            "args": BROWSER_LAUNCH_ARGS + (extra_args or [])
         }
 
         # 如果有代理配置，添加代理
@@ -80,6 +248,22 @@ class BrowserManager:
             print(f"[BrowserManager] 使用代理: {self.proxy['server']}")
 
         self.browser = await self.playwright.chromium.launch(**launch_options)
+        self.attached = False
+
+    def is_healthy(self) -> bool:
+        """检查浏览器连接是否可用"""
+        return self.browser is not None and self.browser.is_connected()
+
+    async def _ensure_browser(self):
+        """浏览器断开（如常驻服务重启）时重新连接或启动"""
+        if self.is_healthy():
+            return
+
+        print("[BrowserManager] 浏览器连接已断开，重新启动")
+        self.browser = None
+        endpoint = self._resolve_endpoint()
+        if not (endpoint and await self._attach(endpoint)):
+            await self._launch()
 
     async def create_context(
         self, site_name: str, user_id: str, load_session: bool = True
@@ -95,16 +279,17 @@ class BrowserManager:
         Returns:
             浏览器上下文
         """
-        if not self.browser:
+        if not self.playwright:
             raise RuntimeError("浏览器未启动，请先调用 start()")
 
-        session_dir = self.storage_dir / f"{site_name}_{user_id}"
+        await self._ensure_browser()
 
         # 如果存在已保存的会话且需要加载，则恢复
-        if load_session and session_dir.exists():
+        storage_state = self.session_store.load(site_name, user_id) if load_session else None
+        if storage_state:
             try:
                 context = await self.browser.new_context(
-                    storage_state=str(session_dir / "state.json"),
+                    storage_state=storage_state,
                     viewport={'width': 1920, 'height': 1080},
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
                     locale='zh-CN',
@@ -114,13 +299,7 @@ class BrowserManager:
                         'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
                     }
                 )
-                # 添加反检测脚本
-                await context.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-                    Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en']});
-                    window.chrome = {runtime: {}};
-                """)
+                await self._setup_context(context, site_name)
                 return context
             except Exception as e:
                 print(f"加载会话失败: {e}，将创建新会话")
@@ -137,41 +316,57 @@ class BrowserManager:
             }
         )
 
-        # 添加反检测脚本
-        await context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-            Object.defineProperty(navigator, 'languages', {get: () => ['zh-CN', 'zh', 'en']});
-            window.chrome = {runtime: {}};
-        """)
+        await self._setup_context(context, site_name)
 
         return context
 
     async def save_context(
-        self, context: BrowserContext, site_name: str, user_id: str
-    ):
+        self,
+        context: BrowserContext,
+        site_name: str,
+        user_id: str,
+        auth_cookie_names: Optional[List[str]] = None
+    ) -> bool:
         """
-        保存浏览器上下文
+        保存浏览器上下文（状态未变化时不写入）
 
         Args:
             context: 浏览器上下文
             site_name: 站点名称
             user_id: 用户标识
-        """
-        session_dir = self.storage_dir / f"{site_name}_{user_id}"
-        session_dir.mkdir(parents=True, exist_ok=True)
+            auth_cookie_names: 登录 cookie 名称，用于记录过期时间
 
+        Returns:
+            是否实际写入
+        """
         try:
-            await context.storage_state(path=str(session_dir / "state.json"))
+            state = await context.storage_state()
+            return self.session_store.save(site_name, user_id, state, auth_cookie_names)
         except Exception as e:
             print(f"保存会话失败: {e}")
+            return False
 
     async def close(self):
-        """关闭浏览器和 Playwright"""
+        """
+        关闭浏览器和 Playwright
+
+        连接模式下只断开连接并清理本进程创建的上下文，常驻浏览器继续运行
+        """
+        if self.asset_cache:
+            try:
+                self.asset_cache.flush()
+            except Exception as e:
+                print(f"[BrowserManager] 保存资源缓存索引失败: {e}")
+
         if self.browser:
-            await self.browser.close()
+            try:
+                await self.browser.close()
+            except Exception as e:
+                print(f"[BrowserManager] 关闭浏览器失败: {e}")
             self.browser = None
 
         if self.playwright:
             await self.playwright.stop()
             self.playwright = None
+
+        self.session_store.close()
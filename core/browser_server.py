@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+常驻浏览器服务
+
+启动一次 Chromium 并保持运行，通过 CDP 端点供各模块的 BrowserManager 连接复用。
+定时任务每次只需创建浏览器上下文，不再冷启动浏览器。
+
+用法：
+    python3 core/browser_server.py start     # 前台运行服务
+    python3 core/browser_server.py ensure    # 服务不可用时后台启动（供 run_daily.sh 使用）
+    python3 core/browser_server.py status    # 查看服务状态
+    python3 core/browser_server.py stop      # 停止服务
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# 服务状态文件（记录端点和进程号）
+DEFAULT_STATE_FILE = PROJECT_ROOT / 'storage' / 'browser_server.json'
+DEFAULT_PORT = 9222
+
+# 健康检查间隔（秒）
+HEALTH_CHECK_INTERVAL = 30
+
+
+def read_state(state_file: Path = DEFAULT_STATE_FILE) -> Optional[Dict[str, Any]]:
+    """
+    读取服务状态文件
+
+    Args:
+        state_file: 状态文件路径
+
+    Returns:
+        状态字典，文件不存在或损坏时返回 None
+    """
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_endpoint(state_file: Path = DEFAULT_STATE_FILE) -> Optional[str]:
+    """
+    从状态文件读取服务端点
+
+    Args:
+        state_file: 状态文件路径
+
+    Returns:
+        CDP 端点或 None
+    """
+    state = read_state(state_file)
+    return state.get('endpoint') if state else None
+
+
+def _probe(endpoint: str, timeout: float) -> bool:
+    """同步探测 CDP 端点的 /json/version"""
+    url = endpoint.rstrip('/')
+    if url.startswith('ws://'):
+        # ws://host:port/devtools/browser/... -> http://host:port
+        url = 'http://' + url[len('ws://'):].split('/', 1)[0]
+    try:
+        with urllib.request.urlopen(f"{url}/json/version", timeout=timeout) as response:
+            data = json.loads(response.read().decode('utf-8'))
+            return bool(data.get('webSocketDebuggerUrl'))
+    except Exception:
+        return False
+
+
+async def check_health(endpoint: str, timeout: float = 2.0) -> bool:
+    """
+    检查常驻浏览器是否可用
+
+    Args:
+        endpoint: CDP 端点
+        timeout: 超时时间（秒）
+
+    Returns:
+        是否可用
+    """
+    return await asyncio.to_thread(_probe, endpoint, timeout)
+
+
+class BrowserServer:
+    """常驻浏览器服务"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = DEFAULT_PORT,
+        headless: bool = True,
+        state_file: Path = DEFAULT_STATE_FILE
+    ):
+        """
+        初始化浏览器服务
+
+        Args:
+            host: 监听地址（仅建议本机）
+            port: CDP 端口
+            headless: 是否无头模式运行
+            state_file: 服务状态文件路径
+        """
+        self.host = host
+        self.port = port
+        self.headless = headless
+        self.state_file = Path(state_file)
+        self.endpoint = f"http://{host}:{port}"
+        self._stop_event: Optional[asyncio.Event] = None
+
+    async def serve(self):
+        """启动浏览器并保持运行，浏览器崩溃时自动重启"""
+        from core.browser_manager import BrowserManager
+        from playwright.async_api import async_playwright
+
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stop_event.set)
+
+        manager = BrowserManager(headless=self.headless)
+        manager.playwright = await async_playwright().start()
+        extra_args = [
+            f'--remote-debugging-address={self.host}',
+            f'--remote-debugging-port={self.port}'
+        ]
+
+        try:
+            await manager._launch(extra_args=extra_args)
+            self._write_state()
+            print(f"[BrowserServer] 常驻浏览器已启动: {self.endpoint}")
+
+            while not self._stop_event.is_set():
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=HEALTH_CHECK_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+                if not self._stop_event.is_set() and not (
+                    manager.is_healthy() and await check_health(self.endpoint)
+                ):
+                    print("[BrowserServer] 浏览器不可用，正在重启")
+                    try:
+                        await manager.browser.close()
+                    except Exception:
+                        pass
+                    await manager._launch(extra_args=extra_args)
+
+        finally:
+            self._remove_state()
+            await manager.close()
+            print("[BrowserServer] 常驻浏览器已停止")
+
+    def _write_state(self):
+        """写入状态文件"""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'endpoint': self.endpoint,
+                'pid': os.getpid(),
+                'started_at': datetime.now().isoformat()
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def _remove_state(self):
+        """删除状态文件（仅删除本进程写入的）"""
+        state = read_state(self.state_file)
+        if state and state.get('pid') == os.getpid():
+            self.state_file.unlink(missing_ok=True)
+
+
+def ensure_running(port: int, headless: bool, wait_seconds: float = 30) -> bool:
+    """
+    确保常驻浏览器在运行，不可用时在后台启动
+
+    Args:
+        port: CDP 端口
+        headless: 是否无头模式运行
+        wait_seconds: 等待启动的最长时间（秒）
+
+    Returns:
+        服务是否可用
+    """
+    endpoint = read_endpoint()
+    if endpoint and _probe(endpoint, 2.0):
+        print(f"常驻浏览器运行中: {endpoint}")
+        return True
+
+    log_dir = PROJECT_ROOT / 'storage' / 'logs'
+    log_dir.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, str(Path(__file__).resolve()), 'start', '--port', str(port)]
+    if not headless:
+        command.append('--headed')
+
+    with open(log_dir / 'browser_server.log', 'a', encoding='utf-8') as log_file:
+        subprocess.Popen(
+            command,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+            cwd=str(PROJECT_ROOT)
+        )
+
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        endpoint = read_endpoint()
+        if endpoint and _probe(endpoint, 2.0):
+            print(f"常驻浏览器已启动: {endpoint}")
+            return True
+        time.sleep(0.5)
+
+    print("常驻浏览器启动超时，各模块将回退到冷启动")
+    return False
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='常驻浏览器服务')
+    parser.add_argument('command', choices=['start', 'ensure', 'status', 'stop'], help='操作')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'CDP 端口（默认: {DEFAULT_PORT}）')
+    parser.add_argument('--headed', action='store_true', help='显示浏览器窗口')
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        asyncio.run(BrowserServer(port=args.port, headless=not args.headed).serve())
+
+    elif args.command == 'ensure':
+        sys.exit(0 if ensure_running(args.port, headless=not args.headed) else 1)
+
+    elif args.command == 'status':
+        state = read_state()
+        if not state:
+            print("常驻浏览器未运行")
+            sys.exit(1)
+        start_time = time.perf_counter()
+        healthy = _probe(state['endpoint'], 2.0)
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        print(f"端点: {state['endpoint']}")
+        print(f"进程: {state.get('pid')}  启动于: {state.get('started_at')}")
+        print(f"状态: {'正常' if healthy else '不可用'}（探测耗时 {latency_ms:.0f} ms）")
+        sys.exit(0 if healthy else 1)
+
+    elif args.command == 'stop':
+        state = read_state()
+        if not state or not state.get('pid'):
+            print("常驻浏览器未运行")
+            return
+        try:
+            os.kill(state['pid'], signal.SIGTERM)
+            print(f"已发送停止信号: pid={state['pid']}")
+        except ProcessLookupError:
+            print("进程不存在，清理状态文件")
+            DEFAULT_STATE_FILE.unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    main()
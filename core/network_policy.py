@@ -0,0 +1,242 @@
+"""网络资源拦截模块
+
+按站点配置拦截不需要的网络请求（图片、字体、统计脚本等），
+并统计每次运行拦截的请求数和估算节省的流量。
+"""
+from fnmatch import fnmatch
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Route, Request
+
+# 资源类型的默认平均大小（字节），在本次运行没有观测样本时用于估算节省流量
+DEFAULT_RESOURCE_SIZES = {
+    'image': 30 * 1024,
+    'media': 500 * 1024,
+    'font': 60 * 1024,
+    'stylesheet': 40 * 1024,
+    'script': 80 * 1024,
+    'xhr': 5 * 1024,
+    'fetch': 5 * 1024,
+    'ping': 512,
+    'other': 10 * 1024,
+}
+
+# 永不拦截的资源类型（拦截主文档会导致页面无法加载）
+NEVER_BLOCK_TYPES = {'document'}
+
+
+def _registrable_domain(host: str) -> str:
+    """取主机名的最后两级作为站点域名（如 cdn.linux.do -> linux.do）"""
+    parts = host.lower().split('.')
+    return '.'.join(parts[-2:]) if len(parts) >= 2 else host.lower()
+
+
+class ResourcePolicy:
+    """站点资源拦截策略"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        block_resource_types: Optional[List[str]] = None,
+        block_url_patterns: Optional[List[str]] = None,
+        block_third_party: bool = False,
+        first_party_domains: Optional[List[str]] = None,
+        allow_url_patterns: Optional[List[str]] = None,
+        allow_on_pages: Optional[List[str]] = None
+    ):
+        """
+        初始化拦截策略
+
+        Args:
+            enabled: 是否启用
+            block_resource_types: 拦截的资源类型（image/font/media/stylesheet/script 等）
+            block_url_patterns: 拦截的 URL 通配符（如 *google-analytics.com*）
+            block_third_party: 是否拦截第三方域名的请求
+            first_party_domains: 视为第一方的域名（除当前页面域名外）
+            allow_url_patterns: 始终放行的 URL 通配符（优先于所有拦截规则）
+            allow_on_pages: 在这些页面上不做任何拦截（如登录页需要验证码图片和脚本）
+        """
+        self.enabled = enabled
+        self.block_resource_types = set(block_resource_types or []) - NEVER_BLOCK_TYPES
+        self.block_url_patterns = block_url_patterns or []
+        self.block_third_party = block_third_party
+        self.first_party_domains = {_registrable_domain(d) for d in (first_party_domains or [])}
+        self.allow_url_patterns = allow_url_patterns or []
+        self.allow_on_pages = allow_on_pages or []
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['ResourcePolicy']:
+        """
+        从配置字典创建策略
+
+        Args:
+            config: browser.resource_blocking 配置节
+
+        Returns:
+            拦截策略，未配置或未启用时返回 None
+        """
+        if not config or not config.get('enabled', True):
+            return None
+
+        return cls(
+            block_resource_types=config.get('block_resource_types'),
+            block_url_patterns=config.get('block_url_patterns'),
+            block_third_party=config.get('block_third_party', False),
+            first_party_domains=config.get('first_party_domains'),
+            allow_url_patterns=config.get('allow_url_patterns'),
+            allow_on_pages=config.get('allow_on_pages')
+        )
+
+    def match_block_reason(self, url: str, resource_type: str, page_url: str = '') -> Optional[str]:
+        """
+        判断请求是否应被拦截
+
+        Args:
+            url: 请求 URL
+            resource_type: 资源类型
+            page_url: 发起请求的页面 URL
+
+        Returns:
+            拦截原因（resource_type/url_pattern/third_party），不拦截返回 None
+        """
+        if not self.enabled or resource_type in NEVER_BLOCK_TYPES:
+            return None
+
+        if any(fnmatch(url, pattern) for pattern in self.allow_url_patterns):
+            return None
+
+        if page_url and any(fnmatch(page_url, pattern) for pattern in self.allow_on_pages):
+            return None
+
+        if resource_type in self.block_resource_types:
+            return 'resource_type'
+
+        if any(fnmatch(url, pattern) for pattern in self.block_url_patterns):
+            return 'url_pattern'
+
+        if self.block_third_party and page_url:
+            request_host = urlparse(url).hostname or ''
+            page_host = urlparse(page_url).hostname or ''
+            if request_host and page_host:
+                request_domain = _registrable_domain(request_host)
+                if (request_domain != _registrable_domain(page_host)
+                        and request_domain not in self.first_party_domains):
+                    return 'third_party'
+
+        return None
+
+
+class NetworkStats:
+    """网络请求统计"""
+
+    def __init__(self):
+        """初始化统计"""
+        self.requests_total = 0
+        self.requests_blocked = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.blocked_by_type: Dict[str, int] = {}
+        self.bytes_received = 0
+        # 按资源类型记录已下载的字节数和请求数，用于估算被拦截请求的大小
+        self._bytes_by_type: Dict[str, int] = {}
+        self._count_by_type: Dict[str, int] = {}
+
+    def record_blocked(self, resource_type: str, reason: str):
+        """记录一次拦截"""
+        self.requests_total += 1
+        self.requests_blocked += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def record_allowed(self):
+        """记录一次放行"""
+        self.requests_total += 1
+
+    def record_response(self, resource_type: str, size: int):
+        """记录一次完成的响应及其大小"""
+        self.bytes_received += size
+        self._bytes_by_type[resource_type] = self._bytes_by_type.get(resource_type, 0) + size
+        self._count_by_type[resource_type] = self._count_by_type.get(resource_type, 0) + 1
+
+    def estimated_bytes_saved(self) -> int:
+        """
+        估算拦截节省的流量
+
+        优先使用本次运行同类型资源的平均大小，没有样本时使用默认值
+
+        Returns:
+            估算字节数
+        """
+        total = 0
+        for resource_type, count in self.blocked_by_type.items():
+            observed = self._count_by_type.get(resource_type, 0)
+            if observed:
+                average = self._bytes_by_type[resource_type] / observed
+            else:
+                average = DEFAULT_RESOURCE_SIZES.get(resource_type, DEFAULT_RESOURCE_SIZES['other'])
+            total += int(average * count)
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'requests_total': self.requests_total,
+            'requests_blocked': self.requests_blocked,
+            'blocked_by_reason': dict(self.blocked_by_reason),
+            'blocked_by_type': dict(self.blocked_by_type),
+            'bytes_received': self.bytes_received,
+            'bytes_saved_estimate': self.estimated_bytes_saved(),
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return (
+            f"请求 {self.requests_total} 个，拦截 {self.requests_blocked} 个，"
+            f"下载 {self.bytes_received / 1024 / 1024:.2f} MB，"
+            f"估算节省 {self.estimated_bytes_saved() / 1024 / 1024:.2f} MB"
+        )
+
+
+def _page_url_of(request: Request) -> str:
+    """获取发起请求的页面 URL（Service Worker 等请求没有 frame）"""
+    try:
+        return request.frame.page.url if request.frame.page else request.frame.url
+    except Exception:
+        return ''
+
+
+async def install_resource_policy(
+    context: BrowserContext,
+    policy: ResourcePolicy,
+    stats: NetworkStats
+):
+    """
+    在浏览器上下文上安装资源拦截
+
+    注意：Playwright 启用路由后会关闭浏览器的 HTTP 缓存
+
+    Args:
+        context: 浏览器上下文
+        policy: 拦截策略
+        stats: 统计对象（可多个上下文共享）
+    """
+
+    async def handle_route(route: Route):
+        request = route.request
+        reason = policy.match_block_reason(request.url, request.resource_type, _page_url_of(request))
+        if reason:
+            stats.record_blocked(request.resource_type, reason)
+            await route.abort('blockedbyclient')
+        else:
+            stats.record_allowed()
+            # 交给后续注册的路由处理（没有则正常发送）
+            await route.fallback()
+
+    async def handle_request_finished(request: Request):
+        try:
+            sizes = await request.sizes()
+            stats.record_response(request.resource_type, sizes.get('responseBodySize', 0))
+        except Exception:
+            pass
+
+    await context.route('**/*', handle_route)
+    context.on('requestfinished', handle_request_finished)
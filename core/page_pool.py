@@ -0,0 +1,174 @@
+"""页面池模块
+
+为一个浏览器上下文维护有上限的页面集合，供并发任务借出和归还。
+同一个页面上的并发 goto 会互相取消，需要并发读取页面时每个任务应使用独立的页面。
+
+- 借出时优先复用空闲页面，没有空闲页面且未达上限时新建
+- 页面导航次数达到上限后归还时关闭（回收），避免长时间使用后内存膨胀
+- 页面崩溃或被关闭时丢弃，下次借出时自动补充新页面
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from playwright.async_api import BrowserContext, Page, Frame
+
+
+class PagePool:
+    """浏览器上下文页面池"""
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        size: int = 3,
+        max_navigations: int = 20,
+        setup: Optional[Callable[[Page], Awaitable[None]]] = None
+    ):
+        """
+        初始化页面池
+
+        Args:
+            context: 浏览器上下文
+            size: 同时借出的页面数上限
+            max_navigations: 单个页面导航次数上限，达到后回收
+            setup: 新建页面后的初始化回调（如设置超时）
+        """
+        self.context = context
+        self.size = size
+        self.max_navigations = max_navigations
+        self.setup = setup
+
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: List[Page] = []
+        # page -> {navigations, crashed}
+        self._state: Dict[Page, Dict[str, Any]] = {}
+        self._closed = False
+
+        # 统计
+        self.created = 0
+        self.recycled = 0
+        self.replaced = 0
+        self.checkouts = 0
+
+    async def _new_page(self) -> Page:
+        """新建页面并注册导航计数和崩溃监听"""
+        page = await self.context.new_page()
+        state = {'navigations': 0, 'crashed': False}
+        self._state[page] = state
+
+        def on_navigated(frame: Frame):
+            if frame == page.main_frame:
+                state['navigations'] += 1
+
+        def on_crash(_page):
+            state['crashed'] = True
+
+        page.on('framenavigated', on_navigated)
+        page.on('crash', on_crash)
+        self.created += 1
+
+        if self.setup:
+            await self.setup(page)
+        return page
+
+    def _is_usable(self, page: Page) -> bool:
+        """页面未关闭且未崩溃"""
+        state = self._state.get(page)
+        return bool(state) and not state['crashed'] and not page.is_closed()
+
+    async def _discard(self, page: Page):
+        """关闭并移除页面"""
+        self._state.pop(page, None)
+        if not page.is_closed():
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+    async def acquire(self) -> Page:
+        """
+        借出一个页面（已达上限时等待其他任务归还）
+
+        Returns:
+            页面
+        """
+        if self._closed:
+            raise RuntimeError("页面池已关闭")
+
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                page = self._idle.pop()
+                if self._is_usable(page):
+                    self.checkouts += 1
+                    return page
+                # 空闲期间崩溃或被关闭的页面，替换为新页面
+                self.replaced += 1
+                await self._discard(page)
+
+            page = await self._new_page()
+            self.checkouts += 1
+            return page
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    async def release(self, page: Page, discard: bool = False):
+        """
+        归还页面
+
+        Args:
+            page: 借出的页面
+            discard: 强制关闭而不放回池中
+        """
+        try:
+            if self._closed or discard:
+                await self._discard(page)
+            elif not self._is_usable(page):
+                self.replaced += 1
+                await self._discard(page)
+            elif self._state[page]['navigations'] >= self.max_navigations:
+                self.recycled += 1
+                await self._discard(page)
+            else:
+                self._idle.append(page)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        借出页面的上下文管理器
+
+        用法:
+            async with pool.page() as page:
+                await page.goto(url)
+        """
+        page = await self.acquire()
+        try:
+            yield page
+        finally:
+            await self.release(page)
+
+    async def close(self):
+        """关闭所有空闲页面（借出中的页面在归还时关闭）"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for page in idle:
+            await self._discard(page)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'size': self.size,
+            'checkouts': self.checkouts,
+            'created': self.created,
+            'recycled': self.recycled,
+            'replaced': self.replaced,
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return (
+            f"借出 {self.checkouts} 次，新建 {self.created} 个页面，"
+            f"回收 {self.recycled} 个，崩溃替换 {self.replaced} 个"
+        )
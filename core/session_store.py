@@ -0,0 +1,383 @@
+"""会话存储模块
+
+按 (站点, 用户) 保存浏览器登录状态（cookies + localStorage origins）。
+
+- SqliteSessionStore：SQLite（WAL 模式）后端，写入是原子的，多个进程可同时读写
+- JsonSessionStore：原有的 storage/sessions/<site>_<user>/state.json 目录布局，作为备用后端
+
+两种后端都只在状态真正变化时写入，并记录最近一次验证登录有效的时间和 cookie 过期时间。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+def state_fingerprint(state: Dict[str, Any]) -> str:
+    """
+    计算会话状态的指纹（与 cookie 顺序无关）
+
+    Args:
+        state: Playwright storage_state
+
+    Returns:
+        SHA-256 十六进制字符串
+    """
+    cookies = sorted(
+        state.get('cookies', []),
+        key=lambda c: (c.get('domain', ''), c.get('path', ''), c.get('name', ''))
+    )
+    origins = sorted(state.get('origins', []), key=lambda o: o.get('origin', ''))
+    payload = json.dumps({'cookies': cookies, 'origins': origins}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cookie_expiry(state: Dict[str, Any], cookie_names: Optional[List[str]] = None) -> Optional[float]:
+    """
+    计算 cookie 的最早过期时间
+
+    Args:
+        state: Playwright storage_state
+        cookie_names: 只统计这些 cookie（如登录 token），为空时统计全部
+
+    Returns:
+        Unix 时间戳，没有持久 cookie 时返回 None
+    """
+    expiries = [
+        c['expires'] for c in state.get('cookies', [])
+        if c.get('expires', -1) > 0 and (not cookie_names or c.get('name') in cookie_names)
+    ]
+    return min(expiries) if expiries else None
+
+
+class SessionStore(ABC):
+    """会话存储抽象基类"""
+
+    @abstractmethod
+    def load(self, site_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取会话状态
+
+        Args:
+            site_name: 站点名称
+            user_id: 用户标识
+
+        Returns:
+            Playwright storage_state，不存在时返回 None
+        """
+        pass
+
+    @abstractmethod
+    def save(
+        self,
+        site_name: str,
+        user_id: str,
+        state: Dict[str, Any],
+        auth_cookie_names: Optional[List[str]] = None
+    ) -> bool:
+        """
+        保存会话状态（内容未变化时不写入）
+
+        Args:
+            site_name: 站点名称
+            user_id: 用户标识
+            state: Playwright storage_state
+            auth_cookie_names: 登录 cookie 名称，用于计算过期时间
+
+        Returns:
+            是否实际写入
+        """
+        pass
+
+    @abstractmethod
+    def get_meta(self, site_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取会话元数据
+
+        Args:
+            site_name: 站点名称
+            user_id: 用户标识
+
+        Returns:
+            包含 updated_at、last_validated_at、cookie_expires_at 的字典
+        """
+        pass
+
+    @abstractmethod
+    def mark_validated(self, site_name: str, user_id: str, validated_at: Optional[float] = None):
+        """
+        记录会话已验证有效
+
+        Args:
+            site_name: 站点名称
+            user_id: 用户标识
+            validated_at: 验证时间（默认当前时间），传入 0 表示清除验证记录
+        """
+        pass
+
+    def close(self):
+        """释放资源"""
+        pass
+
+
+class JsonSessionStore(SessionStore):
+    """JSON 文件会话存储（storage/sessions/<site>_<user>/state.json）"""
+
+    def __init__(self, storage_dir: str = "storage/sessions"):
+        """
+        初始化 JSON 会话存储
+
+        Args:
+            storage_dir: 会话存储目录
+        """
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+
+    def _session_dir(self, site_name: str, user_id: str) -> Path:
+        return self.storage_dir / f"{site_name}_{user_id}"
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        """先写临时文件再替换，避免中途崩溃留下半个文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def load(self, site_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self._session_dir(site_name, user_id) / 'state.json')
+
+    def save(
+        self,
+        site_name: str,
+        user_id: str,
+        state: Dict[str, Any],
+        auth_cookie_names: Optional[List[str]] = None
+    ) -> bool:
+        session_dir = self._session_dir(site_name, user_id)
+        existing = self.load(site_name, user_id)
+        if existing is not None and state_fingerprint(existing) == state_fingerprint(state):
+            return False
+
+        self._write_json(session_dir / 'state.json', state)
+        meta = self.get_meta(site_name, user_id) or {}
+        meta.update({
+            'updated_at': time.time(),
+            'cookie_expires_at': cookie_expiry(state, auth_cookie_names)
+        })
+        self._write_json(session_dir / 'meta.json', meta)
+        return True
+
+    def get_meta(self, site_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self._session_dir(site_name, user_id) / 'meta.json')
+
+    def mark_validated(self, site_name: str, user_id: str, validated_at: Optional[float] = None):
+        meta = self.get_meta(site_name, user_id) or {}
+        meta['last_validated_at'] = time.time() if validated_at is None else validated_at
+        self._write_json(self._session_dir(site_name, user_id) / 'meta.json', meta)
+
+
+class SqliteSessionStore(SessionStore):
+    """SQLite 会话存储（WAL 模式）"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            site TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            cookies TEXT NOT NULL,
+            origins TEXT NOT NULL,
+            state_hash TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            last_validated_at REAL,
+            cookie_expires_at REAL,
+            PRIMARY KEY (site, user_id)
+        )
+    """
+
+    def __init__(self, db_file: str = "storage/sessions/sessions.db", legacy_dir: Optional[str] = None):
+        """
+        初始化 SQLite 会话存储
+
+        Args:
+            db_file: 数据库文件路径
+            legacy_dir: 旧版 JSON 会话目录，数据库中没有记录时从这里读取并导入
+        """
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.legacy = JsonSessionStore(legacy_dir) if legacy_dir else None
+
+        self.conn = sqlite3.connect(str(self.db_file), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(self.SCHEMA)
+        self.conn.commit()
+
+    def load(self, site_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT cookies, origins, state_hash FROM sessions WHERE site = ? AND user_id = ?",
+            (site_name, user_id)
+        ).fetchone()
+        if row and row['state_hash']:
+            return {'cookies': json.loads(row['cookies']), 'origins': json.loads(row['origins'])}
+
+        # 回退读取旧版 JSON 会话并导入
+        if self.legacy:
+            state = self.legacy.load(site_name, user_id)
+            if state is not None:
+                # 导入时不知道登录 cookie 名称，过期时间在下次保存会话时按登录 cookie 重新计算
+                self.save(site_name, user_id, state)
+                return state
+        return None
+
+    def save(
+        self,
+        site_name: str,
+        user_id: str,
+        state: Dict[str, Any],
+        auth_cookie_names: Optional[List[str]] = None
+    ) -> bool:
+        expires_at = cookie_expiry(state, auth_cookie_names)
+        # 单条语句完成“比较并写入”，状态指纹相同时不更新
+        with self.conn:
+            cursor = self.conn.execute(
+                """
+                INSERT INTO sessions (site, user_id, cookies, origins, state_hash, updated_at, cookie_expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (site, user_id) DO UPDATE SET
+                    cookies = excluded.cookies,
+                    origins = excluded.origins,
+                    state_hash = excluded.state_hash,
+                    updated_at = excluded.updated_at,
+                    cookie_expires_at = excluded.cookie_expires_at
+                WHERE sessions.state_hash != excluded.state_hash
+                """,
+                (
+                    site_name,
+                    user_id,
+                    json.dumps(state.get('cookies', []), ensure_ascii=False),
+                    json.dumps(state.get('origins', []), ensure_ascii=False),
+                    state_fingerprint(state),
+                    time.time(),
+                    expires_at
+                )
+            )
+            changed = cursor.rowcount > 0
+            if not changed and auth_cookie_names:
+                # 状态未变时仍按登录 cookie 重新计算过期时间（如旧版导入时按全部 cookie 计算），未变化时不写入
+                self.conn.execute(
+                    "UPDATE sessions SET cookie_expires_at = ? "
+                    "WHERE site = ? AND user_id = ? AND cookie_expires_at IS NOT ?",
+                    (expires_at, site_name, user_id, expires_at)
+                )
+            return changed
+
+    def get_meta(self, site_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT updated_at, last_validated_at, cookie_expires_at FROM sessions "
+            "WHERE site = ? AND user_id = ?",
+            (site_name, user_id)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def mark_validated(self, site_name: str, user_id: str, validated_at: Optional[float] = None):
+        # 尚未保存过状态时先插入空记录，随后的 save() 会补全 cookies
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO sessions (site, user_id, cookies, origins, state_hash, updated_at, last_validated_at)
+                VALUES (?, ?, '[]', '[]', '', ?, ?)
+                ON CONFLICT (site, user_id) DO UPDATE SET last_validated_at = excluded.last_validated_at
+                """,
+                (site_name, user_id, time.time(), time.time() if validated_at is None else validated_at)
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class SessionValidityCache:
+    """
+    会话有效性缓存
+
+    记录 (站点, 用户) 最近一次被证明登录有效的时间，在有效期内且登录 cookie
+    未过期时，BaseAdapter.run 可以跳过登录检查
+    """
+
+    # 登录 cookie 距过期不足该时间（秒）时不再视为有效
+    EXPIRY_MARGIN = 300
+
+    def __init__(self, store: SessionStore, freshness_seconds: float):
+        """
+        初始化有效性缓存
+
+        Args:
+            store: 会话存储（元数据保存在其中）
+            freshness_seconds: 有效期（秒）
+        """
+        self.store = store
+        self.freshness_seconds = freshness_seconds
+
+    def is_fresh(self, site_name: str, user_id: str) -> bool:
+        """
+        会话是否在有效期内
+
+        Args:
+            site_name: 站点名称
+            user_id: 用户标识
+
+        Returns:
+            是否可以跳过登录检查
+        """
+        meta = self.store.get_meta(site_name, user_id)
+        if not meta or not meta.get('last_validated_at'):
+            return False
+
+        now = time.time()
+        if now - meta['last_validated_at'] > self.freshness_seconds:
+            return False
+
+        expires_at = meta.get('cookie_expires_at')
+        if expires_at and expires_at - now < self.EXPIRY_MARGIN:
+            return False
+
+        return True
+
+    def mark_valid(self, site_name: str, user_id: str):
+        """记录会话刚被证明有效"""
+        self.store.mark_validated(site_name, user_id)
+
+    def invalidate(self, site_name: str, user_id: str):
+        """清除有效记录，下次运行重新检查登录"""
+        self.store.mark_validated(site_name, user_id, validated_at=0)
+
+
+def create_session_store(backend: str = "sqlite", storage_dir: str = "storage/sessions") -> SessionStore:
+    """
+    创建会话存储
+
+    Args:
+        backend: 后端类型（sqlite/json）
+        storage_dir: 会话存储目录
+
+    Returns:
+        会话存储实例
+    """
+    if backend == "json":
+        return JsonSessionStore(storage_dir)
+    if backend == "sqlite":
+        return SqliteSessionStore(str(Path(storage_dir) / "sessions.db"), legacy_dir=storage_dir)
+    raise ValueError(f"不支持的会话存储后端: {backend}")
@@ -0,0 +1,300 @@
+"""条件等待模块
+
+用"页面就绪条件 + 上限时间"代替固定的 asyncio.sleep 和 networkidle：
+条件满足立即返回，通常只需几十到几百毫秒；超过上限时间才放弃。
+
+可用条件：
+- SelectorPresent：元素出现（可要求可见）
+- ElementCountStable：元素数量在一段时间内不再变化（列表渲染完成）
+- ResponseSeen：收到匹配的网络响应（如 JSON 接口返回）
+- UrlSettled：URL 在一段时间内不再变化（重定向完成），可限定匹配/排除的模式
+- TextMatches：页面文本匹配正则
+- AllOf：多个条件同时满足
+
+同时传入多个条件时，任一条件满足即返回，按传入顺序优先。
+"""
+import asyncio
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Sequence, Tuple
+from playwright.async_api import Page, Response
+
+
+class WaitCondition(ABC):
+    """页面就绪条件基类"""
+
+    description = ''
+
+    def attach(self, page: Page) -> 'WaitCondition':
+        """
+        开始监听页面事件（需要在导航前调用的条件覆盖此方法）
+
+        Args:
+            page: 页面
+
+        Returns:
+            条件本身，便于链式调用
+        """
+        return self
+
+    def detach(self, page: Page):
+        """停止监听页面事件"""
+        pass
+
+    @abstractmethod
+    async def check(self, page: Page) -> bool:
+        """
+        检查条件是否满足（等待期间被反复调用）
+
+        Args:
+            page: 页面
+
+        Returns:
+            是否满足
+        """
+        pass
+
+    def __str__(self):
+        return self.description or self.__class__.__name__
+
+
+class SelectorPresent(WaitCondition):
+    """元素出现"""
+
+    def __init__(self, selector: str, visible: bool = False):
+        """
+        Args:
+            selector: 选择器
+            visible: 是否要求元素可见
+        """
+        self.selector = selector
+        self.visible = visible
+        self.description = f"元素 {selector}"
+
+    async def check(self, page: Page) -> bool:
+        element = await page.query_selector(self.selector)
+        if not element:
+            return False
+        return await element.is_visible() if self.visible else True
+
+
+class ElementCountStable(WaitCondition):
+    """元素数量稳定（列表已渲染完成）"""
+
+    def __init__(self, selector: str, stable_ms: int = 500, min_count: int = 1):
+        """
+        Args:
+            selector: 列表项选择器
+            stable_ms: 数量保持不变的时长（毫秒）
+            min_count: 最少元素数量
+        """
+        self.selector = selector
+        self.stable_ms = stable_ms
+        self.min_count = min_count
+        self.description = f"{selector} 数量稳定"
+        self._last_count = -1
+        self._since = 0.0
+
+    async def check(self, page: Page) -> bool:
+        count = await page.locator(self.selector).count()
+        now = time.monotonic()
+        if count != self._last_count:
+            self._last_count = count
+            self._since = now
+            return False
+        return count >= self.min_count and (now - self._since) * 1000 >= self.stable_ms
+
+
+class ResponseSeen(WaitCondition):
+    """收到匹配的网络响应
+
+    响应可能在导航完成前就已返回，需要在导航前调用 attach(page)
+    """
+
+    def __init__(self, url_pattern: str, ok_only: bool = True):
+        """
+        Args:
+            url_pattern: URL 正则（re.search 匹配）
+            ok_only: 只接受 2xx 响应
+        """
+        self.url_pattern = re.compile(url_pattern)
+        self.ok_only = ok_only
+        self.description = f"响应 {url_pattern}"
+        self.response: Optional[Response] = None
+        self._attached_page: Optional[Page] = None
+
+    def _on_response(self, response: Response):
+        if self.response is None and self.url_pattern.search(response.url):
+            if response.ok or not self.ok_only:
+                self.response = response
+
+    def attach(self, page: Page) -> 'ResponseSeen':
+        if self._attached_page is not page:
+            page.on('response', self._on_response)
+            self._attached_page = page
+        return self
+
+    def detach(self, page: Page):
+        if self._attached_page is page:
+            page.remove_listener('response', self._on_response)
+            self._attached_page = None
+
+    async def check(self, page: Page) -> bool:
+        return self.response is not None
+
+
+class UrlSettled(WaitCondition):
+    """URL 稳定（重定向完成）"""
+
+    def __init__(self, stable_ms: int = 500, pattern: Optional[str] = None, exclude: Optional[str] = None):
+        """
+        Args:
+            stable_ms: URL 保持不变的时长（毫秒）
+            pattern: 稳定后的 URL 需匹配的正则
+            exclude: 稳定后的 URL 不能匹配的正则
+        """
+        self.stable_ms = stable_ms
+        self.pattern = re.compile(pattern) if pattern else None
+        self.exclude = re.compile(exclude) if exclude else None
+        self.description = f"URL 稳定{f' 且匹配 {pattern}' if pattern else ''}{f' 且不匹配 {exclude}' if exclude else ''}"
+        self._last_url: Optional[str] = None
+        self._since = 0.0
+
+    async def check(self, page: Page) -> bool:
+        url = page.url
+        now = time.monotonic()
+        if url != self._last_url:
+            self._last_url = url
+            self._since = now
+            return False
+        if (now - self._since) * 1000 < self.stable_ms:
+            return False
+        if self.pattern and not self.pattern.search(url):
+            return False
+        if self.exclude and self.exclude.search(url):
+            return False
+        return True
+
+
+class TextMatches(WaitCondition):
+    """页面文本匹配正则"""
+
+    def __init__(self, pattern: str, flags: int = re.IGNORECASE):
+        """
+        Args:
+            pattern: 正则（匹配 document.body.innerText）
+            flags: 正则标志
+        """
+        self.pattern = re.compile(pattern, flags)
+        self.description = f"文本 {pattern}"
+
+    async def check(self, page: Page) -> bool:
+        text = await page.evaluate("() => document.body ? document.body.innerText : ''")
+        return bool(self.pattern.search(text or ''))
+
+
+class AllOf(WaitCondition):
+    """多个条件同时满足"""
+
+    def __init__(self, *conditions: WaitCondition):
+        self.conditions = conditions
+        self.description = ' 且 '.join(str(c) for c in conditions)
+
+    def attach(self, page: Page) -> 'AllOf':
+        for condition in self.conditions:
+            condition.attach(page)
+        return self
+
+    def detach(self, page: Page):
+        for condition in self.conditions:
+            condition.detach(page)
+
+    async def check(self, page: Page) -> bool:
+        # 每个条件都要检查，保证稳定类条件持续更新状态
+        results = [await condition.check(page) for condition in self.conditions]
+        return all(results)
+
+
+async def wait_until(
+    page: Page,
+    conditions: Sequence[WaitCondition],
+    timeout: float,
+    poll_interval: float = 0.05
+) -> Tuple[Optional[WaitCondition], float]:
+    """
+    等待任一条件满足
+
+    Args:
+        page: 页面
+        conditions: 条件列表（同一轮检查中按顺序优先）
+        timeout: 上限时间（秒）
+        poll_interval: 检查间隔（秒）
+
+    Returns:
+        (满足的条件, 耗时秒数)，超时时条件为 None
+    """
+    for condition in conditions:
+        condition.attach(page)
+
+    start_time = time.monotonic()
+    deadline = start_time + timeout
+    try:
+        while True:
+            for condition in conditions:
+                try:
+                    if await condition.check(page):
+                        return condition, time.monotonic() - start_time
+                except Exception:
+                    # 导航过程中执行上下文被销毁等情况，下一轮再检查
+                    pass
+
+            if time.monotonic() >= deadline:
+                return None, time.monotonic() - start_time
+            await asyncio.sleep(poll_interval)
+    finally:
+        for condition in conditions:
+            condition.detach(page)
+
+
+class WaitStats:
+    """条件等待统计"""
+
+    def __init__(self):
+        """初始化统计"""
+        self.waits = 0
+        self.timeouts = 0
+        self.elapsed = 0.0
+        self.saved = 0.0
+
+    def record(self, elapsed: float, replaces: Optional[float], ready: bool):
+        """
+        记录一次等待
+
+        Args:
+            elapsed: 实际耗时（秒）
+            replaces: 被替换的固定等待时长（秒），没有对应固定等待时为 None
+            ready: 条件是否满足
+        """
+        self.waits += 1
+        self.elapsed += elapsed
+        if not ready:
+            self.timeouts += 1
+        if replaces is not None:
+            self.saved += replaces - elapsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'waits': self.waits,
+            'timeouts': self.timeouts,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'saved_seconds': round(self.saved, 2),
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return (
+            f"{self.waits} 次（超时 {self.timeouts} 次），共用时 {self.elapsed:.1f}s，"
+            f"较固定等待节省 {self.saved:.1f}s"
+        )
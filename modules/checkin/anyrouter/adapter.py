@@ -7,7 +7,8 @@ from pathlib import Path
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from core.base_adapter import BaseAdapter, CheckinResult
+from core.base_adapter import BaseAdapter, CheckinResult, SessionExpiredError
+from core.wait_strategy import SelectorPresent, UrlSettled, TextMatches, ResponseSeen, AllOf
 import asyncio
 
 
@@ -22,6 +23,14 @@ class AnyrouterAdapter(BaseAdapter):
     PAGE_LOAD_TIMEOUT = 30000
     ELEMENT_WAIT_TIMEOUT = 10000  # 元素查找超时
 
+    # 登录凭证 cookie
+    AUTH_COOKIE_NAMES = ['session']
+
+    # 页面就绪判断
+    LOGIN_URL_PATTERN = r'/login'
+    CONSOLE_TEXT_PATTERN = r'Console|Dashboard|Account Data|账户数据|Current balance'
+    BALANCE_TEXT_PATTERN = r'(Current balance|当前余额)\s*\$?\s*[\d,.]+'
+
     def __init__(self, site_url: str, username: str, password: str, logger=None, anti_detection_config: dict = None):
         super().__init__(
             site_name="anyrouter",
@@ -100,8 +109,14 @@ class AnyrouterAdapter(BaseAdapter):
             console_url = f"{self.site_url}/console"
             await self._goto_with_retry(console_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
 
-            # 等待页面稳定
-            await self.page.wait_for_load_state('networkidle', timeout=self.PAGE_LOAD_TIMEOUT)
+            # 等待重定向到登录页，或控制台内容渲染完成（代替 networkidle）
+            await self.wait_for(
+                UrlSettled(stable_ms=300, pattern=self.LOGIN_URL_PATTERN),
+                AllOf(UrlSettled(stable_ms=800), TextMatches(self.CONSOLE_TEXT_PATTERN)),
+                SelectorPresent('input[type="password"]', visible=True),
+                timeout=self.PAGE_LOAD_TIMEOUT / 1000,
+                description='控制台'
+            )
 
             # 方法1: 检查 URL 是否被重定向到登录页
             current_url = self.page.url
@@ -147,10 +162,6 @@ class AnyrouterAdapter(BaseAdapter):
             # 先访问首页
             self.logger.info(f"访问首页: {self.site_url}")
             await self._goto_with_retry(self.site_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-            await self.page.wait_for_load_state('networkidle', timeout=self.PAGE_LOAD_TIMEOUT)
-
-            # 随机延迟，模拟人类浏览
-            await self._random_delay()
 
             # 尝试关闭可能的弹窗/公告
             popup_close_selectors = [
@@ -163,17 +174,6 @@ class AnyrouterAdapter(BaseAdapter):
                 'button[class*="close"]'
             ]
 
-            for selector in popup_close_selectors:
-                try:
-                    element = await self.page.wait_for_selector(selector, timeout=2000, state='visible')
-                    if element:
-                        self.logger.info(f"关闭弹窗: {selector}")
-                        await element.click()
-                        await asyncio.sleep(0.5)  # 短暂等待弹窗关闭动画
-                        break
-                except:
-                    continue
-
             # 查找并点击 Sign In 按钮
             signin_selectors = [
                 'a:has-text("Sign In")',
@@ -185,21 +185,42 @@ class AnyrouterAdapter(BaseAdapter):
                 'a[href*="signin"]'
             ]
 
+            # 等待首页渲染出弹窗或登录按钮（代替 networkidle）
+            await self.wait_for_any_selector(
+                popup_close_selectors + signin_selectors,
+                timeout=self.PAGE_LOAD_TIMEOUT / 1000,
+                description='首页'
+            )
+
+            # 随机延迟，模拟人类浏览
+            await self._random_delay()
+
+            selector, element = await self.wait_for_any_selector(
+                popup_close_selectors, timeout=2, sequential_timeout=2, description='弹窗'
+            )
+            if element:
+                try:
+                    self.logger.info(f"关闭弹窗: {selector}")
+                    await element.click()
+                    await asyncio.sleep(0.5)  # 短暂等待弹窗关闭动画
+                except Exception as e:
+                    self.logger.debug(f"关闭弹窗失败: {e}")
+
             signin_clicked = False
-            for selector in signin_selectors:
+            selector, element = await self.wait_for_any_selector(
+                signin_selectors, timeout=3, sequential_timeout=3, description='登录按钮'
+            )
+            if element:
                 try:
-                    element = await self.page.wait_for_selector(selector, timeout=3000, state='visible')
-                    if element:
-                        self.logger.info(f"点击登录按钮: {selector}")
-                        await self._random_delay()  # 点击前随机延迟
-                        await element.click()
-                        signin_clicked = True
-                        # 等待页面跳转到登录页
-                        await self.page.wait_for_load_state('domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-                        await self._random_delay()  # 页面加载后延迟
-                        break
-                except:
-                    continue
+                    self.logger.info(f"点击登录按钮: {selector}")
+                    await self._random_delay()  # 点击前随机延迟
+                    await element.click()
+                    signin_clicked = True
+                    # 等待页面跳转到登录页
+                    await self.page.wait_for_load_state('domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+                    await self._random_delay()  # 页面加载后延迟
+                except Exception as e:
+                    self.logger.debug(f"点击登录按钮失败: {e}")
 
             if not signin_clicked:
                 self.logger.warning("未找到Sign In按钮，尝试直接访问登录页面")
@@ -209,7 +230,13 @@ class AnyrouterAdapter(BaseAdapter):
                     try:
                         login_url = f"{self.site_url}{path}"
                         await self._goto_with_retry(login_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-                        await self.page.wait_for_load_state('networkidle', timeout=self.PAGE_LOAD_TIMEOUT)
+                        # 等待登录表单或 404 内容出现（代替 networkidle）
+                        await self.wait_for(
+                            SelectorPresent('input[type="password"], input[type="email"], input[name="username"], button:has-text("Email or Username")'),
+                            TextMatches(r'not found'),
+                            timeout=self.ELEMENT_WAIT_TIMEOUT / 1000,
+                            description='登录页'
+                        )
                         # 检查是否是404
                         page_content = await self.page.content()
                         if 'not found' not in page_content.lower():
@@ -228,16 +255,16 @@ class AnyrouterAdapter(BaseAdapter):
                 'button:has-text("邮箱或用户名")'
             ]
 
-            for selector in email_login_selectors:
+            selector, element = await self.wait_for_any_selector(
+                email_login_selectors, timeout=2, sequential_timeout=2, description='邮箱登录按钮'
+            )
+            if element:
                 try:
-                    element = await self.page.wait_for_selector(selector, timeout=2000, state='visible')
-                    if element:
-                        self.logger.info(f"点击邮箱登录按钮: {selector}")
-                        await element.click()
-                        await asyncio.sleep(1)  # 等待表单显示
-                        break
-                except:
-                    continue
+                    self.logger.info(f"点击邮箱登录按钮: {selector}")
+                    await element.click()
+                    # 表单显示由下面的输入框等待处理
+                except Exception as e:
+                    self.logger.debug(f"点击邮箱登录按钮失败: {e}")
 
             # 可能的用户名字段选择器
             username_selectors = [
@@ -251,22 +278,22 @@ class AnyrouterAdapter(BaseAdapter):
 
             # 填写用户名
             username_filled = False
-            for selector in username_selectors:
+            selector, element = await self.wait_for_any_selector(
+                username_selectors, timeout=5, sequential_timeout=5, description='用户名输入框'
+            )
+            if element:
                 try:
-                    element = await self.page.wait_for_selector(selector, timeout=5000, state='visible')
-                    if element:
-                        # 先清空输入框
-                        await element.click()
-                        await self._random_delay({'min': 0.3, 'max': 0.8})
-                        await element.fill('')
-                        # 使用人类行为模拟输入
-                        await self._human_type(element, self.username)
-                        self.logger.debug(f"使用选择器填写用户名: {selector}")
-                        username_filled = True
-                        await self._random_delay({'min': 0.5, 'max': 1.5})
-                        break
-                except:
-                    continue
+                    # 先清空输入框
+                    await element.click()
+                    await self._random_delay({'min': 0.3, 'max': 0.8})
+                    await element.fill('')
+                    # 使用人类行为模拟输入
+                    await self._human_type(element, self.username)
+                    self.logger.debug(f"使用选择器填写用户名: {selector}")
+                    username_filled = True
+                    await self._random_delay({'min': 0.5, 'max': 1.5})
+                except Exception as e:
+                    self.logger.debug(f"填写用户名失败: {e}")
 
             if not username_filled:
                 self.logger.error("无法找到用户名输入框")
@@ -282,22 +309,22 @@ class AnyrouterAdapter(BaseAdapter):
 
             # 填写密码
             password_filled = False
-            for selector in password_selectors:
+            selector, element = await self.wait_for_any_selector(
+                password_selectors, timeout=5, sequential_timeout=5, description='密码输入框'
+            )
+            if element:
                 try:
-                    element = await self.page.wait_for_selector(selector, timeout=5000, state='visible')
-                    if element:
-                        # 先清空输入框
-                        await element.click()
-                        await self._random_delay({'min': 0.3, 'max': 0.8})
-                        await element.fill('')
-                        # 使用人类行为模拟输入
-                        await self._human_type(element, self.password)
-                        self.logger.debug(f"使用选择器填写密码: {selector}")
-                        password_filled = True
-                        await self._random_delay({'min': 0.5, 'max': 1.5})
-                        break
-                except:
-                    continue
+                    # 先清空输入框
+                    await element.click()
+                    await self._random_delay({'min': 0.3, 'max': 0.8})
+                    await element.fill('')
+                    # 使用人类行为模拟输入
+                    await self._human_type(element, self.password)
+                    self.logger.debug(f"使用选择器填写密码: {selector}")
+                    password_filled = True
+                    await self._random_delay({'min': 0.5, 'max': 1.5})
+                except Exception as e:
+                    self.logger.debug(f"填写密码失败: {e}")
 
             if not password_filled:
                 self.logger.error("无法找到密码输入框")
@@ -316,26 +343,34 @@ class AnyrouterAdapter(BaseAdapter):
 
             # 点击登录按钮
             submit_clicked = False
-            for selector in submit_selectors:
+            # 在点击前开始监听登录接口响应
+            login_response = ResponseSeen(r'/api/user/login', ok_only=False).attach(self.page)
+            selector, element = await self.wait_for_any_selector(
+                submit_selectors, timeout=5, sequential_timeout=5, description='提交按钮'
+            )
+            if element:
                 try:
-                    element = await self.page.wait_for_selector(selector, timeout=5000, state='visible')
-                    if element:
-                        await element.click()
-                        self.logger.debug(f"点击登录按钮: {selector}")
-                        submit_clicked = True
-                        break
-                except:
-                    continue
+                    await element.click()
+                    self.logger.debug(f"点击登录按钮: {selector}")
+                    submit_clicked = True
+                except Exception as e:
+                    self.logger.debug(f"点击提交按钮失败: {e}")
 
             if not submit_clicked:
+                login_response.detach(self.page)
                 self.logger.error("无法找到登录按钮")
                 await self.take_screenshot("login_failed_no_button")
                 return False
 
             # 等待登录完成（等待页面跳转）
             try:
-                # 等待导航完成或特定元素出现
-                await self.page.wait_for_load_state('networkidle', timeout=self.PAGE_LOAD_TIMEOUT)
+                # 等待登录接口返回或离开登录页（代替 networkidle）
+                await self.wait_for(
+                    login_response,
+                    UrlSettled(stable_ms=500, exclude=self.LOGIN_URL_PATTERN),
+                    timeout=self.ELEMENT_WAIT_TIMEOUT / 1000,
+                    description='登录结果'
+                )
                 await self.take_screenshot("after_login")
 
                 # 检查是否登录成功
@@ -369,7 +404,18 @@ class AnyrouterAdapter(BaseAdapter):
             console_url = f"{self.site_url}/console"
             self.logger.info(f"访问控制台: {console_url}")
             await self._goto_with_retry(console_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-            await self.page.wait_for_load_state('networkidle', timeout=self.PAGE_LOAD_TIMEOUT)
+
+            # 等待余额渲染或被重定向到登录页（代替 networkidle）
+            await self.wait_for(
+                UrlSettled(stable_ms=300, pattern=self.LOGIN_URL_PATTERN),
+                AllOf(UrlSettled(stable_ms=500), TextMatches(self.BALANCE_TEXT_PATTERN)),
+                timeout=self.ELEMENT_WAIT_TIMEOUT / 1000,
+                description='控制台余额'
+            )
+
+            # 被重定向到登录页说明会话已失效
+            if '/auth/login' in self.page.url or '/login' in self.page.url:
+                raise SessionExpiredError("访问控制台被重定向到登录页，会话已失效")
 
             await self.take_screenshot("console_page")
 
@@ -401,20 +447,19 @@ class AnyrouterAdapter(BaseAdapter):
                     'div:has-text("当前余额") + div',
                 ]
 
-                for selector in balance_selectors:
+                selector, element = await self.wait_for_any_selector(
+                    balance_selectors, timeout=3, sequential_timeout=3, description='余额元素'
+                )
+                if element:
                     try:
-                        element = await self.page.wait_for_selector(selector, timeout=3000, state='visible')
-                        if element:
-                            text = await element.text_content()
-                            # 从文本中提取金额
-                            match = re.search(r'\$?([\d,.]+)', text)
-                            if match:
-                                balance_text = f"${match.group(1)}"
-                                self.logger.info(f"从元素提取到余额: {balance_text}")
-                                break
+                        text = await element.text_content()
+                        # 从文本中提取金额
+                        match = re.search(r'\$?([\d,.]+)', text)
+                        if match:
+                            balance_text = f"${match.group(1)}"
+                            self.logger.info(f"从元素提取到余额: {balance_text}")
                     except Exception as e:
                         self.logger.debug(f"选择器 {selector} 失败: {e}")
-                        continue
 
             if balance_text:
                 return CheckinResult(
@@ -431,6 +476,9 @@ class AnyrouterAdapter(BaseAdapter):
                     {"balance": "未获取到"}
                 )
 
+        except SessionExpiredError:
+            raise
+
         except Exception as e:
             self.logger.error(f"获取账户信息出错: {str(e)}")
             await self.take_screenshot("checkin_exception")
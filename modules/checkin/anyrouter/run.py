@@ -88,7 +88,15 @@ async def run_anyrouter(
     browser_config = config.get('browser', {})
     headless = not debug if debug else browser_config.get('headless', True)
 
-    browser_manager = BrowserManager(headless=headless)
+    browser_manager = BrowserManager(
+        headless=headless,
+        endpoint=browser_config.get('endpoint'),
+        attach=not debug,
+        session_backend=browser_config.get('session_backend', 'sqlite'),
+        session_freshness_hours=browser_config.get('session_freshness_hours', 0)
+    )
+    browser_manager.set_resource_policy('anyrouter', browser_config.get('resource_blocking'))
+    browser_manager.enable_asset_cache(browser_config.get('asset_cache'))
 
     # 初始化结果存储
     results = {site_name: []}
@@ -173,6 +181,13 @@ async def run_anyrouter(
     logger.info(f"AnyRouter 签到完成")
     logger.info("=" * 60)
 
+    # 网络流量统计（启用资源拦截时）
+    network_stats = browser_manager.get_network_stats('anyrouter')
+    if network_stats:
+        logger.info(f"网络统计: {network_stats.format_summary()}")
+    if browser_manager.asset_cache:
+        logger.info(f"静态资源缓存: {browser_manager.asset_cache.format_summary()}")
+
     # 发送邮件通知
     email_config = config.get('notifications', {}).get('email', {})
     if email_config.get('enabled'):
@@ -219,10 +234,12 @@ async def process_account(
         context = await browser_manager.create_context('anyrouter', username)
 
         # 执行签到
-        result = await adapter.run(context)
+        result = await adapter.run(context, session_validity=browser_manager.session_validity)
 
         # 保存会话
-        await browser_manager.save_context(context, 'anyrouter', username)
+        await browser_manager.save_context(
+            context, 'anyrouter', username, auth_cookie_names=adapter.AUTH_COOKIE_NAMES
+        )
         await context.close()
 
         if result.success:
@@ -7,77 +7,19 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from core.base_adapter import BaseAdapter, CheckinResult
+from core.page_pool import PagePool
+from core.wait_strategy import ElementCountStable, SelectorPresent, UrlSettled, AllOf
 from modules.forum.linuxdo.ai_analyzer import AIAnalyzer
+from modules.forum.linuxdo.discourse_api import DiscourseClient, ChallengeRequired, TopicUnavailable
+from modules.forum.linuxdo.pipeline import TopicPipeline
+from modules.forum.linuxdo.crawl_state import CrawlState
+from modules.forum.linuxdo.dedup_index import DedupIndex
+from modules.forum.linuxdo.topic_cache import TopicCache
+from modules.forum.linuxdo.response_cache import ResponseCache
 import asyncio
 from typing import List, Dict, Any, Optional
 import os
 import json
-import hashlib
-from datetime import datetime, timedelta
-
-
-class TopicCache:
-    """帖子缓存管理器"""
-
-    def __init__(self, cache_file: str, cache_days: int = 7):
-        """初始化缓存管理器"""
-        self.cache_file = Path(cache_file)
-        self.cache_days = cache_days
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self._load_cache()
-
-    def _load_cache(self):
-        """加载缓存文件"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-                self._clean_expired()
-            except Exception:
-                self.cache = {}
-
-    def _save_cache(self):
-        """保存缓存到文件"""
-        try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
-
-    def _clean_expired(self):
-        """清理过期缓存"""
-        expiry_time = datetime.now() - timedelta(days=self.cache_days)
-        expired_keys = [
-            key for key, value in self.cache.items()
-            if datetime.fromisoformat(value.get('cached_at', '2000-01-01')) < expiry_time
-        ]
-        for key in expired_keys:
-            del self.cache[key]
-
-    def get_topic_id(self, topic: Dict[str, Any]) -> str:
-        """生成帖子唯一标识"""
-        link = topic.get('link', '')
-        return hashlib.md5(link.encode()).hexdigest()
-
-    def get(self, topic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """获取缓存的帖子分析结果"""
-        topic_id = self.get_topic_id(topic)
-        return self.cache.get(topic_id)
-
-    def set(self, topic: Dict[str, Any], analysis: Dict[str, Any]):
-        """缓存帖子分析结果"""
-        topic_id = self.get_topic_id(topic)
-        self.cache[topic_id] = {
-            'topic': topic,
-            'analysis': analysis,
-            'cached_at': datetime.now().isoformat()
-        }
-        self._save_cache()
-
-    def is_cached(self, topic: Dict[str, Any]) -> bool:
-        """检查帖子是否已缓存"""
-        return self.get_topic_id(topic) in self.cache
 
 
 class LinuxDoAdapter(BaseAdapter):
@@ -91,6 +33,29 @@ class LinuxDoAdapter(BaseAdapter):
     PAGE_LOAD_TIMEOUT = 60000
     ELEMENT_WAIT_TIMEOUT = 10000
 
+    # 帖子列表项和第一楼正文选择器
+    TOPIC_LIST_SELECTOR = '.topic-list-item, [data-topic-id]'
+    FIRST_POST_SELECTOR = '.topic-post:first-of-type .cooked, article.post:first-of-type .cooked'
+
+    # 第一楼正文最多保留的字符数（发给 AI 前再按 token 预算清理和截断）
+    CONTENT_MAX_CHARS = 6000
+
+    # 附带的高赞回复数（JSON 接口读取时），长帖分段总结时与正文一起分析
+    TOP_REPLIES = 5
+
+    # 并发读取帖子的页面数，以及单个页面导航多少次后回收
+    READ_CONCURRENCY = 3
+    PAGE_MAX_NAVIGATIONS = 20
+
+    # 并发 AI 分析数
+    AI_CONCURRENCY = 3
+
+    # 登录凭证 cookie（Discourse 登录 token）
+    AUTH_COOKIE_NAMES = ['_t']
+
+    # 手动导出的 cookies（见 COOKIES_LOGIN.md）
+    COOKIES_FILE = Path(__file__).parent / 'cookies.json'
+
     def __init__(
         self,
         site_url: str,
@@ -106,6 +71,9 @@ class LinuxDoAdapter(BaseAdapter):
         scroll_times: int = 3,
         scroll_interval: float = 2.0,
         fetch_priority_categories: bool = False,
+        fetch_engine: str = "http",
+        incremental: bool = True,
+        dedup: bool = True,
         # 过滤配置
         exclude_categories: Optional[List[str]] = None,
         exclude_keywords: Optional[List[str]] = None,
@@ -120,6 +88,14 @@ class LinuxDoAdapter(BaseAdapter):
         ai_model: str = "qwen-flash",
         ai_temperature: float = 0.7,
         ai_max_tokens: int = 800,
+        ai_content_token_budget: int = 1500,
+        ai_batch_size: int = 1,
+        ai_rate_limit: Optional[Dict[str, Any]] = None,
+        ai_response_cache: Optional[Dict[str, Any]] = None,
+        ai_ranking: Optional[Dict[str, Any]] = None,
+        ai_map_reduce: Optional[Dict[str, Any]] = None,
+        ai_endpoints: Optional[List[Dict[str, Any]]] = None,
+        ai_routing: Optional[Dict[str, Any]] = None,
         user_interests: Optional[List[str]] = None
     ):
         """
@@ -138,6 +114,9 @@ class LinuxDoAdapter(BaseAdapter):
             scroll_times: 滚动次数
             scroll_interval: 滚动间隔（秒）
             fetch_priority_categories: 是否获取优先分类的帖子
+            fetch_engine: 内容获取方式（http: JSON 接口，browser: 浏览器页面提取）
+            incremental: 是否增量抓取（只读取和分析上次运行后的新帖和有更新的帖子）
+            dedup: 是否检测近似重复帖子（每组转帖/重复帖只读取和分析一篇）
             exclude_categories: 排除的分类列表
             exclude_keywords: 排除的关键词列表
             priority_categories: 优先分类列表
@@ -149,7 +128,15 @@ class LinuxDoAdapter(BaseAdapter):
             ai_api_base: AI API 端点
             ai_model: AI 模型名称
             ai_temperature: AI 温度参数
-            ai_max_tokens: AI 最大生成长度
+            ai_max_tokens: AI 最大生成长度（总结时按正文长度自动减小）
+            ai_content_token_budget: 每个帖子正文放入提示词的 token 预算
+            ai_batch_size: 每次 AI 请求最多总结的帖子数（1 为逐个总结）
+            ai_rate_limit: AI 调用限流（rpm/tpm/max_in_flight，同一进程内共用）
+            ai_response_cache: AI 响应缓存配置（enabled/ttl_hours/max_entries）
+            ai_ranking: 推荐排序配置（top_k/skip_llm_confidence）
+            ai_map_reduce: 长帖分段总结配置（enabled/chunk_tokens/max_chunks/concurrency）
+            ai_endpoints: 备用 AI 接口列表（api_base/api_key/model/name）
+            ai_routing: 接口路由配置（hedge/deadline_seconds）
             user_interests: 用户兴趣列表
         """
         super().__init__(
@@ -169,7 +156,11 @@ class LinuxDoAdapter(BaseAdapter):
         self.scroll_times = scroll_times
         self.scroll_interval = scroll_interval
         self.fetch_priority_categories = fetch_priority_categories
+        self.fetch_engine = fetch_engine
+        self._discourse: Optional[DiscourseClient] = None
+        self._page_pool: Optional[PagePool] = None
         self.user_interests = user_interests
+        self.ai_batch_size = ai_batch_size
 
         # 保存过滤配置（使用默认值如果未提供）
         self.exclude_categories = set(exclude_categories or [
@@ -195,6 +186,26 @@ class LinuxDoAdapter(BaseAdapter):
             if ai_api_key and ai_api_key.startswith('${') and ai_api_key.endswith('}'):
                 env_var = ai_api_key[2:-1]
                 ai_api_key = os.getenv(env_var, '')
+            endpoints = []
+            for endpoint in ai_endpoints or []:
+                endpoint = dict(endpoint)
+                key = endpoint.get('api_key')
+                if key and key.startswith('${') and key.endswith('}'):
+                    endpoint['api_key'] = os.getenv(key[2:-1], '')
+                endpoints.append(endpoint)
+
+            rate_limit = ai_rate_limit or {}
+            response_cache_config = ai_response_cache or {}
+            ranking = ai_ranking or {}
+            map_reduce = ai_map_reduce or {}
+            routing = ai_routing or {}
+            response_cache = None
+            if response_cache_config.get('enabled', True):
+                response_cache = ResponseCache(
+                    str(PROJECT_ROOT / 'storage' / 'cache' / 'linuxdo_ai_responses.db'),
+                    ttl_hours=response_cache_config.get('ttl_hours', 168),
+                    max_entries=response_cache_config.get('max_entries', 2000)
+                )
 
             self.ai_analyzer = AIAnalyzer(
                 api_key=ai_api_key,
@@ -202,16 +213,264 @@ class LinuxDoAdapter(BaseAdapter):
                 model=ai_model,
                 temperature=ai_temperature,
                 max_tokens=ai_max_tokens,
-                logger=logger
+                content_token_budget=ai_content_token_budget,
+                logger=logger,
+                rate_limit_rpm=rate_limit.get('rpm', 60),
+                rate_limit_tpm=rate_limit.get('tpm', 100000),
+                max_in_flight=rate_limit.get('max_in_flight', 4),
+                response_cache=response_cache,
+                ranking_top_k=ranking.get('top_k', 20),
+                ranking_skip_confidence=ranking.get('skip_llm_confidence', 0.8),
+                map_reduce_enabled=map_reduce.get('enabled', True),
+                chunk_tokens=map_reduce.get('chunk_tokens', 1200),
+                max_chunks=map_reduce.get('max_chunks', 8),
+                map_reduce_concurrency=map_reduce.get('concurrency', 3),
+                endpoints=endpoints,
+                hedge=routing.get('hedge', True),
+                call_deadline=routing.get('deadline_seconds', 90)
             )
         else:
             # 创建一个禁用的 AI 分析器
             self.ai_analyzer = AIAnalyzer(api_key=None, logger=logger)
 
         # 初始化缓存（性能优化）
+        # AI 分析结果与账号无关，所有账号共用一个数据库；旧版按账号保存的 JSON 缓存首次运行时导入
         cache_dir = PROJECT_ROOT / 'storage' / 'cache'
-        cache_file = cache_dir / f'linuxdo_{username}_topics.json'
-        self.cache = TopicCache(str(cache_file), cache_days=7)
+        self.cache = TopicCache(
+            str(cache_dir / 'linuxdo_topics.db'),
+            cache_days=7,
+            logger=self.logger,
+            analysis_version=self.ai_analyzer.summary_version,
+            accepted_versions=self.ai_analyzer.summary_versions
+        )
+        legacy_cache_file = cache_dir / f'linuxdo_{username}_topics.json'
+        imported = self.cache.import_json(str(legacy_cache_file))
+        if imported is not None:
+            self.logger.info(f"已从 {legacy_cache_file.name} 导入 {imported} 条缓存")
+
+        # 增量抓取状态（按账号保存高水位）
+        self.crawl_state: Optional[CrawlState] = None
+        if incremental:
+            self.crawl_state = CrawlState(str(cache_dir / f'linuxdo_{username}_crawl.json'))
+
+        # 近似重复帖子索引（按账号保存）
+        self.dedup_index: Optional[DedupIndex] = None
+        if dedup:
+            self.dedup_index = DedupIndex(str(cache_dir / f'linuxdo_{username}_dedup.json'))
+
+    async def is_logged_in(self) -> bool:
+        """
+        检查是否已登录
+
+        通过 /session/current.json 接口判断，不需要加载页面
+        """
+        try:
+            cookies = await self.context.cookies(self.site_url)
+            if not any(c['name'] in self.AUTH_COOKIE_NAMES for c in cookies):
+                self.logger.debug("未找到登录 cookie (_t)")
+                return False
+
+            response = await self.context.request.get(
+                f"{self.site_url}/session/current.json",
+                headers={'Accept': 'application/json'},
+                timeout=self.ELEMENT_WAIT_TIMEOUT
+            )
+            if response.status != 200:
+                self.logger.debug(f"登录状态接口返回 {response.status}")
+                return False
+
+            data = await response.json()
+            return bool(data.get('current_user'))
+
+        except Exception as e:
+            self.logger.debug(f"检查登录状态失败: {str(e)}")
+            return False
+
+    async def login(self) -> bool:
+        """
+        登录站点
+
+        优先注入手动导出的 cookies（绕过 Cloudflare 验证），失效时尝试表单登录
+        """
+        if self.COOKIES_FILE.exists():
+            self.logger.info("尝试使用保存的 cookies 登录...")
+            try:
+                with open(self.COOKIES_FILE, 'r', encoding='utf-8') as f:
+                    cookies_data = json.load(f)
+
+                allowed_keys = {'name', 'value', 'domain', 'path', 'expires', 'httpOnly', 'secure', 'sameSite'}
+                cookies = [
+                    {k: v for k, v in c.items() if k in allowed_keys}
+                    for c in cookies_data.get('cookies', [])
+                ]
+                await self.context.add_cookies(cookies)
+
+                if await self.is_logged_in():
+                    self.logger.info("✓ Cookies 登录成功")
+                    return True
+                self.logger.warning("Cookies 已失效，尝试常规登录...")
+
+            except Exception as e:
+                self.logger.warning(f"加载 cookies 失败: {str(e)}，尝试常规登录...")
+
+        try:
+            await self.page.goto(f"{self.site_url}/login", wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+            await self.page.fill('#login-account-name', self.username, timeout=self.ELEMENT_WAIT_TIMEOUT)
+            await self.page.fill('#login-account-password', self.password, timeout=self.ELEMENT_WAIT_TIMEOUT)
+            await self.page.click('#login-button', timeout=self.ELEMENT_WAIT_TIMEOUT)
+
+            # 等待登录 cookie 写入
+            for _ in range(30):
+                cookies = await self.context.cookies(self.site_url)
+                if any(c['name'] in self.AUTH_COOKIE_NAMES for c in cookies):
+                    break
+                await asyncio.sleep(1)
+
+            if await self.is_logged_in():
+                return True
+
+            self.logger.error("表单登录失败（可能被 Cloudflare 拦截），请参考 COOKIES_LOGIN.md 导出 cookies")
+            await self.take_screenshot("login_failed")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"登录过程出错: {str(e)}")
+            await self.take_screenshot("login_exception")
+            return False
+
+    @property
+    def discourse(self) -> DiscourseClient:
+        """JSON 接口客户端（复用当前浏览器上下文的 cookies）"""
+        if self._discourse is None:
+            self._discourse = DiscourseClient(
+                self.context.request,
+                self.site_url,
+                logger=self.logger,
+                timeout=self.PAGE_LOAD_TIMEOUT
+            )
+        return self._discourse
+
+    @property
+    def page_pool(self) -> PagePool:
+        """页面池（列表和帖子页面都从这里借出，checkin 结束时关闭）"""
+        if self._page_pool is None:
+            self._page_pool = PagePool(
+                self.context,
+                size=self.READ_CONCURRENCY,
+                max_navigations=self.PAGE_MAX_NAVIGATIONS
+            )
+        return self._page_pool
+
+    async def _wait_topic_list(
+        self,
+        page,
+        description: str,
+        replaces: float,
+        min_count: int = 1,
+        timeout: Optional[float] = None
+    ) -> int:
+        """
+        等待帖子列表渲染完成（列表项数量稳定）
+
+        Args:
+            page: 页面
+            description: 等待描述
+            replaces: 被替换的固定等待时长（秒）
+            min_count: 最少帖子数（滚动加载时为滚动前数量 + 1）
+            timeout: 上限时间（秒），默认为元素等待超时
+
+        Returns:
+            当前帖子数
+        """
+        await self.wait_for(
+            ElementCountStable(self.TOPIC_LIST_SELECTOR, stable_ms=300, min_count=min_count),
+            timeout=timeout if timeout is not None else self.ELEMENT_WAIT_TIMEOUT / 1000,
+            replaces=replaces,
+            description=description,
+            page=page
+        )
+        return await page.locator(self.TOPIC_LIST_SELECTOR).count()
+
+    def _stop_paging(self, topic: Dict[str, Any]) -> bool:
+        """按活跃时间排序的列表翻页时，遇到上次处理过且未变化的帖子即停止"""
+        return bool(self.crawl_state) and self.crawl_state.is_stop_point(topic)
+
+    async def _reached_known_topics(self, page) -> bool:
+        """
+        滚动加载时检查已加载的列表中是否出现上次处理过且未变化的帖子（置顶帖除外）
+
+        Args:
+            page: 列表页面
+
+        Returns:
+            是否可以停止滚动
+        """
+        if not self.crawl_state:
+            return False
+        rows = await page.evaluate("""
+            () => Array.from(document.querySelectorAll('.topic-list-item'))
+                .filter(el => !el.classList.contains('pinned'))
+                .map(el => {
+                    const titleEl = el.querySelector('.title a, .topic-title a, a.title');
+                    const repliesEl = el.querySelector('.posts, .num.posts');
+                    return {
+                        link: titleEl ? titleEl.getAttribute('href') : '',
+                        replies: repliesEl ? repliesEl.textContent.trim() : ''
+                    };
+                })
+        """)
+        return any(self.crawl_state.is_stop_point(row) for row in rows if row['link'])
+
+    async def _pass_challenge(self) -> bool:
+        """
+        用浏览器打开首页通过人机验证
+
+        验证通过后 cf_clearance 写入上下文 cookies，JSON 接口随即可用
+
+        Returns:
+            是否通过验证
+        """
+        self.logger.info("接口触发人机验证，使用浏览器通过验证...")
+        try:
+            await self.page.goto(self.site_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+            for _ in range(15):
+                cookies = await self.context.cookies(self.site_url)
+                if any(c['name'] == 'cf_clearance' for c in cookies):
+                    return True
+                await asyncio.sleep(1)
+        except Exception as e:
+            self.logger.debug(f"人机验证页面加载失败: {str(e)}")
+        return False
+
+    async def _fetch_via_http(self, description: str, fetch):
+        """
+        通过 JSON 接口获取数据
+
+        遇到人机验证时先用浏览器通过验证再重试一次，仍失败则本次运行改用浏览器页面提取
+
+        Args:
+            description: 数据描述（用于日志）
+            fetch: 无参数的协程函数
+
+        Returns:
+            接口结果，未启用或失败时返回 None（调用方回退到页面提取）
+        """
+        if self.fetch_engine != 'http':
+            return None
+
+        for attempt in range(2):
+            try:
+                return await fetch()
+            except ChallengeRequired as e:
+                if attempt == 0 and await self._pass_challenge():
+                    continue
+                self.logger.warning(f"获取{description}遇到人机验证（{str(e)}），本次运行改用浏览器页面提取")
+                self.fetch_engine = 'browser'
+                return None
+            except Exception as e:
+                self.logger.warning(f"通过接口获取{description}失败: {str(e)}，回退到浏览器页面提取")
+                return None
+        return None
 
     def _calculate_topic_score(self, topic: Dict[str, Any]) -> float:
         """
@@ -385,75 +644,70 @@ class LinuxDoAdapter(BaseAdapter):
         执行签到操作
 
         优化方案：
-        - 串行获取帖子列表（避免触发限制）
-        - 并发读取内容和 AI 分析（提速）
-        - 使用缓存减少重复分析
+        - 串行获取帖子列表（避免触发限制），每个列表过滤后立即进入读取队列
+        - 内容读取（页面池中的独立页面）和 AI 分析各自限流并发，读到内容立即分析
+        - 读取前先查缓存：已分析且回复数未增加的帖子直接复用，读取名额留给新帖子
+        - 增量抓取：列表翻页到上次处理过的帖子即停止，只读取和分析新帖和有更新的帖子
+        - 近似重复检测：转帖和重复帖只读取和分析一篇，其余记为相关帖子
         """
         try:
-            # 串行获取帖子列表
-            self.logger.info(f"获取帖子列表...")
-            latest_topics_raw = await self.get_latest_topics(limit=self.latest_limit)
-            await asyncio.sleep(0.3)  # 减少请求间隔
-
-            hot_topics_raw = await self.get_hot_topics(limit=self.hot_limit)
-            await asyncio.sleep(0.3)
+            if self.crawl_state:
+                self.crawl_state.reset_counts()
 
-            # 如果启用了优先分类获取
-            category_topics_raw = []
+            # 串行获取帖子列表
+            # 列表 → 过滤 → 读取 → AI 分析以流水线方式并行推进
+            sources = [
+                ('latest', lambda: self.get_latest_topics(limit=self.latest_limit)),
+                ('hot', lambda: self.get_hot_topics(limit=self.hot_limit)),
+            ]
             if self.fetch_priority_categories and self.priority_categories:
-                self.logger.info(f"获取优先分类帖子...")
                 for category in list(self.priority_categories)[:2]:
-                    try:
-                        topics = await self.get_category_topics(category, limit=15)
-                        category_topics_raw.extend(topics)
-                        await asyncio.sleep(0.3)
-                    except Exception as e:
-                        self.logger.debug(f"分类 '{category}' 获取失败: {str(e)}")
-
-            # 应用内容过滤
-            latest_topics = self._filter_quality_topics(latest_topics_raw)
-            hot_topics = self._filter_quality_topics(hot_topics_raw)
-            category_topics = self._filter_quality_topics(category_topics_raw) if category_topics_raw else []
-
-            # 合并并去重
-            all_topics_raw = latest_topics + hot_topics + category_topics
-            seen = set()
-            all_topics = []
-            for t in all_topics_raw:
-                if t['link'] not in seen:
-                    seen.add(t['link'])
-                    all_topics.append(t)
-
-            # 按评分排序
-            all_topics.sort(key=lambda t: t.get('quality_score', 0), reverse=True)
-            self.logger.info(f"去重后共 {len(all_topics)} 个帖子")
+                    sources.append(
+                        ('category', lambda category=category: self.get_category_topics(category, limit=15))
+                    )
 
-            # 并发读取帖子内容（限流避免触发反爬）
-            self.logger.info(f"读取帖子内容（{self.read_limit} 条）...")
-            read_count = min(self.read_limit, len(all_topics))
-            semaphore = asyncio.Semaphore(3)  # 最多3个并发
-
-            async def fetch_with_limit(topic):
-                async with semaphore:
-                    await asyncio.sleep(0.3)  # 减少延迟
-                    return await self.get_topic_content(topic['link'])
-
-            # 使用 asyncio.gather 并发获取
-            content_tasks = [fetch_with_limit(topic) for topic in all_topics[:read_count]]
-            contents = await asyncio.gather(*content_tasks, return_exceptions=True)
-
-            # 处理结果
-            topics_with_content = []
-            for topic, content in zip(all_topics[:read_count], contents):
-                if isinstance(content, Exception):
-                    self.logger.debug(f"内容获取失败: {topic['title'][:30]}")
-                    continue
-                if content and content.get('first_post', '').strip():
-                    topic_with_content = topic.copy()
-                    topic_with_content['content_summary'] = content
-                    topics_with_content.append(topic_with_content)
+            self.logger.info(
+                f"获取帖子列表并流水线处理（读取 {self.read_limit} 条，AI 分析 {self.ai_limit} 条）..."
+            )
+            pipeline = TopicPipeline(
+                self,
+                read_limit=self.read_limit,
+                ai_limit=self.ai_limit,
+                read_concurrency=self.READ_CONCURRENCY,
+                ai_concurrency=self.AI_CONCURRENCY,
+                crawl_state=self.crawl_state,
+                ai_batch_size=self.ai_batch_size,
+                dedup=self.dedup_index
+            )
+            outcome = await pipeline.run(sources)
+
+            latest_topics = outcome['lists'].get('latest', [])
+            hot_topics = outcome['lists'].get('hot', [])
+            category_topics = outcome['lists'].get('category', [])
+            all_topics = outcome['all_topics']
+            topics_with_content = outcome['topics_with_content']
+            ai_summaries = outcome['ai_summaries']
+            cached_count = outcome['cached_count']
 
+            self.logger.info(f"去重后共 {len(all_topics)} 个帖子")
             self.logger.info(f"成功读取 {len(topics_with_content)} 个帖子内容")
+            self.logger.info(f"AI分析完成: {len(ai_summaries)} 个（{cached_count} 个使用缓存）")
+            self.logger.info(f"流水线耗时: {pipeline.format_summary()}")
+            self.logger.info(f"分析缓存: {self.cache.format_summary()}")
+
+            # 记录本次已处理的帖子（读取失败、超出名额和 AI 调用失败的帖子不记录，下次运行仍会处理）
+            crawl_stats = None
+            if self.crawl_state:
+                self.crawl_state.record(outcome['processed'])
+                self.crawl_state.save()
+                crawl_stats = self.crawl_state.to_dict()
+                self.logger.info(f"增量抓取: {self.crawl_state.format_summary()}")
+
+            dedup_stats = None
+            if self.dedup_index:
+                self.dedup_index.save()
+                dedup_stats = self.dedup_index.to_dict()
+                self.logger.info(f"近似重复: {self.dedup_index.format_summary()}")
 
             # 将带内容的帖子更新回 all_topics（通过链接匹配）
             content_map = {t['link']: t for t in topics_with_content}
@@ -469,46 +723,6 @@ class LinuxDoAdapter(BaseAdapter):
                 if topic['link'] in content_map:
                     hot_topics[i] = content_map[topic['link']]
 
-            # 缓存+并发AI分析
-            self.logger.info(f"AI 分析（{self.ai_limit} 个帖子）...")
-            ai_summaries = []
-            cached_count = 0
-
-            # 分离缓存和需要分析的帖子
-            to_analyze = []
-            for topic in topics_with_content[:self.ai_limit]:
-                cached_data = self.cache.get(topic)
-                if cached_data:
-                    topic['ai_summary'] = cached_data.get('analysis', {})
-                    ai_summaries.append(topic)
-                    cached_count += 1
-                else:
-                    content_text = topic.get('content_summary', {}).get('first_post', '')
-                    if content_text and len(content_text) > 100:
-                        to_analyze.append(topic)
-
-            # 并发分析未缓存的帖子
-            if to_analyze:
-                self.logger.info(f"分析 {len(to_analyze)} 个新帖子（{cached_count} 个使用缓存）")
-                analysis_tasks = [
-                    self.ai_analyzer.summarize_topic(
-                        topic,
-                        topic.get('content_summary', {}).get('first_post', '')
-                    )
-                    for topic in to_analyze
-                ]
-                ai_results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
-
-                for topic, ai_result in zip(to_analyze, ai_results):
-                    if not isinstance(ai_result, Exception):
-                        topic['ai_summary'] = ai_result
-                        ai_summaries.append(topic)
-                        self.cache.set(topic, ai_result)
-
-                self.logger.info(f"AI分析完成: {len(ai_summaries)} 个")
-            elif cached_count > 0:
-                self.logger.info(f"全部使用缓存: {cached_count} 个帖子")
-
             # 使用 AI 生成推荐列表
             self.logger.info("生成推荐列表...")
             user_profile = {'interests': self.user_interests} if self.user_interests else None
@@ -522,7 +736,8 @@ class LinuxDoAdapter(BaseAdapter):
                 latest_topics,
                 hot_topics,
                 ai_summaries,
-                recommended_topics
+                recommended_topics,
+                crawl_stats
             )
 
             return CheckinResult(
@@ -535,6 +750,11 @@ class LinuxDoAdapter(BaseAdapter):
                     "topics_with_content": topics_with_content,
                     "ai_summaries": ai_summaries,
                     "recommended_topics": recommended_topics[:10],  # 只保留前10个推荐
+                    "crawl_stats": crawl_stats,
+                    "dedup_stats": dedup_stats,
+                    "cache_stats": self.cache.to_dict(),
+                    "ai_stats": self.ai_analyzer.call_stats.to_dict(),
+                    "ai_routing": self.ai_analyzer.router.to_dict(),
                     "summary": summary
                 }
             )
@@ -544,6 +764,21 @@ class LinuxDoAdapter(BaseAdapter):
             await self.take_screenshot("checkin_exception")
             return CheckinResult(False, f"获取帖子信息出错: {str(e)}")
 
+        finally:
+            if self._page_pool:
+                self.logger.debug(f"页面池: {self._page_pool.format_summary()}")
+                await self._page_pool.close()
+                self._page_pool = None
+            if self.ai_analyzer.call_stats.calls:
+                self.logger.info(f"AI 调用: {self.ai_analyzer.call_stats.format_summary()}")
+                self.logger.debug(f"AI 限流器（进程内共用）: {self.ai_analyzer.governor.format_summary()}")
+                router = self.ai_analyzer.router
+                if len(router.endpoints) > 1 or router.deadline_exceeded:
+                    self.logger.info(f"AI 接口路由: {router.format_summary()}")
+            if self.ai_analyzer.response_cache:
+                self.logger.info(f"AI 响应缓存: {self.ai_analyzer.response_cache.format_summary()}")
+            await self.ai_analyzer.aclose()
+
     async def get_latest_topics(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         获取最新帖子列表（支持滚动加载）
@@ -554,82 +789,92 @@ class LinuxDoAdapter(BaseAdapter):
         Returns:
             帖子列表
         """
+        topics = await self._fetch_via_http(
+            "最新帖子",
+            lambda: self.discourse.list_topics('/latest.json', limit, stop_when=self._stop_paging)
+        )
+        if topics is not None:
+            self.logger.info(f"获取到 {len(topics)} 个最新帖子")
+            return topics
+
         try:
-            # 访问最新页面
-            latest_url = f"{self.site_url}/latest"
-            await self.page.goto(latest_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-            await asyncio.sleep(2)
-
-            # 如果启用了滚动加载，滚动页面加载更多内容
-            if self.enable_scroll_loading:
-                self.logger.debug(f"开始滚动加载更多帖子（{self.scroll_times}次）...")
-                for i in range(self.scroll_times):
-                    # 滚动到页面底部
-                    await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(self.scroll_interval)
-
-                    # 检查是否还有新内容
-                    current_count = await self.page.evaluate(
-                        "document.querySelectorAll('.topic-list-item, [data-topic-id]').length"
-                    )
-                    self.logger.debug(f"  滚动 {i+1}/{self.scroll_times}，当前帖子数：{current_count}")
-
-                    # 如果已经达到目标数量，可以提前退出
-                    if current_count >= limit:
-                        self.logger.debug(f"  已达到目标数量 {limit}，停止滚动")
-                        break
-
-            await self.take_screenshot("latest_topics")
-
-            # 使用 JavaScript 提取帖子信息
-            topics = await self.page.evaluate(f"""
-                (limit) => {{
-                    const topics = [];
-                    const topicElements = document.querySelectorAll('.topic-list-item, [data-topic-id]');
-
-                    topicElements.forEach((el, idx) => {{
-                        if (idx >= limit) return;
-
-                        // 标题和链接
-                        const titleEl = el.querySelector('.title a, .topic-title a, a.title');
-                        const title = titleEl ? titleEl.textContent.trim() : '';
-                        const link = titleEl ? titleEl.getAttribute('href') : '';
-
-                        // 作者
-                        const authorEl = el.querySelector('.topic-poster a, .author a');
-                        const author = authorEl ? authorEl.getAttribute('data-user-card') || authorEl.textContent.trim() : '';
-
-                        // 回复数和浏览数
-                        const repliesEl = el.querySelector('.posts, .num.posts');
-                        const replies = repliesEl ? repliesEl.textContent.trim() : '0';
-
-                        const viewsEl = el.querySelector('.views, .num.views');
-                        const views = viewsEl ? viewsEl.textContent.trim() : '0';
-
-                        // 最后活动时间
-                        const activityEl = el.querySelector('.age.activity a, time');
-                        const lastActivity = activityEl ? activityEl.getAttribute('title') || activityEl.textContent.trim() : '';
-
-                        // 分类
-                        const categoryEl = el.querySelector('.category, .badge-category');
-                        const category = categoryEl ? categoryEl.textContent.trim() : '';
-
-                        if (title && link) {{
-                            topics.push({{
-                                title,
-                                link,
-                                author,
-                                replies,
-                                views,
-                                lastActivity,
-                                category
-                            }});
-                        }}
-                    }});
-
-                    return topics;
-                }}
-            """, limit)
+            async with self.page_pool.page() as page:
+                # 访问最新页面
+                latest_url = f"{self.site_url}/latest"
+                await page.goto(latest_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+                current_count = await self._wait_topic_list(page, '最新帖子列表', replaces=2)
+
+                # 如果启用了滚动加载，滚动页面加载更多内容
+                if self.enable_scroll_loading:
+                    self.logger.debug(f"开始滚动加载更多帖子（{self.scroll_times}次）...")
+                    for i in range(self.scroll_times):
+                        # 滚动到页面底部
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        current_count = await self._wait_topic_list(
+                            page, '滚动加载', replaces=self.scroll_interval,
+                            min_count=current_count + 1, timeout=self.scroll_interval
+                        )
+                        self.logger.debug(f"  滚动 {i+1}/{self.scroll_times}，当前帖子数：{current_count}")
+
+                        # 如果已经达到目标数量，可以提前退出
+                        if current_count >= limit:
+                            self.logger.debug(f"  已达到目标数量 {limit}，停止滚动")
+                            break
+                        if await self._reached_known_topics(page):
+                            self.logger.debug("  已到达上次处理过的帖子，停止滚动")
+                            break
+
+                await self.take_screenshot("latest_topics", page)
+
+                # 使用 JavaScript 提取帖子信息
+                topics = await page.evaluate(f"""
+                    (limit) => {{
+                        const topics = [];
+                        const topicElements = document.querySelectorAll('.topic-list-item, [data-topic-id]');
+
+                        topicElements.forEach((el, idx) => {{
+                            if (idx >= limit) return;
+
+                            // 标题和链接
+                            const titleEl = el.querySelector('.title a, .topic-title a, a.title');
+                            const title = titleEl ? titleEl.textContent.trim() : '';
+                            const link = titleEl ? titleEl.getAttribute('href') : '';
+
+                            // 作者
+                            const authorEl = el.querySelector('.topic-poster a, .author a');
+                            const author = authorEl ? authorEl.getAttribute('data-user-card') || authorEl.textContent.trim() : '';
+
+                            // 回复数和浏览数
+                            const repliesEl = el.querySelector('.posts, .num.posts');
+                            const replies = repliesEl ? repliesEl.textContent.trim() : '0';
+
+                            const viewsEl = el.querySelector('.views, .num.views');
+                            const views = viewsEl ? viewsEl.textContent.trim() : '0';
+
+                            // 最后活动时间
+                            const activityEl = el.querySelector('.age.activity a, time');
+                            const lastActivity = activityEl ? activityEl.getAttribute('title') || activityEl.textContent.trim() : '';
+
+                            // 分类
+                            const categoryEl = el.querySelector('.category, .badge-category');
+                            const category = categoryEl ? categoryEl.textContent.trim() : '';
+
+                            if (title && link) {{
+                                topics.push({{
+                                    title,
+                                    link,
+                                    author,
+                                    replies,
+                                    views,
+                                    lastActivity,
+                                    category
+                                }});
+                            }}
+                        }});
+
+                        return topics;
+                    }}
+                """, limit)
 
             self.logger.info(f"获取到 {len(topics)} 个最新帖子")
             return topics
@@ -648,74 +893,81 @@ class LinuxDoAdapter(BaseAdapter):
         Returns:
             帖子列表
         """
-        try:
-            # 访问热门页面
-            hot_url = f"{self.site_url}/top"
-            await self.page.goto(hot_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-            await asyncio.sleep(2)
-
-            # 如果启用了滚动加载，滚动页面加载更多内容
-            if self.enable_scroll_loading:
-                self.logger.debug(f"开始滚动加载更多热门帖子（{self.scroll_times}次）...")
-                for i in range(self.scroll_times):
-                    await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(self.scroll_interval)
-
-                    current_count = await self.page.evaluate(
-                        "document.querySelectorAll('.topic-list-item, [data-topic-id]').length"
-                    )
-                    self.logger.debug(f"  滚动 {i+1}/{self.scroll_times}，当前帖子数：{current_count}")
-
-                    if current_count >= limit:
-                        self.logger.debug(f"  已达到目标数量 {limit}，停止滚动")
-                        break
-
-            await self.take_screenshot("hot_topics")
-
-            # 使用与 get_latest_topics 相同的提取逻辑
-            topics = await self.page.evaluate(f"""
-                (limit) => {{
-                    const topics = [];
-                    const topicElements = document.querySelectorAll('.topic-list-item, [data-topic-id]');
-
-                    topicElements.forEach((el, idx) => {{
-                        if (idx >= limit) return;
-
-                        const titleEl = el.querySelector('.title a, .topic-title a, a.title');
-                        const title = titleEl ? titleEl.textContent.trim() : '';
-                        const link = titleEl ? titleEl.getAttribute('href') : '';
-
-                        const authorEl = el.querySelector('.topic-poster a, .author a');
-                        const author = authorEl ? authorEl.getAttribute('data-user-card') || authorEl.textContent.trim() : '';
-
-                        const repliesEl = el.querySelector('.posts, .num.posts');
-                        const replies = repliesEl ? repliesEl.textContent.trim() : '0';
-
-                        const viewsEl = el.querySelector('.views, .num.views');
-                        const views = viewsEl ? viewsEl.textContent.trim() : '0';
-
-                        const activityEl = el.querySelector('.age.activity a, time');
-                        const lastActivity = activityEl ? activityEl.getAttribute('title') || activityEl.textContent.trim() : '';
-
-                        const categoryEl = el.querySelector('.category, .badge-category');
-                        const category = categoryEl ? categoryEl.textContent.trim() : '';
-
-                        if (title && link) {{
-                            topics.push({{
-                                title,
-                                link,
-                                author,
-                                replies,
-                                views,
-                                lastActivity,
-                                category
-                            }});
-                        }}
-                    }});
+        topics = await self._fetch_via_http(
+            "热门帖子", lambda: self.discourse.list_topics('/top.json', limit)
+        )
+        if topics is not None:
+            self.logger.info(f"获取到 {len(topics)} 个热门帖子")
+            return topics
 
-                    return topics;
-                }}
-            """, limit)
+        try:
+            async with self.page_pool.page() as page:
+                # 访问热门页面
+                hot_url = f"{self.site_url}/top"
+                await page.goto(hot_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+                current_count = await self._wait_topic_list(page, '热门帖子列表', replaces=2)
+
+                # 如果启用了滚动加载，滚动页面加载更多内容
+                if self.enable_scroll_loading:
+                    self.logger.debug(f"开始滚动加载更多热门帖子（{self.scroll_times}次）...")
+                    for i in range(self.scroll_times):
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        current_count = await self._wait_topic_list(
+                            page, '滚动加载', replaces=self.scroll_interval,
+                            min_count=current_count + 1, timeout=self.scroll_interval
+                        )
+                        self.logger.debug(f"  滚动 {i+1}/{self.scroll_times}，当前帖子数：{current_count}")
+
+                        if current_count >= limit:
+                            self.logger.debug(f"  已达到目标数量 {limit}，停止滚动")
+                            break
+
+                await self.take_screenshot("hot_topics", page)
+
+                # 使用与 get_latest_topics 相同的提取逻辑
+                topics = await page.evaluate(f"""
+                    (limit) => {{
+                        const topics = [];
+                        const topicElements = document.querySelectorAll('.topic-list-item, [data-topic-id]');
+
+                        topicElements.forEach((el, idx) => {{
+                            if (idx >= limit) return;
+
+                            const titleEl = el.querySelector('.title a, .topic-title a, a.title');
+                            const title = titleEl ? titleEl.textContent.trim() : '';
+                            const link = titleEl ? titleEl.getAttribute('href') : '';
+
+                            const authorEl = el.querySelector('.topic-poster a, .author a');
+                            const author = authorEl ? authorEl.getAttribute('data-user-card') || authorEl.textContent.trim() : '';
+
+                            const repliesEl = el.querySelector('.posts, .num.posts');
+                            const replies = repliesEl ? repliesEl.textContent.trim() : '0';
+
+                            const viewsEl = el.querySelector('.views, .num.views');
+                            const views = viewsEl ? viewsEl.textContent.trim() : '0';
+
+                            const activityEl = el.querySelector('.age.activity a, time');
+                            const lastActivity = activityEl ? activityEl.getAttribute('title') || activityEl.textContent.trim() : '';
+
+                            const categoryEl = el.querySelector('.category, .badge-category');
+                            const category = categoryEl ? categoryEl.textContent.trim() : '';
+
+                            if (title && link) {{
+                                topics.push({{
+                                    title,
+                                    link,
+                                    author,
+                                    replies,
+                                    views,
+                                    lastActivity,
+                                    category
+                                }});
+                            }}
+                        }});
+
+                        return topics;
+                    }}
+                """, limit)
 
             self.logger.info(f"获取到 {len(topics)} 个热门帖子")
             return topics
@@ -735,80 +987,97 @@ class LinuxDoAdapter(BaseAdapter):
         Returns:
             帖子列表
         """
-        try:
-            # 根据分类名称构建 URL（Discourse 的分类 URL 格式）
-            # Linux.do 的分类 URL 格式: https://linux.do/c/{category-slug}/{id}
-            # 需要先映射分类名称到 slug
-            category_map = {
-                '福利羊毛': 'welfare',
-                '优惠活动': 'promotion',
-                '工具分享': 'tools',
-                '开发调优': 'dev',
-                '资源荟萃': 'resources'
-            }
+        # 根据分类名称构建 URL（Discourse 的分类 URL 格式）
+        # Linux.do 的分类 URL 格式: https://linux.do/c/{category-slug}/{id}
+        # 需要先映射分类名称到 slug
+        category_map = {
+            '福利羊毛': 'welfare',
+            '优惠活动': 'promotion',
+            '工具分享': 'tools',
+            '开发调优': 'dev',
+            '资源荟萃': 'resources'
+        }
 
-            category_slug = category_map.get(category_name, category_name.lower())
+        category_slug = category_map.get(category_name, category_name.lower())
 
+        topics = await self._fetch_via_http(
+            f"分类 '{category_name}' 帖子",
+            lambda: self.discourse.list_topics(
+                '/latest.json', limit, params={'category': category_slug}, stop_when=self._stop_paging
+            )
+        )
+        if topics is not None:
+            self.logger.info(f"从分类 '{category_name}' 获取到 {len(topics)} 个帖子")
+            return topics
+
+        try:
             # 尝试通过搜索找到分类
             # 或者直接访问分类页面（如果知道ID）
             # 这里我们使用搜索功能来找到分类帖子
             search_url = f"{self.site_url}/latest?category={category_slug}"
 
-            self.logger.debug(f"访问分类页面: {search_url}")
-            await self.page.goto(search_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
-            await asyncio.sleep(2)
-
-            # 滚动加载更多
-            if self.enable_scroll_loading:
-                self.logger.debug(f"在分类 '{category_name}' 中滚动加载...")
-                for i in range(self.scroll_times):
-                    await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(self.scroll_interval)
-
-            # 提取帖子
-            topics = await self.page.evaluate(f"""
-                (limit) => {{
-                    const topics = [];
-                    const topicElements = document.querySelectorAll('.topic-list-item, [data-topic-id]');
-
-                    topicElements.forEach((el, idx) => {{
-                        if (idx >= limit) return;
-
-                        const titleEl = el.querySelector('.title a, .topic-title a, a.title');
-                        const title = titleEl ? titleEl.textContent.trim() : '';
-                        const link = titleEl ? titleEl.getAttribute('href') : '';
-
-                        const authorEl = el.querySelector('.topic-poster a, .author a');
-                        const author = authorEl ? authorEl.getAttribute('data-user-card') || authorEl.textContent.trim() : '';
-
-                        const repliesEl = el.querySelector('.posts, .num.posts');
-                        const replies = repliesEl ? repliesEl.textContent.trim() : '0';
-
-                        const viewsEl = el.querySelector('.views, .num.views');
-                        const views = viewsEl ? viewsEl.textContent.trim() : '0';
-
-                        const activityEl = el.querySelector('.age.activity a, time');
-                        const lastActivity = activityEl ? activityEl.getAttribute('title') || activityEl.textContent.trim() : '';
-
-                        const categoryEl = el.querySelector('.category, .badge-category');
-                        const category = categoryEl ? categoryEl.textContent.trim() : '';
-
-                        if (title && link) {{
-                            topics.push({{
-                                title,
-                                link,
-                                author,
-                                replies,
-                                views,
-                                lastActivity,
-                                category
-                            }});
-                        }}
-                    }});
-
-                    return topics;
-                }}
-            """, limit)
+            async with self.page_pool.page() as page:
+                self.logger.debug(f"访问分类页面: {search_url}")
+                await page.goto(search_url, wait_until='domcontentloaded', timeout=self.PAGE_LOAD_TIMEOUT)
+                current_count = await self._wait_topic_list(page, '分类帖子列表', replaces=2)
+
+                # 滚动加载更多
+                if self.enable_scroll_loading:
+                    self.logger.debug(f"在分类 '{category_name}' 中滚动加载...")
+                    for i in range(self.scroll_times):
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        current_count = await self._wait_topic_list(
+                            page, '滚动加载', replaces=self.scroll_interval,
+                            min_count=current_count + 1, timeout=self.scroll_interval
+                        )
+                        if await self._reached_known_topics(page):
+                            self.logger.debug("  已到达上次处理过的帖子，停止滚动")
+                            break
+
+                # 提取帖子
+                topics = await page.evaluate(f"""
+                    (limit) => {{
+                        const topics = [];
+                        const topicElements = document.querySelectorAll('.topic-list-item, [data-topic-id]');
+
+                        topicElements.forEach((el, idx) => {{
+                            if (idx >= limit) return;
+
+                            const titleEl = el.querySelector('.title a, .topic-title a, a.title');
+                            const title = titleEl ? titleEl.textContent.trim() : '';
+                            const link = titleEl ? titleEl.getAttribute('href') : '';
+
+                            const authorEl = el.querySelector('.topic-poster a, .author a');
+                            const author = authorEl ? authorEl.getAttribute('data-user-card') || authorEl.textContent.trim() : '';
+
+                            const repliesEl = el.querySelector('.posts, .num.posts');
+                            const replies = repliesEl ? repliesEl.textContent.trim() : '0';
+
+                            const viewsEl = el.querySelector('.views, .num.views');
+                            const views = viewsEl ? viewsEl.textContent.trim() : '0';
+
+                            const activityEl = el.querySelector('.age.activity a, time');
+                            const lastActivity = activityEl ? activityEl.getAttribute('title') || activityEl.textContent.trim() : '';
+
+                            const categoryEl = el.querySelector('.category, .badge-category');
+                            const category = categoryEl ? categoryEl.textContent.trim() : '';
+
+                            if (title && link) {{
+                                topics.push({{
+                                    title,
+                                    link,
+                                    author,
+                                    replies,
+                                    views,
+                                    lastActivity,
+                                    category
+                                }});
+                            }}
+                        }});
+
+                        return topics;
+                    }}
+                """, limit)
 
             self.logger.info(f"从分类 '{category_name}' 获取到 {len(topics)} 个帖子")
             return topics
@@ -827,105 +1096,133 @@ class LinuxDoAdapter(BaseAdapter):
 
         Returns:
             帖子内容摘要字典，包含：
-            - first_post: 第一楼内容（截取前500字符）
+            - first_post: 第一楼内容（最多 CONTENT_MAX_CHARS 字符）
             - key_points: 关键信息点列表
-        """
-        topic_url = f"{self.site_url}{topic_link}"
+            - replies: 高赞回复列表（仅 JSON 接口读取时提供）
+            页面加载成功但正文为空（或帖子不可访问）时 first_post 为空字符串
 
-        for attempt in range(max_retries + 1):
+        Raises:
+            Exception: 重试后仍无法加载页面（调用方视为读取失败，下次运行重新读取）
+        """
+        async def fetch_content():
             try:
-                # 访问帖子页面
-                self.logger.debug(f"访问帖子: {topic_url} (尝试 {attempt + 1}/{max_retries + 1})")
-
-                # 使用 networkidle 等待策略，确保页面完全加载
-                await self.page.goto(
-                    topic_url,
-                    wait_until='domcontentloaded',
-                    timeout=self.PAGE_LOAD_TIMEOUT
+                return await self.discourse.get_topic_content(
+                    topic_link, max_chars=self.CONTENT_MAX_CHARS, top_replies=self.TOP_REPLIES
                 )
+            except TopicUnavailable as e:
+                # 无权限或已删除的帖子：跳过这一个帖子，不回退到页面提取，也不切换获取方式
+                self.logger.debug(f"帖子不可访问，跳过: {str(e)}")
+                return {"first_post": "", "key_points": [], "replies": []}
 
-                # 增加等待时间，确保页面稳定
-                await asyncio.sleep(3)
-
-                # 检查是否发生了重定向
-                current_url = self.page.url
-                if topic_url not in current_url and topic_link not in current_url:
-                    self.logger.debug(f"检测到重定向: {topic_url} -> {current_url}")
-                    # 如果重定向了，再等待一下
-                    await asyncio.sleep(2)
-
-                # 提取帖子内容
-                content_data = await self.page.evaluate("""
-                    () => {
-                        // 获取第一楼内容
-                        const firstPost = document.querySelector('.topic-post:first-of-type .cooked, article.post:first-of-type .cooked');
-                        let firstPostText = '';
+        content = await self._fetch_via_http("帖子内容", fetch_content)
+        if content is not None:
+            return content
 
-                        if (firstPost) {
-                            // 移除代码块和引用块，只保留主要文本
-                            const clone = firstPost.cloneNode(true);
-
-                            // 移除代码块
-                            clone.querySelectorAll('pre, code').forEach(el => el.remove());
-
-                            // 移除引用
-                            clone.querySelectorAll('blockquote').forEach(el => el.remove());
-
-                            // 移除图片
-                            clone.querySelectorAll('img').forEach(el => el.remove());
+        topic_url = f"{self.site_url}{topic_link}"
 
-                            firstPostText = clone.textContent.trim();
+        for attempt in range(max_retries + 1):
+            try:
+                # 借出独立页面访问帖子（并发读取时各自导航，互不干扰）
+                async with self.page_pool.page() as page:
+                    self.logger.debug(f"访问帖子: {topic_url} (尝试 {attempt + 1}/{max_retries + 1})")
+
+                    await page.goto(
+                        topic_url,
+                        wait_until='domcontentloaded',
+                        timeout=self.PAGE_LOAD_TIMEOUT
+                    )
 
-                            // 截取前800字符
-                            if (firstPostText.length > 800) {
-                                firstPostText = firstPostText.substring(0, 800) + '...';
-                            }
-                        }
+                    # 等待重定向完成且第一楼正文渲染（代替固定等待 3 秒，重定向时再等 2 秒）
+                    await self.wait_for(
+                        AllOf(UrlSettled(stable_ms=200), SelectorPresent(self.FIRST_POST_SELECTOR)),
+                        timeout=self.ELEMENT_WAIT_TIMEOUT / 1000,
+                        replaces=3,
+                        description='帖子正文',
+                        page=page
+                    )
 
-                        // 尝试提取关键信息（列表项、加粗文本等）
-                        const keyPoints = [];
-                        if (firstPost) {
-                            // 提取列表项
-                            const listItems = firstPost.querySelectorAll('li');
-                            listItems.forEach((item, idx) => {
-                                if (idx < 3) {  // 只取前3个
-                                    const text = item.textContent.trim();
-                                    if (text.length < 100 && text.length > 10) {
-                                        keyPoints.push(text);
-                                    }
+                    current_url = page.url
+                    if topic_url not in current_url and topic_link not in current_url:
+                        self.logger.debug(f"检测到重定向: {topic_url} -> {current_url}")
+
+                    # 提取帖子内容
+                    content_data = await page.evaluate("""
+                        ({selector, maxChars}) => {
+                            // 获取第一楼内容
+                            const firstPost = document.querySelector(selector);
+                            let firstPostText = '';
+
+                            if (firstPost) {
+                                // 移除代码块和引用块，只保留主要文本
+                                const clone = firstPost.cloneNode(true);
+
+                                // 移除代码块
+                                clone.querySelectorAll('pre, code').forEach(el => el.remove());
+
+                                // 移除引用
+                                clone.querySelectorAll('blockquote').forEach(el => el.remove());
+
+                                // 移除图片
+                                clone.querySelectorAll('img').forEach(el => el.remove());
+
+                                // 按块级元素换行，保留段落结构
+                                clone.querySelectorAll('p, li, br, h1, h2, h3, h4, h5, h6, tr').forEach(
+                                    el => el.insertAdjacentText('beforebegin', '\\n')
+                                );
+                                firstPostText = clone.textContent
+                                    .replace(/[ \\t\\r\\f\\v]+/g, ' ')
+                                    .replace(/\\s*\\n\\s*/g, '\\n')
+                                    .trim();
+
+                                // 截取前 maxChars 字符
+                                if (firstPostText.length > maxChars) {
+                                    firstPostText = firstPostText.substring(0, maxChars) + '...';
                                 }
-                            });
+                            }
 
-                            // 如果没有列表项，提取加粗文本
-                            if (keyPoints.length === 0) {
-                                const boldTexts = firstPost.querySelectorAll('strong, b');
-                                boldTexts.forEach((item, idx) => {
-                                    if (idx < 3) {
+                            // 尝试提取关键信息（列表项、加粗文本等）
+                            const keyPoints = [];
+                            if (firstPost) {
+                                // 提取列表项
+                                const listItems = firstPost.querySelectorAll('li');
+                                listItems.forEach((item, idx) => {
+                                    if (idx < 3) {  // 只取前3个
                                         const text = item.textContent.trim();
-                                        if (text.length < 100 && text.length > 5) {
+                                        if (text.length < 100 && text.length > 10) {
                                             keyPoints.push(text);
                                         }
                                     }
                                 });
+
+                                // 如果没有列表项，提取加粗文本
+                                if (keyPoints.length === 0) {
+                                    const boldTexts = firstPost.querySelectorAll('strong, b');
+                                    boldTexts.forEach((item, idx) => {
+                                        if (idx < 3) {
+                                            const text = item.textContent.trim();
+                                            if (text.length < 100 && text.length > 5) {
+                                                keyPoints.push(text);
+                                            }
+                                        }
+                                    });
+                                }
                             }
-                        }
 
-                        return {
-                            first_post: firstPostText,
-                            key_points: keyPoints
-                        };
-                    }
-                """)
+                            return {
+                                first_post: firstPostText,
+                                key_points: keyPoints
+                            };
+                        }
+                    """, {'selector': self.FIRST_POST_SELECTOR, 'maxChars': self.CONTENT_MAX_CHARS})
 
                 # 验证内容是否有效
                 if content_data.get('first_post', '').strip():
                     self.logger.debug(f"成功提取内容: {len(content_data.get('first_post', ''))} 字符")
                     return content_data
                 else:
-                    # 内容为空，可能是页面未加载完成
+                    # 内容为空，可能是页面未加载完成（重新加载时会再次等待正文出现）
                     if attempt < max_retries:
-                        self.logger.debug(f"内容为空，等待后重试...")
-                        await asyncio.sleep(3)
+                        self.logger.debug(f"内容为空，重新加载...")
                         continue
                     else:
                         self.logger.debug(f"内容为空，返回空结果")
@@ -937,9 +1234,8 @@ class LinuxDoAdapter(BaseAdapter):
                     await asyncio.sleep(3)  # 重试前等待
                 else:
                     self.logger.debug(f"获取帖子内容失败: {str(e)[:100]}")
-                    return {"first_post": "", "key_points": []}
+                    raise
 
-        # 如果所有重试都失败（安全返回）
         return {"first_post": "", "key_points": []}
 
     def _generate_summary(
@@ -947,7 +1243,8 @@ class LinuxDoAdapter(BaseAdapter):
         latest_topics: List[Dict[str, Any]],
         hot_topics: List[Dict[str, Any]],
         ai_summaries: List[Dict[str, Any]] = None,
-        recommended_topics: List[Dict[str, Any]] = None
+        recommended_topics: List[Dict[str, Any]] = None,
+        crawl_stats: Optional[Dict[str, int]] = None
     ) -> str:
         """
         生成论坛动态摘要
@@ -957,6 +1254,7 @@ class LinuxDoAdapter(BaseAdapter):
             hot_topics: 热门帖子列表
             ai_summaries: AI 分析的帖子列表
             recommended_topics: 推荐帖子列表
+            crawl_stats: 增量抓取统计（新帖/有更新/未变化数量）
 
         Returns:
             摘要文本
@@ -1022,6 +1320,12 @@ class LinuxDoAdapter(BaseAdapter):
 
                 summary_lines.append(f"   🔗 {self.site_url}{topic['link']}")
 
+                # 近似重复的帖子
+                if topic.get('related_topics'):
+                    summary_lines.append(f"   🔁 相关帖子 {len(topic['related_topics'])} 篇:")
+                    for related in topic['related_topics'][:3]:
+                        summary_lines.append(f"      • {related['title']} {self.site_url}{related['link']}")
+
         # ===== 最新帖子 =====
         if latest_topics:
             summary_lines.append("\n【📰 最新帖子】")
@@ -1050,6 +1354,11 @@ class LinuxDoAdapter(BaseAdapter):
 
         summary_lines.append("\n" + "=" * 60)
         summary_lines.append(f"📊 统计: 共分析 {len(latest_topics) + len(hot_topics)} 个帖子")
+        if crawl_stats:
+            summary_lines.append(
+                f"🆕 增量: 新帖 {crawl_stats['new']} | 有更新 {crawl_stats['updated']} | "
+                f"未变化 {crawl_stats['unchanged']}（未变化的帖子跳过读取和分析）"
+            )
         if recommended_topics:
             summary_lines.append(f"🎯 为你推荐 {min(5, len(recommended_topics))} 个最相关话题")
         if ai_summaries:
@@ -1,17 +1,147 @@
 """AI 内容分析和总结服务 - 使用阿里云通义千问 qwen-flash 模型"""
+import asyncio
 import os
+import re
 import json
-from typing import List, Dict, Any, Optional
+import time
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
 
+from modules.forum.linuxdo.ai_governor import get_governor, parse_retry_after
+from modules.forum.linuxdo.ai_router import Endpoint, EndpointRouter
+from modules.forum.linuxdo.response_cache import ResponseCache, request_key
+from modules.forum.linuxdo.interest_ranker import InterestRanker
+from modules.forum.linuxdo.content_prep import estimate_tokens, clean_content, prepare_content, split_chunks
+from modules.forum.linuxdo.extractive_summary import EXTRACTIVE_VERSION, ExtractiveSummarizer
+
+# 当前调用的 HTTP 阶段时间点（由 httpx trace 扩展写入）
+_call_timing: ContextVar[Optional[Dict[str, float]]] = ContextVar('_call_timing', default=None)
+
+
+async def _attach_trace(request):
+    """httpx 请求钩子：为当前调用的请求挂上 trace 回调，记录建立连接和收发的时间点"""
+    timing = _call_timing.get()
+    if timing is None:
+        return
+
+    async def trace(name: str, info: Dict[str, Any]):
+        timing.setdefault(name, time.perf_counter())
+
+    request.extensions['trace'] = trace
+
+
+class CallStats:
+    """AI 调用耗时统计（区分限流排队、建立连接和生成耗时）"""
+
+    def __init__(self):
+        """初始化统计"""
+        self.calls: List[Dict[str, Any]] = []
+
+    def record(self, kind: str, total: float, timing: Dict[str, float], queue_wait: float = 0.0):
+        """
+        记录一次调用
+
+        Args:
+            kind: 调用类型（summary/interests）
+            total: 总耗时（秒，不含排队）
+            timing: trace 记录的时间点
+            queue_wait: 在限流器中的排队时间（秒）
+        """
+        connect_start = timing.get('connection.connect_tcp.started')
+        connect_end = timing.get('connection.start_tls.complete') or timing.get('connection.connect_tcp.complete')
+        connect = connect_end - connect_start if connect_start and connect_end else 0.0
+        self.calls.append({
+            'kind': kind,
+            'total': total,
+            'connect': connect,
+            'generation': max(total - connect, 0.0),
+            'queue_wait': queue_wait,
+            'new_connection': connect_start is not None,
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        count = len(self.calls)
+        total = sum(c['total'] for c in self.calls)
+        connect = sum(c['connect'] for c in self.calls)
+        return {
+            'calls': count,
+            'new_connections': sum(1 for c in self.calls if c['new_connection']),
+            'total_seconds': round(total, 2),
+            'connect_seconds': round(connect, 2),
+            'generation_seconds': round(total - connect, 2),
+            'queue_wait_seconds': round(sum(c['queue_wait'] for c in self.calls), 2),
+            'max_queue_wait_seconds': round(max((c['queue_wait'] for c in self.calls), default=0.0), 2),
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        stats = self.to_dict()
+        if not stats['calls']:
+            return "无调用"
+        return (
+            f"{stats['calls']} 次调用（新建连接 {stats['new_connections']} 次），"
+            f"平均 {stats['total_seconds'] / stats['calls']:.2f}s，"
+            f"其中建立连接 {stats['connect_seconds']:.2f}s / 生成 {stats['generation_seconds']:.2f}s，"
+            f"限流排队平均 {stats['queue_wait_seconds'] / stats['calls']:.2f}s / 最长 {stats['max_queue_wait_seconds']:.2f}s"
+        )
+
+
+class FallbackSummary(dict):
+    """
+    AI 调用失败时改用的本地抽取式摘要
+
+    内容与普通总结结果相同；帖子缓存按 AI 版本计算指纹，这类结果不写入缓存，下次运行重新调用 AI
+    """
+    pass
+
+
+class AISummary(dict):
+    """
+    AI 生成的总结结果
+
+    version 为实际返回结果的接口的分析版本（故障转移或对冲后可能是备用接口的模型），帖子缓存按此版本保存
+    """
+
+    def __init__(self, data: Dict[str, Any], version: str):
+        super().__init__(data)
+        self.version = version
+
 
 class AIAnalyzer:
     """
     AI 内容分析器 - 支持阿里云通义千问和其他兼容 OpenAI API 的服务
 
-    默认使用 qwen-flash 模型，速度快、成本低
+    默认使用 qwen-flash 模型，速度快、成本低；未配置 API 或调用失败时使用本地抽取式摘要
     """
 
+    # 总结提示词版本（修改 _build_summary_prompt 时递增，使缓存的分析结果失效）
+    SUMMARY_PROMPT_VERSION = 3
+
+    # HTTP 连接池：保持长连接，避免每次调用重新握手
+    MAX_CONNECTIONS = 10
+    MAX_KEEPALIVE_CONNECTIONS = 5
+    KEEPALIVE_EXPIRY = 60
+    REQUEST_TIMEOUT = 120
+
+    # 服务端限流（429/503）后的最多重试次数（SDK 自带的重试关闭，统一由限流器处理）
+    MAX_RETRIES = 3
+
+    # 批量总结：每批输入的 token 预算、单批帖子数上限
+    BATCH_INPUT_TOKENS = 6000
+    BATCH_MAX_TOPICS = 10
+
+    # 总结的最大生成长度随正文长度调整：基础值 + 正文 token 数 × 比例（不超过 max_tokens）
+    SUMMARY_OUTPUT_BASE_TOKENS = 200
+    SUMMARY_OUTPUT_RATIO = 0.15
+
+    # 分段总结：每块要点的最大生成长度和温度（固定值，保证相同的块命中响应缓存）
+    CHUNK_OUTPUT_TOKENS = 300
+    CHUNK_TEMPERATURE = 0.3
+
+    SUMMARY_SYSTEM_PROMPT = "你是一个专业的内容分析助手，擅长提炼文章要点和识别关键信息。"
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -19,7 +149,21 @@ class AIAnalyzer:
         model: str = "qwen-flash",
         temperature: float = 0.7,
         max_tokens: int = 800,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        rate_limit_rpm: float = 60,
+        rate_limit_tpm: float = 100000,
+        max_in_flight: int = 4,
+        response_cache: Optional[ResponseCache] = None,
+        ranking_top_k: int = 20,
+        ranking_skip_confidence: Optional[float] = 0.8,
+        content_token_budget: int = 1500,
+        map_reduce_enabled: bool = True,
+        chunk_tokens: int = 1200,
+        max_chunks: int = 8,
+        map_reduce_concurrency: int = 3,
+        endpoints: Optional[List[Dict[str, Any]]] = None,
+        hedge: bool = True,
+        call_deadline: Optional[float] = 90
     ):
         """
         初始化 AI 分析器
@@ -31,6 +175,21 @@ class AIAnalyzer:
             temperature: 模型创造性参数（0-1）
             max_tokens: 最大生成长度
             logger: 日志记录器
+            rate_limit_rpm: 每分钟请求数上限（同一进程内相同 API 地址的分析器共用）
+            rate_limit_tpm: 每分钟 token 数上限
+            max_in_flight: 同时进行的请求数上限
+            response_cache: AI 响应缓存（相同请求直接返回缓存的回复）
+            ranking_top_k: 本地排序后交给 AI 推荐的候选帖子数
+            ranking_skip_confidence: 候选帖子中匹配用户兴趣的比例达到此值时直接使用本地排序，不调用 AI（None 表示总是调用）
+            content_token_budget: 每个帖子正文放入提示词的 token 预算（清理后超出部分截断）
+            map_reduce_enabled: 帖子全文（首帖 + 高赞回复）超出 content_token_budget 时是否分段总结后再合并
+            chunk_tokens: 分段总结时每段的 token 上限
+            max_chunks: 分段总结最多处理的段数（超出部分丢弃）
+            map_reduce_concurrency: 同一帖子同时总结的段数
+            endpoints: 备用接口列表（每项包含 api_base，可选 api_key/model/name，未填写的字段与主接口相同），
+                与主接口一起按延迟和错误率路由
+            hedge: 配置了备用接口时，首选接口超过其 p90 延迟未返回是否向下一个接口发送对冲请求
+            call_deadline: 每次调用（含限流排队、重试和对冲请求）的期限（秒，None 表示不限），超时后改用本地摘要
         """
         # API Key 优先级: 参数 > DASHSCOPE_API_KEY > OPENAI_API_KEY > AI_API_KEY
         self.api_key = (
@@ -52,18 +211,318 @@ class AIAnalyzer:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.logger = logger or logging.getLogger(__name__)
+        self.call_stats = CallStats()
+        self.response_cache = response_cache
+        self.ranking_top_k = ranking_top_k
+        self.ranking_skip_confidence = ranking_skip_confidence
+        self.content_token_budget = content_token_budget
+        self.map_reduce_enabled = map_reduce_enabled
+        self.chunk_tokens = chunk_tokens
+        self.max_chunks = max_chunks
+        self.map_reduce_concurrency = map_reduce_concurrency
+        self.extractive = ExtractiveSummarizer()
+        self.call_deadline = call_deadline
+
+        primary = Endpoint(self.api_base, self.api_key, self.model)
+        backups = [
+            Endpoint(e['api_base'], e.get('api_key') or self.api_key, e.get('model') or self.model, e.get('name'))
+            for e in endpoints or [] if e.get('api_base')
+        ]
+        for endpoint in [primary] + backups:
+            endpoint.governor = get_governor(endpoint.api_base, rate_limit_rpm, rate_limit_tpm, max_in_flight)
+        self.router = EndpointRouter([primary] + backups, hedge=hedge)
+        self.governor = primary.governor
 
         # 检查是否配置了 API
         self.enabled = bool(self.api_key)
         if not self.enabled:
-            self.logger.info("AI 功能未配置，将使用简单文本提取")
+            self.logger.info("AI 功能未配置，将使用本地抽取式摘要")
         else:
             self.logger.info(f"AI 分析器已启用 - 模型: {self.model}")
+            if backups:
+                self.logger.info(f"AI 备用接口: {', '.join(e.name for e in backups)}（按延迟和错误率路由）")
+
+    @property
+    def summary_version(self) -> str:
+        """分析结果版本（模型 + 提示词版本，未启用 AI 时为抽取式摘要版本）"""
+        if not self.enabled:
+            return f"extractive:v{EXTRACTIVE_VERSION}"
+        return self._model_version(self.model)
+
+    @property
+    def summary_versions(self) -> List[str]:
+        """各接口的分析结果版本（首选接口在前），由其中任一接口生成的缓存结果都有效"""
+        if not self.enabled:
+            return [self.summary_version]
+        return list(dict.fromkeys(self._model_version(endpoint.model) for endpoint in self.router.endpoints))
+
+    def _model_version(self, model: str) -> str:
+        """模型对应的分析结果版本"""
+        return f"{model}:v{self.SUMMARY_PROMPT_VERSION}"
+
+    def _get_client(self, endpoint: Endpoint):
+        """
+        获取接口共享的 AsyncOpenAI 客户端（首次调用时创建）
+
+        Args:
+            endpoint: 接口
+
+        Returns:
+            客户端，未安装 openai 库时返回 None
+        """
+        if endpoint.client is not None:
+            return endpoint.client
+        try:
+            import httpx
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        except ImportError:
+            self.logger.error("未安装 openai 库，请运行: pip install openai")
+            return None
+
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.MAX_CONNECTIONS,
+                max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.KEEPALIVE_EXPIRY
+            ),
+            event_hooks={'request': [_attach_trace]}
+        )
+        endpoint.client = AsyncOpenAI(
+            api_key=endpoint.api_key,
+            base_url=endpoint.api_base,
+            timeout=self.REQUEST_TIMEOUT,
+            max_retries=0,
+            http_client=http_client
+        )
+        return endpoint.client
+
+    async def _chat(
+        self,
+        kind: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """
+        调用对话接口，返回模型回复文本（参数同 _chat_answer，未安装 openai 库时返回 None）
+        """
+        answer = await self._chat_answer(kind, messages, temperature, max_tokens, validate)
+        return answer[1] if answer else None
+
+    async def _chat_answer(
+        self,
+        kind: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> Optional[Tuple[str, str]]:
+        """
+        调用对话接口并记录耗时
+
+        配置了多个接口时按路由器的顺序选择（见 _routed_chat）；整个调用（含限流排队、重试和对冲请求）
+        超过 call_deadline 时抛出 TimeoutError。配置了响应缓存时，相同的请求（模型、温度、最大长度、消息）
+        直接返回缓存的回复；回复按实际返回结果的接口的模型缓存，查找时依次检查各接口的模型
+
+        Args:
+            kind: 调用类型（用于统计）
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大生成长度（默认使用 self.max_tokens）
+            validate: 检查回复是否可用，返回 False 时不写入响应缓存（如批量总结缺少部分帖子）
+
+        Returns:
+            (生成回复的模型, 模型回复文本)，未安装 openai 库时返回 None
+        """
+        if self._get_client(self.router.endpoints[0]) is None:
+            return None
+
+        max_tokens = max_tokens or self.max_tokens
+        if self.response_cache:
+            keys = {
+                request_key(endpoint.model, temperature, max_tokens, messages): endpoint.model
+                for endpoint in self.router.ranked()
+            }
+            cached = self.response_cache.get_first(list(keys))
+            if cached is not None:
+                key, result_text = cached
+                return keys[key], result_text
+
+        try:
+            endpoint, result_text = await asyncio.wait_for(
+                self._routed_chat(kind, messages, temperature, max_tokens), self.call_deadline
+            )
+        except asyncio.TimeoutError:
+            self.router.deadline_exceeded += 1
+            raise TimeoutError(f"AI 调用超过 {self.call_deadline}s 未完成")
+
+        if self.response_cache and result_text and (validate is None or validate(result_text)):
+            self.response_cache.set(request_key(endpoint.model, temperature, max_tokens, messages), kind, result_text)
+        return endpoint.model, result_text
+
+    async def _routed_chat(
+        self,
+        kind: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[Endpoint, str]:
+        """
+        按路由顺序调用接口
+
+        首选接口失败时依次换用下一个接口；首选接口超过其 p90 延迟仍未返回时，
+        向下一个接口发送相同的请求（对冲），先成功返回的结果生效，其余请求取消。
+        对冲计时从首选接口取得限流许可后开始（在本地限流器排队的时间不计入），
+        下一个接口处于冷却期时不发送对冲请求
+
+        Returns:
+            (返回结果的接口, 模型回复文本)，所有接口都失败时抛出最后一个异常
+        """
+        candidates = self.router.ranked()
+        primary = candidates[0]
+        hedge_delay = self.router.hedge_delay(primary)
+        running: Dict[asyncio.Task, Endpoint] = {}
+        hedged = False
+        last_error: Optional[BaseException] = None
+        # 首选接口取得限流许可的时间（由 _endpoint_chat 设置）
+        primary_started = asyncio.get_running_loop().create_future()
+
+        def launch(started: Optional[asyncio.Future] = None):
+            endpoint = candidates.pop(0)
+            task = asyncio.ensure_future(
+                self._endpoint_chat(endpoint, kind, messages, temperature, max_tokens, started=started)
+            )
+            running[task] = endpoint
+
+        launch(primary_started)
+        try:
+            while running:
+                waiting = set(running)
+                timeout = None
+                hedge_pending = not hedged and primary in running.values() and candidates and candidates[0].healthy
+                if hedge_delay is not None and hedge_pending:
+                    if primary_started.done():
+                        timeout = max(0.0, hedge_delay - (time.monotonic() - primary_started.result()))
+                    else:
+                        waiting.add(primary_started)
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                done.discard(primary_started)
+                if not done:
+                    if timeout is None:
+                        # 首选接口刚取得许可，开始对冲计时
+                        continue
+                    hedged = True
+                    self.router.hedged += 1
+                    self.logger.debug(f"{primary.name} 超过 p90 延迟 {hedge_delay:.2f}s 未返回，向 {candidates[0].name} 发送对冲请求")
+                    launch()
+                    continue
+
+                for task in done:
+                    endpoint = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        last_error = e
+                        self.logger.debug(f"AI 接口 {endpoint.name} 调用失败: {str(e)}")
+                        continue
+                    endpoint.wins += 1
+                    if endpoint is not primary and hedged:
+                        self.router.hedge_wins += 1
+                    return endpoint, result
+
+                if not running and candidates:
+                    self.router.failovers += 1
+                    launch()
+            raise last_error
+        except asyncio.CancelledError:
+            # 超过调用期限时仍未返回的接口计为失败
+            for endpoint in running.values():
+                self.router.record_failure(endpoint)
+            raise
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _endpoint_chat(
+        self,
+        endpoint: Endpoint,
+        kind: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        started: Optional[asyncio.Future] = None
+    ) -> str:
+        """
+        经接口的限流器调用一个接口，记录耗时和接口的延迟、错误统计
+
+        服务端返回 429/503 时按 Retry-After（没有时指数退避）暂停同一 API 地址的所有请求后重试
+
+        Args:
+            started: 第一次取得限流许可时设置为当时的 time.monotonic()（用于对冲计时）
+
+        Returns:
+            模型回复文本
+        """
+        client = self._get_client(endpoint)
+        estimated_tokens = estimate_tokens(''.join(m['content'] for m in messages)) + max_tokens
+        governor = endpoint.governor
+
+        try:
+            for attempt in range(self.MAX_RETRIES + 1):
+                async with governor.slot(estimated_tokens) as permit:
+                    if started is not None and not started.done():
+                        started.set_result(time.monotonic())
+                    timing: Dict[str, float] = {}
+                    token = _call_timing.set(timing)
+                    start_time = time.perf_counter()
+                    try:
+                        response = await client.chat.completions.create(
+                            model=endpoint.model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens
+                        )
+                    except Exception as e:
+                        status = getattr(e, 'status_code', None)
+                        if status not in (429, 503) or attempt >= self.MAX_RETRIES:
+                            raise
+                        wait = parse_retry_after(getattr(getattr(e, 'response', None), 'headers', None))
+                        if wait is None:
+                            wait = governor.backoff(attempt)
+                        governor.pause(wait)
+                        self.logger.warning(
+                            f"AI 接口 {endpoint.name} 限流（HTTP {status}），{wait:.1f}s 后重试（第 {attempt + 1} 次）"
+                        )
+                        continue
+                    finally:
+                        _call_timing.reset(token)
+                        elapsed = time.perf_counter() - start_time
+                        self.call_stats.record(kind, elapsed, timing, permit['queue_wait'])
+
+                    usage = getattr(response, 'usage', None)
+                    if usage and getattr(usage, 'total_tokens', None):
+                        permit['actual_tokens'] = usage.total_tokens
+
+                self.router.record_success(endpoint, elapsed)
+                return response.choices[0].message.content.strip()
+        except Exception:
+            self.router.record_failure(endpoint)
+            raise
+
+    async def aclose(self):
+        """关闭各接口的共享客户端和连接池（之后再调用会重新创建）"""
+        for endpoint in self.router.endpoints:
+            if endpoint.client is not None:
+                client, endpoint.client = endpoint.client, None
+                await client.close()
 
     async def summarize_topic(self, topic: Dict[str, Any], content: str) -> Dict[str, Any]:
         """
         使用 AI 总结帖子内容
 
+        全文超出 content_token_budget 且启用了分段总结时，先分段提炼要点再合并（见 _summarize_map_reduce）
+
         Args:
             topic: 帖子元信息（标题、作者等）
             content: 帖子内容
@@ -76,43 +535,267 @@ class AIAnalyzer:
             - sentiment: 情感倾向
         """
         if not self.enabled:
-            return self._simple_summary(content)
+            return self._extractive_summary(topic, content)
 
         try:
-            # 导入新版 OpenAI 库
-            try:
-                from openai import AsyncOpenAI
-            except ImportError:
-                self.logger.error("未安装 openai 库，请运行: pip install openai")
-                return self._simple_summary(content)
-
-            # 创建客户端（新版 API）
-            client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url=self.api_base
-            )
+            if self._needs_map_reduce(content):
+                result = await self._summarize_map_reduce(topic, content)
+                if result is not None:
+                    return result
 
             # 构建提示词
             prompt = self._build_summary_prompt(topic, content)
 
-            # 调用 AI 模型
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的内容分析助手，擅长提炼文章要点和识别关键信息。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+            # 调用 AI 模型（最大生成长度随正文长度调整）
+            answer = await self._chat_answer('summary', [
+                {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ], temperature=self.temperature, max_tokens=self._summary_max_tokens(content))
+            if answer is None:
+                return self._fallback_summary(topic, content)
 
             # 解析响应
-            result_text = response.choices[0].message.content.strip()
-            return self._parse_ai_response(result_text)
+            model, result_text = answer
+            return AISummary(self._parse_ai_response(result_text), self._model_version(model))
 
         except Exception as e:
             self.logger.error(f"AI 总结失败: {str(e)}")
-            return self._simple_summary(content)
+            return self._fallback_summary(topic, content)
+
+    def _plan_batches(self, items: List[Tuple[str, Dict[str, Any], str]]) -> List[List[Tuple[str, Dict[str, Any], str]]]:
+        """
+        按输入 token 预算把帖子分批
+
+        Args:
+            items: [(帖子 ID, 帖子信息, 内容)]
+
+        Returns:
+            批次列表
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        for item in items:
+            tokens = estimate_tokens(self._format_batch_item(*item))
+            if current and (
+                current_tokens + tokens > self.BATCH_INPUT_TOKENS or len(current) >= self.BATCH_MAX_TOPICS
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def summarize_topics(self, items: List[Tuple[str, Dict[str, Any], str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量总结多个帖子（一次请求总结多个帖子，减少请求次数和重复的系统提示词）
+
+        按 token 预算分批；某一批返回的结果无法解析或缺少部分帖子时，
+        缺失的帖子对半拆分后重试，拆到单个帖子时改用 summarize_topic；
+        调用失败（接口错误、超过调用期限）的批次整批改用抽取式摘要，不拆分重试。
+        需要分段总结的长帖不参与批量，逐个调用 summarize_topic。
+
+        Args:
+            items: [(帖子 ID, 帖子信息, 内容)]，帖子 ID 在本次调用中唯一
+
+        Returns:
+            {帖子 ID: 总结结果}（字段同 summarize_topic）
+        """
+        if not self.enabled:
+            return {topic_id: self._extractive_summary(topic, content) for topic_id, topic, content in items}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        long_items = [item for item in items if self._needs_map_reduce(item[2])]
+        for topic_id, topic, content in long_items:
+            results[topic_id] = await self.summarize_topic(topic, content)
+
+        items = [item for item in items if item[0] not in results]
+        for batch in self._plan_batches(items):
+            results.update(await self._summarize_batch(batch))
+        return results
+
+    async def _summarize_batch(self, batch: List[Tuple[str, Dict[str, Any], str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        总结一批帖子
+
+        模型返回了结果但格式错误或缺少部分帖子时，缺失的帖子拆分重试；
+        调用本身失败（接口错误、超过调用期限）时不再拆分，整批改用抽取式摘要
+        """
+        if len(batch) == 1:
+            topic_id, topic, content = batch[0]
+            return {topic_id: await self.summarize_topic(topic, content)}
+
+        expected_ids = {topic_id for topic_id, _, _ in batch}
+        try:
+            # 只缓存包含全部帖子的回复，格式错误或不完整的回复重新运行时不会命中缓存
+            answer = await self._chat_answer('batch_summary', [
+                {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": self._build_batch_summary_prompt(batch)}
+            ], temperature=self.temperature,
+                max_tokens=sum(self._summary_max_tokens(content) for _, _, content in batch),
+                validate=lambda text: self._parse_batch_response(text, expected_ids).keys() == expected_ids)
+        except Exception as e:
+            self.logger.warning(f"AI 批量总结失败（{len(batch)} 个帖子），改用抽取式摘要: {str(e)}")
+            answer = None
+        if answer is None:
+            return {topic_id: self._fallback_summary(topic, content) for topic_id, topic, content in batch}
+        model, result_text = answer
+        version = self._model_version(model)
+        parsed = {
+            topic_id: AISummary(item, version)
+            for topic_id, item in self._parse_batch_response(result_text, expected_ids).items()
+        }
+
+        failed = [item for item in batch if item[0] not in parsed]
+        if failed:
+            self.logger.debug(f"批量总结缺少 {len(failed)}/{len(batch)} 个结果，拆分重试")
+            middle = (len(failed) + 1) // 2
+            for part in (failed[:middle], failed[middle:]):
+                if part:
+                    parsed.update(await self._summarize_batch(part))
+        return parsed
+
+    def _needs_map_reduce(self, content: str) -> bool:
+        """全文（清理后）是否超出单次总结的 token 预算，需要分段总结"""
+        return self.map_reduce_enabled and estimate_tokens(clean_content(content)) > self.content_token_budget
+
+    async def _summarize_map_reduce(self, topic: Dict[str, Any], content: str) -> Optional[Dict[str, Any]]:
+        """
+        分段总结长帖：各段并发提炼要点，再合并为一个总结
+
+        每段的提示词只包含标题和该段内容（不含段号和帖子的回复数、浏览数等会变化的信息），
+        帖子被编辑或有新回复后重新分析时，未变化的段直接命中响应缓存，只有变化的段会调用 API
+
+        Args:
+            topic: 帖子元信息
+            content: 帖子全文
+
+        Returns:
+            总结结果（字段同 summarize_topic），所有段都失败时返回 None
+        """
+        chunks = split_chunks(clean_content(content), self.chunk_tokens)
+        if len(chunks) > self.max_chunks:
+            self.logger.debug(f"帖子分为 {len(chunks)} 段，只总结前 {self.max_chunks} 段")
+            chunks = chunks[:self.max_chunks]
+
+        semaphore = asyncio.Semaphore(self.map_reduce_concurrency)
+
+        async def summarize_chunk(chunk: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self._chat('chunk_summary', [
+                        {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+                        {"role": "user", "content": self._build_chunk_prompt(topic, chunk)}
+                    ], temperature=self.CHUNK_TEMPERATURE, max_tokens=self.CHUNK_OUTPUT_TOKENS)
+                except Exception as e:
+                    self.logger.debug(f"分段总结失败: {str(e)}")
+                    return None
+
+        partials = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+        partials = [p for p in partials if p]
+        if not partials:
+            return None
+        self.logger.debug(f"分段总结 {topic.get('title', '')}: {len(partials)}/{len(chunks)} 段")
+
+        answer = await self._chat_answer('reduce_summary', [
+            {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": self._build_reduce_prompt(topic, partials)}
+        ], temperature=self.temperature, max_tokens=self._summary_max_tokens('\n'.join(partials)))
+        if answer is None:
+            return None
+        model, result_text = answer
+        return AISummary(self._parse_ai_response(result_text), self._model_version(model))
+
+    def _build_chunk_prompt(self, topic: Dict[str, Any], chunk: str) -> str:
+        """构建分段要点提示词（只依赖标题和段落内容）"""
+        return f"""以下是 Linux.do 论坛帖子《{topic.get('title', '')}》的一部分（首帖或回复，回复以【回复】开头）：
+
+{chunk}
+
+请提炼这部分内容的要点，每条一行，以 - 开头，最多 5 条，每条不超过 40 字。只输出要点。"""
+
+    def _build_reduce_prompt(self, topic: Dict[str, Any], partials: List[str]) -> str:
+        """构建合并分段要点的总结提示词"""
+        sections = "\n\n".join(f"第 {i + 1} 部分要点：\n{p}" for i, p in enumerate(partials))
+        return f"""以下是 Linux.do 论坛一个长帖（首帖和高赞回复）按顺序分段提炼的要点，请综合这些要点，提供整个帖子的结构化总结：
+
+标题：{topic.get('title', '')}
+作者：{topic.get('author', '')}
+分类：{topic.get('category', '')}
+回复数：{topic.get('replies', '0')}
+浏览数：{topic.get('views', '0')}
+
+{sections}
+
+请以 JSON 格式返回分析结果，包含以下字段：
+{{
+  "summary": "一句话总结（50字以内）",
+  "key_points": ["关键点1", "关键点2", "关键点3"],
+  "tags": ["标签1", "标签2", "标签3"],
+  "sentiment": "positive/neutral/negative",
+  "category": "技术讨论/求助/分享/其他"
+}}"""
+
+    def _format_batch_item(self, topic_id: str, topic: Dict[str, Any], content: str) -> str:
+        """批量提示词中的单个帖子（字段同 _build_summary_prompt）"""
+        return f"""### 帖子 {topic_id}
+标题：{topic.get('title', '')}
+作者：{topic.get('author', '')}
+分类：{topic.get('category', '')}
+回复数：{topic.get('replies', '0')}
+浏览数：{topic.get('views', '0')}
+
+内容：
+{self._prepare_content(content)}"""
+
+    def _build_batch_summary_prompt(self, batch: List[Tuple[str, Dict[str, Any], str]]) -> str:
+        """构建批量总结提示词"""
+        topics_text = "\n\n".join(self._format_batch_item(*item) for item in batch)
+        return f"""请分别分析以下 {len(batch)} 个 Linux.do 论坛帖子，并为每个帖子提供结构化的总结：
+
+{topics_text}
+
+请以 JSON 数组格式返回分析结果，每个帖子一个对象，用 id 字段对应帖子编号：
+[
+  {{
+    "id": "帖子编号",
+    "summary": "一句话总结（50字以内）",
+    "key_points": ["关键点1", "关键点2", "关键点3"],
+    "tags": ["标签1", "标签2", "标签3"],
+    "sentiment": "positive/neutral/negative",
+    "category": "技术讨论/求助/分享/其他"
+  }}
+]"""
+
+    def _parse_batch_response(self, response_text: str, expected_ids: set) -> Dict[str, Dict[str, Any]]:
+        """
+        解析批量总结结果
+
+        Args:
+            response_text: 模型回复
+            expected_ids: 本批的帖子 ID
+
+        Returns:
+            {帖子 ID: 总结结果}，只包含格式正确的条目
+        """
+        json_match = re.search(r'\[[\s\S]*\]', response_text)
+        if not json_match:
+            return {}
+        try:
+            items = json.loads(json_match.group())
+        except ValueError:
+            return {}
+
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            topic_id = str(item.pop('id', ''))
+            if topic_id in expected_ids and isinstance(item.get('summary'), str):
+                results[topic_id] = item
+        return results
 
     async def analyze_interests(
         self,
@@ -122,6 +805,9 @@ class AIAnalyzer:
         """
         分析并推荐用户可能感兴趣的话题
 
+        先在本地按用户兴趣和热度对全部帖子排序，只把前 ranking_top_k 篇交给 AI 给出推荐理由；
+        未启用 AI 或本地排序置信度足够高时直接返回本地排序结果
+
         Args:
             topics: 帖子列表
             user_profile: 用户兴趣画像（可选）
@@ -132,39 +818,49 @@ class AIAnalyzer:
             - relevance_score: 相关度分数
             - reason: 推荐理由
         """
+        interests = (user_profile or {}).get('interests')
+        start_time = time.perf_counter()
+        ranker = InterestRanker(interests)
+        ranked = ranker.rank(topics)
+        confidence = ranker.confidence(ranked, self.ranking_top_k)
+        self.logger.debug(
+            f"本地排序 {len(topics)} 篇用时 {(time.perf_counter() - start_time) * 1000:.1f}ms，"
+            f"置信度 {confidence:.2f}"
+        )
+
         if not self.enabled:
-            # 简单按回复数和浏览数排序
-            return self._simple_ranking(topics)
+            return ranked
+        if self.ranking_skip_confidence is not None and confidence >= self.ranking_skip_confidence:
+            self.logger.info(f"本地排序置信度 {confidence:.2f}，跳过 AI 推荐")
+            return ranked
 
+        candidates = ranked[:self.ranking_top_k]
         try:
-            from openai import AsyncOpenAI
-
-            # 创建客户端（新版 API）
-            client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url=self.api_base
-            )
-
             # 构建分析提示词
-            prompt = self._build_interest_prompt(topics, user_profile)
-
-            # 调用 AI 模型
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个内容推荐专家，擅长分析用户兴趣并推荐相关内容。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,  # 推荐任务使用较低温度，更稳定
-                max_tokens=self.max_tokens
-            )
+            prompt = self._build_interest_prompt(candidates, user_profile)
+
+            # 调用 AI 模型（推荐任务使用较低温度，更稳定）
+            result_text = await self._chat('interests', [
+                {"role": "system", "content": "你是一个内容推荐专家，擅长分析用户兴趣并推荐相关内容。"},
+                {"role": "user", "content": prompt}
+            ], temperature=0.5)
+            if result_text is None:
+                return ranked
 
-            result_text = response.choices[0].message.content.strip()
-            return self._parse_recommendations(result_text, topics)
+            return self._parse_recommendations(result_text, candidates) or ranked
 
         except Exception as e:
             self.logger.error(f"AI 兴趣分析失败: {str(e)}")
-            return self._simple_ranking(topics)
+            return ranked
+
+    def _prepare_content(self, content: str) -> str:
+        """清理正文并截断到 content_token_budget 以内"""
+        return prepare_content(content, self.content_token_budget)
+
+    def _summary_max_tokens(self, content: str) -> int:
+        """按正文长度（预处理后）计算总结的最大生成长度"""
+        content_tokens = estimate_tokens(self._prepare_content(content))
+        return min(self.max_tokens, self.SUMMARY_OUTPUT_BASE_TOKENS + int(content_tokens * self.SUMMARY_OUTPUT_RATIO))
 
     def _build_summary_prompt(self, topic: Dict[str, Any], content: str) -> str:
         """构建总结提示词"""
@@ -177,7 +873,7 @@ class AIAnalyzer:
 浏览数：{topic.get('views', '0')}
 
 内容：
-{content[:2000]}
+{self._prepare_content(content)}
 
 请以 JSON 格式返回分析结果，包含以下字段：
 {{
@@ -198,7 +894,7 @@ class AIAnalyzer:
             f"{i+1}. 【{t.get('category', '')}】{t.get('title', '')}\n"
             f"   作者: {t.get('author', '')} | 回复: {t.get('replies', '0')} | 浏览: {t.get('views', '0')}\n"
             f"   摘要: {t.get('content_summary', {}).get('first_post', '')[:200]}"
-            for i, t in enumerate(topics[:20])  # 最多分析20个
+            for i, t in enumerate(topics)
         ])
 
         profile_text = ""
@@ -244,8 +940,8 @@ class AIAnalyzer:
         self,
         response_text: str,
         topics: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """解析推荐结果"""
+    ) -> Optional[List[Dict[str, Any]]]:
+        """解析推荐结果（解析失败返回 None）"""
         try:
             import re
             # 尝试提取 JSON 数组
@@ -268,36 +964,12 @@ class AIAnalyzer:
         except Exception as e:
             self.logger.error(f"解析推荐结果失败: {str(e)}")
 
-        # 解析失败，返回简单排序
-        return self._simple_ranking(topics)
+        return None
 
-    def _simple_summary(self, content: str) -> Dict[str, Any]:
-        """简单文本摘要（不使用 AI）"""
-        return {
-            "summary": content[:150] + "..." if len(content) > 150 else content,
-            "key_points": [],
-            "tags": [],
-            "sentiment": "neutral",
-            "category": "其他"
-        }
+    def _extractive_summary(self, topic: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """本地抽取式摘要（不使用 AI）"""
+        return self.extractive.summarize(content, topic.get('title', ''))
 
-    def _simple_ranking(self, topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """简单排序（不使用 AI）"""
-        # 按回复数和浏览数的加权分数排序
-        def calculate_score(topic):
-            try:
-                replies = int(str(topic.get('replies', '0')).replace('k', '000').replace('.', ''))
-                views = int(str(topic.get('views', '0')).replace('k', '000').replace('.', ''))
-                return replies * 2 + views  # 回复权重更高
-            except:
-                return 0
-
-        sorted_topics = sorted(topics, key=calculate_score, reverse=True)
-
-        # 添加简单的推荐信息
-        for i, topic in enumerate(sorted_topics):
-            topic['relevance_score'] = max(100 - i * 5, 50)  # 递减分数
-            topic['recommendation_reason'] = f"热度排名第 {i+1}"
-            topic['recommendation_tags'] = [topic.get('category', '')]
-
-        return sorted_topics
+    def _fallback_summary(self, topic: Dict[str, Any], content: str) -> FallbackSummary:
+        """AI 调用失败时的抽取式摘要（标记为 FallbackSummary，不写入帖子缓存）"""
+        return FallbackSummary(self._extractive_summary(topic, content))
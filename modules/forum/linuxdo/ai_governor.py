@@ -0,0 +1,220 @@
+"""AI 调用限流
+
+同一进程内所有 AIAnalyzer 共用一个限流器（按 API 地址区分）：
+- 每分钟请求数（RPM）和每分钟 token 数（TPM）两个令牌桶
+- 同时进行的请求数上限
+- 服务端返回 429/503 时按 Retry-After 暂停所有请求，没有 Retry-After 时指数退避
+
+每次调用在限流器中的排队时间会被记录，用于判断限流设置是否过紧。
+"""
+import asyncio
+import email.utils
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Tuple
+
+
+class TokenBucket:
+    """按分钟速率匀速补充的令牌桶"""
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: 每分钟令牌数（桶容量同此值）
+        """
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """取出 amount 个令牌还需等待的秒数（0 表示可以立即取出）"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """取出令牌（调用前应确认 wait_time 为 0）"""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """按实际用量修正（正数补扣，负数退还），允许暂时透支"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    解析响应头中的重试等待时间
+
+    Args:
+        headers: 响应头（支持 retry-after-ms、retry-after 秒数或 HTTP 日期）
+
+    Returns:
+        等待秒数，没有相关响应头时返回 None
+    """
+    if not headers:
+        return None
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class AIGovernor:
+    """AI 调用限流器"""
+
+    def __init__(self, rpm: float = 60, tpm: float = 100000, max_in_flight: int = 4):
+        """
+        初始化限流器
+
+        Args:
+            rpm: 每分钟请求数上限
+            tpm: 每分钟 token 数上限（按估算的输入 + 最大输出计算，收到响应后按实际用量修正）
+            max_in_flight: 同时进行的请求数上限
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+
+        # asyncio 对象绑定事件循环，按事件循环分别创建
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+        # 统计
+        self.calls = 0
+        self.queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.throttled = 0
+
+    def _primitives(self) -> Tuple[asyncio.Semaphore, asyncio.Lock]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._lock = asyncio.Lock()
+        return self._semaphore, self._lock
+
+    def pause(self, seconds: float):
+        """服务端要求等待时暂停所有请求"""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        """
+        等待限流许可
+
+        用法:
+            async with governor.slot(tokens) as permit:
+                ...
+                permit['actual_tokens'] = usage.total_tokens
+
+        Args:
+            estimated_tokens: 估算的 token 用量
+
+        Yields:
+            许可信息（queue_wait: 排队秒数；可写入 actual_tokens 修正 TPM 用量）
+        """
+        semaphore, lock = self._primitives()
+        start_time = time.monotonic()
+        await semaphore.acquire()
+        try:
+            # 按到达顺序逐个检查令牌桶，避免大请求一直被小请求插队
+            async with lock:
+                while True:
+                    wait = max(
+                        self.paused_until - time.monotonic(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(estimated_tokens)
+                    )
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                self.requests.take(1)
+                self.tokens.take(estimated_tokens)
+
+            queue_wait = time.monotonic() - start_time
+            self.calls += 1
+            self.queue_wait += queue_wait
+            self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+
+            permit = {'queue_wait': queue_wait, 'actual_tokens': None}
+            yield permit
+            if permit['actual_tokens'] is not None:
+                self.tokens.adjust(permit['actual_tokens'] - estimated_tokens)
+        finally:
+            semaphore.release()
+
+    @staticmethod
+    def backoff(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+        """指数退避时间（带随机抖动）"""
+        return min(cap, base * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'calls': self.calls,
+            'queue_wait_seconds': round(self.queue_wait, 2),
+            'max_queue_wait_seconds': round(self.max_queue_wait, 2),
+            'throttled': self.throttled,
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        average = self.queue_wait / self.calls if self.calls else 0.0
+        return (
+            f"{self.calls} 次许可，平均排队 {average:.2f}s，最长 {self.max_queue_wait:.2f}s，"
+            f"服务端限流 {self.throttled} 次"
+        )
+
+
+# 进程内共享的限流器（按 API 地址）
+_governors: Dict[str, AIGovernor] = {}
+
+
+def get_governor(api_base: str, rpm: float = 60, tpm: float = 100000, max_in_flight: int = 4) -> AIGovernor:
+    """
+    获取 API 地址对应的共享限流器（首次获取时按参数创建）
+
+    Args:
+        api_base: API 地址
+        rpm: 每分钟请求数上限
+        tpm: 每分钟 token 数上限
+        max_in_flight: 同时进行的请求数上限
+
+    Returns:
+        限流器
+    """
+    governor = _governors.get(api_base)
+    if governor is None:
+        governor = AIGovernor(rpm=rpm, tpm=tpm, max_in_flight=max_in_flight)
+        _governors[api_base] = governor
+    return governor
@@ -0,0 +1,189 @@
+"""AI 接口路由
+
+配置了多个兼容 OpenAI 的接口（不同服务商或不同模型）时，按各接口的实际表现选择：
+- 每个接口记录延迟和错误率的指数移动平均（EWMA），以及最近若干次调用的延迟（用于计算 p90）
+- 按 延迟 × (1 + 错误率惩罚) 排序，优先使用最快的健康接口；连续失败的接口冷却一段时间后再尝试
+- 还没有延迟数据或长时间未使用的接口排在最前，试探一次后按实测延迟排序
+- 对冲请求：首选接口超过其 p90 延迟仍未返回时，向下一个接口发送相同的请求，先返回的结果生效
+"""
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+# EWMA 平滑系数
+LATENCY_ALPHA = 0.3
+ERROR_ALPHA = 0.2
+
+# 排序时错误率的惩罚倍数（错误率 50% 的接口按延迟的 3 倍计）
+ERROR_PENALTY = 4.0
+
+# 计算 p90 使用的最近延迟样本数
+LATENCY_WINDOW = 50
+
+# 超过此时间（秒）未成功调用的接口，延迟数据视为过期，重新试探
+PROBE_INTERVAL = 300
+
+
+class Endpoint:
+    """一个 AI 接口（API 地址 + 模型）及其延迟和错误统计"""
+
+    def __init__(self, api_base: str, api_key: Optional[str], model: str, name: Optional[str] = None):
+        """
+        Args:
+            api_base: API 地址
+            api_key: API 密钥
+            model: 模型名称
+            name: 显示名称（默认为 模型@主机）
+        """
+        self.api_base = api_base
+        self.api_key = api_key
+        self.model = model
+        self.name = name or f"{model}@{api_base.split('//')[-1].split('/')[0]}"
+
+        # 由 AIAnalyzer 创建的客户端和限流器
+        self.client = None
+        self.governor = None
+
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples: deque = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_success = 0.0
+
+        # 统计
+        self.calls = 0
+        self.failures = 0
+        self.wins = 0
+
+    @property
+    def healthy(self) -> bool:
+        """不在冷却期内"""
+        return time.monotonic() >= self.cooldown_until
+
+    def p90(self) -> Optional[float]:
+        """最近调用延迟的 90 分位数（没有样本时返回 None）"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    def cost(self) -> float:
+        """排序用的代价（没有延迟数据或数据已过期时为 0，优先试探）"""
+        if self.latency is None or time.monotonic() - self.last_success > PROBE_INTERVAL:
+            return 0.0
+        return self.latency * (1 + ERROR_PENALTY * self.error_rate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'failures': self.failures,
+            'wins': self.wins,
+            'latency_seconds': round(self.latency, 2) if self.latency is not None else None,
+            'p90_seconds': round(self.p90(), 2) if self.samples else None,
+            'error_rate': round(self.error_rate, 3),
+        }
+
+
+class EndpointRouter:
+    """按延迟和错误率在多个 AI 接口之间选择"""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        hedge: bool = True,
+        hedge_min_samples: int = 5,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 60
+    ):
+        """
+        初始化路由器
+
+        Args:
+            endpoints: 接口列表（没有统计数据时按列表顺序选择）
+            hedge: 是否发送对冲请求
+            hedge_min_samples: 首选接口至少有多少个延迟样本后才按其 p90 发送对冲请求
+            failure_threshold: 连续失败多少次后进入冷却
+            cooldown_seconds: 冷却时间（秒）
+        """
+        self.endpoints = endpoints
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+        # 统计
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.deadline_exceeded = 0
+
+    def ranked(self) -> List[Endpoint]:
+        """
+        按优先级排序的接口列表
+
+        健康的接口按代价升序（代价相同时保持配置顺序），冷却中的接口排在最后，作为最后的备选
+
+        Returns:
+            接口列表
+        """
+        order = {id(e): i for i, e in enumerate(self.endpoints)}
+        return sorted(self.endpoints, key=lambda e: (not e.healthy, e.cost(), order[id(e)]))
+
+    def hedge_delay(self, endpoint: Endpoint) -> Optional[float]:
+        """
+        向下一个接口发送对冲请求前的等待时间
+
+        Args:
+            endpoint: 首选接口
+
+        Returns:
+            等待秒数（首选接口的 p90 延迟），不对冲时返回 None
+        """
+        if not self.hedge or len(self.endpoints) < 2 or len(endpoint.samples) < self.hedge_min_samples:
+            return None
+        return endpoint.p90()
+
+    def record_success(self, endpoint: Endpoint, latency: float):
+        """记录一次成功调用"""
+        endpoint.calls += 1
+        endpoint.samples.append(latency)
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency = LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * endpoint.latency
+        endpoint.error_rate *= 1 - ERROR_ALPHA
+        endpoint.consecutive_failures = 0
+        endpoint.last_success = time.monotonic()
+
+    def record_failure(self, endpoint: Endpoint):
+        """记录一次失败调用（连续失败达到阈值时进入冷却）"""
+        endpoint.calls += 1
+        endpoint.failures += 1
+        endpoint.error_rate = ERROR_ALPHA + (1 - ERROR_ALPHA) * endpoint.error_rate
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold:
+            endpoint.cooldown_until = time.monotonic() + self.cooldown_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'endpoints': [e.to_dict() for e in self.endpoints],
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'failovers': self.failovers,
+            'deadline_exceeded': self.deadline_exceeded,
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        parts = []
+        for e in self.endpoints:
+            latency = f"{e.latency:.2f}s" if e.latency is not None else "-"
+            parts.append(f"{e.name}: {e.wins}/{e.calls} 次采用，失败 {e.failures}，平均延迟 {latency}")
+        return (
+            f"{'；'.join(parts)}；对冲 {self.hedged} 次（备用接口先返回 {self.hedge_wins} 次），"
+            f"切换 {self.failovers} 次，超时 {self.deadline_exceeded} 次"
+        )
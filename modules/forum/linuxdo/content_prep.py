@@ -0,0 +1,212 @@
+"""帖子正文预处理
+
+发给 AI 之前清理正文并按 token 预算截断：
+- 去掉链接、表情代码、零宽字符、"点击展开"等模板文字和重复的行
+- 合并连续的空白和重复的标点
+- 按估算的 token 数（而不是字符数）截断，尽量在句子边界处截断
+- 超出预算的长帖（首帖 + 高赞回复）按段落切块，供分段总结使用
+
+中文帖子按字符截断时 token 数远多于英文帖子，按 token 预算截断后两者的成本和长度一致。
+"""
+import re
+import zlib
+from typing import Dict, Any, List, Optional
+
+# 中日韩字符（含全角标点）约 1 token/字
+_CJK_PATTERN = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+_URL_PATTERN = re.compile(r'(?:https?://|www\.)[^\s\u3000-\u9fff\uff00-\uffef<>"\')\]]+', re.IGNORECASE)
+_MARKDOWN_LINK_PATTERN = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+_EMOJI_CODE_PATTERN = re.compile(r':[a-z][a-z0-9_+\-]{1,29}:')
+_ZERO_WIDTH_PATTERN = re.compile(r'[\u200b-\u200f\u2060\ufeff]')
+_REPEATED_PUNCT_PATTERN = re.compile(r'([!?！？。，,.~～…\-=_*#])\1{2,}')
+
+# 整行都是这些内容时去掉（Discourse 折叠块、编辑记录、分隔线等）
+_BOILERPLATE_LINES = re.compile(
+    r'^(?:点击展开|点击折叠|展开|收起|click to expand\.*|read more|'
+    r'本帖最后由.*编辑|最后编辑于.*|以上|[-=_*~]{3,}|\d+\s*个?(?:赞|回复|likes?|replies))$',
+    re.IGNORECASE
+)
+
+# 截断时向前查找句子边界的最大范围（占截断长度的比例）
+_BOUNDARY_WINDOW = 0.2
+_SENTENCE_END = re.compile(r'[。！？!?；;\n]|\.\s')
+
+# 回复在帖子全文中的分隔标记
+REPLY_MARKER = '【回复】'
+
+# 切块时段落内容哈希对此取模为 0 的位置作为块边界（块达到最小长度后）
+_CHUNK_BOUNDARY_MODULUS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数（中日韩字符约 1 token/字，其他字符约 4 字符/token）
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def clean_content(text: str) -> str:
+    """
+    清理正文中对总结没有帮助的内容
+
+    Args:
+        text: 帖子正文
+
+    Returns:
+        清理后的正文
+    """
+    text = _ZERO_WIDTH_PATTERN.sub('', text or '')
+    text = _MARKDOWN_LINK_PATTERN.sub(r'\1', text)
+    text = _URL_PATTERN.sub('', text)
+    text = _EMOJI_CODE_PATTERN.sub('', text)
+
+    lines = []
+    seen = set()
+    for line in text.splitlines():
+        line = re.sub(r'[ \t\u3000\xa0]+', ' ', line).strip()
+        if not line or _BOILERPLATE_LINES.match(line):
+            continue
+        line = _REPEATED_PUNCT_PATTERN.sub(r'\1\1', line)
+        # 重复的行（签名、复制粘贴两遍的内容）只保留第一次
+        if len(line) >= 8 and line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """
+    把文本截断到 token 预算以内
+
+    Args:
+        text: 文本
+        max_tokens: token 预算
+
+    Returns:
+        截断后的文本（截断时以 ... 结尾）
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 二分查找不超过预算的最长前缀
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) + 1 <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    cut = low
+
+    # 尽量在句子边界处截断
+    window_start = int(cut * (1 - _BOUNDARY_WINDOW))
+    boundary: Optional[int] = None
+    for match in _SENTENCE_END.finditer(text, window_start, cut):
+        boundary = match.end()
+    if boundary:
+        cut = boundary
+    return text[:cut].rstrip() + '...'
+
+
+def prepare_content(text: str, max_tokens: int) -> str:
+    """
+    清理正文并按 token 预算截断
+
+    Args:
+        text: 帖子正文
+        max_tokens: token 预算
+
+    Returns:
+        可直接放入提示词的正文
+    """
+    return fit_to_budget(clean_content(text), max_tokens)
+
+
+def thread_text(content: Dict[str, Any]) -> str:
+    """
+    把首帖和高赞回复拼接为帖子全文
+
+    Args:
+        content: 帖子内容（first_post、replies）
+
+    Returns:
+        全文（每条回复单独成段，以 REPLY_MARKER 开头）
+    """
+    parts = [content.get('first_post', '')]
+    parts.extend(f"{REPLY_MARKER}{reply}" for reply in content.get('replies') or [])
+    return '\n'.join(part for part in parts if part)
+
+
+def _split_paragraph(paragraph: str, max_tokens: int) -> List[str]:
+    """把超过 max_tokens 的段落按句子（句子仍过长时按字符）拆开"""
+    if estimate_tokens(paragraph) <= max_tokens:
+        return [paragraph]
+
+    pieces = []
+    start = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        pieces.append(paragraph[start:match.end()])
+        start = match.end()
+    pieces.append(paragraph[start:])
+
+    parts, current = [], ''
+    for piece in pieces:
+        while estimate_tokens(piece) > max_tokens:
+            head = fit_to_budget(piece, max_tokens)[:-3]
+            if current:
+                parts.append(current)
+                current = ''
+            parts.append(head)
+            piece = piece[len(head):]
+        if current and estimate_tokens(current + piece) > max_tokens:
+            parts.append(current)
+            current = ''
+        current += piece
+    if current.strip():
+        parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def split_chunks(text: str, chunk_tokens: int) -> List[str]:
+    """
+    把清理后的长文按段落切块
+
+    块边界由段落内容决定（块达到 chunk_tokens 的一半后，遇到内容哈希满足条件的段落即结束），
+    而不是固定在第几个字符：帖子中间插入或修改一段时只影响所在的块，其余块的内容不变，
+    分段总结的结果可以从响应缓存中复用
+
+    Args:
+        text: 清理后的正文（clean_content 的结果）
+        chunk_tokens: 每块的 token 上限
+
+    Returns:
+        块列表（按原文顺序）
+    """
+    paragraphs = []
+    for paragraph in text.split('\n'):
+        paragraphs.extend(_split_paragraph(paragraph, chunk_tokens))
+
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append('\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+        if (current_tokens >= chunk_tokens // 2
+                and zlib.crc32(paragraph.encode('utf-8')) % _CHUNK_BOUNDARY_MODULUS == 0):
+            chunks.append('\n'.join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
@@ -0,0 +1,188 @@
+"""Linux.do 增量抓取状态
+
+按账号记录已处理帖子的高水位（最大帖子 ID、最新活跃时间）和每个帖子的楼层数，
+下次运行时据此判断帖子是新帖、有新回复还是未变化：
+列表翻页/滚动遇到未变化的帖子即可停止，只有新帖和有更新的帖子才需要读取内容和 AI 分析。
+"""
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from modules.forum.linuxdo.discourse_api import parse_topic_id
+
+STATUS_NEW = 'new'
+STATUS_UPDATED = 'updated'
+STATUS_UNCHANGED = 'unchanged'
+
+
+def parse_count(value) -> Optional[int]:
+    """解析页面上的数字（支持 1.2k / 3万 格式），无法解析返回 None"""
+    if value is None or value == '':
+        return None
+    s = str(value).strip().lower()
+    try:
+        if s.endswith('k'):
+            return int(float(s[:-1]) * 1000)
+        if s.endswith('万'):
+            return int(float(s[:-1]) * 10000)
+        return int(float(s))
+    except ValueError:
+        return None
+
+
+def topic_posts_count(topic: Dict[str, Any]) -> Optional[int]:
+    """帖子楼层数（页面提取时由回复数 + 1 估算），无法获取时返回 None"""
+    if topic.get('posts_count') is not None:
+        return topic['posts_count']
+    replies = parse_count(topic.get('replies'))
+    return replies + 1 if replies is not None else None
+
+
+class CrawlState:
+    """按账号保存的增量抓取状态"""
+
+    def __init__(self, state_file: str, retention_days: int = 30):
+        """
+        初始化抓取状态
+
+        Args:
+            state_file: 状态文件路径
+            retention_days: 多少天未再出现的帖子从状态中移除
+        """
+        self.state_file = Path(state_file)
+        self.retention_days = retention_days
+        self.max_topic_id = 0
+        self.max_bumped_at = ''
+        # topic_id(str) -> {posts_count, bumped_at, last_seen}
+        self.topics: Dict[str, Dict[str, Any]] = {}
+        self.counts = {STATUS_NEW: 0, STATUS_UPDATED: 0, STATUS_UNCHANGED: 0}
+        self._load()
+
+    def _load(self):
+        """加载状态文件"""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.max_topic_id = data.get('max_topic_id', 0)
+        self.max_bumped_at = data.get('max_bumped_at', '')
+        self.topics = data.get('topics', {})
+
+    def save(self):
+        """清理过期条目后原子地写回磁盘"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        self.topics = {
+            topic_id: entry for topic_id, entry in self.topics.items()
+            if entry.get('last_seen', '') >= cutoff
+        }
+
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'max_topic_id': self.max_topic_id,
+                'max_bumped_at': self.max_bumped_at,
+                'topics': self.topics,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    @staticmethod
+    def _topic_key(topic: Dict[str, Any]) -> Optional[str]:
+        """帖子 ID（JSON 接口直接提供，页面提取时从链接解析）"""
+        topic_id = topic.get('topic_id') or parse_topic_id(topic.get('link', ''))
+        return str(topic_id) if topic_id else None
+
+    def classify(self, topic: Dict[str, Any]) -> str:
+        """
+        判断帖子相对上次运行的状态（不修改状态）
+
+        Args:
+            topic: 帖子信息
+
+        Returns:
+            new / updated / unchanged
+        """
+        key = self._topic_key(topic)
+        entry = self.topics.get(key) if key else None
+        if not entry:
+            return STATUS_NEW
+
+        posts_count = topic_posts_count(topic)
+        if posts_count is not None and posts_count > entry.get('posts_count', 0):
+            return STATUS_UPDATED
+
+        bumped_at = topic.get('bumped_at', '')
+        if bumped_at and bumped_at > entry.get('bumped_at', ''):
+            return STATUS_UPDATED
+
+        return STATUS_UNCHANGED
+
+    def reset_counts(self):
+        """清零本次运行的统计（任务重试时调用）"""
+        self.counts = {STATUS_NEW: 0, STATUS_UPDATED: 0, STATUS_UNCHANGED: 0}
+
+    def mark(self, topic: Dict[str, Any]) -> str:
+        """
+        分类并在帖子上记录 crawl_status，同时累计统计
+
+        Args:
+            topic: 帖子信息
+
+        Returns:
+            new / updated / unchanged
+        """
+        status = self.classify(topic)
+        topic['crawl_status'] = status
+        self.counts[status] += 1
+        return status
+
+    def is_stop_point(self, topic: Dict[str, Any]) -> bool:
+        """
+        按活跃时间排序的列表中，遇到未变化的非置顶帖子即可停止翻页
+
+        Args:
+            topic: 帖子信息
+
+        Returns:
+            是否停止翻页
+        """
+        return not topic.get('pinned') and self.classify(topic) == STATUS_UNCHANGED
+
+    def record(self, topics: List[Dict[str, Any]]):
+        """
+        记录已处理的帖子并更新高水位
+
+        Args:
+            topics: 已处理（已读取或确认未变化）的帖子
+        """
+        now = datetime.now().isoformat()
+        for topic in topics:
+            key = self._topic_key(topic)
+            if not key:
+                continue
+            entry = self.topics.setdefault(key, {})
+            posts_count = topic_posts_count(topic)
+            if posts_count is not None:
+                entry['posts_count'] = max(posts_count, entry.get('posts_count', 0))
+            bumped_at = topic.get('bumped_at', '')
+            if bumped_at:
+                entry['bumped_at'] = max(bumped_at, entry.get('bumped_at', ''))
+                self.max_bumped_at = max(bumped_at, self.max_bumped_at)
+            entry['last_seen'] = now
+            self.max_topic_id = max(int(key), self.max_topic_id)
+
+    def to_dict(self) -> Dict[str, int]:
+        """导出本次运行的统计"""
+        return dict(self.counts)
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return (
+            f"新帖 {self.counts[STATUS_NEW]} | 有更新 {self.counts[STATUS_UPDATED]} | "
+            f"未变化 {self.counts[STATUS_UNCHANGED]}"
+        )
@@ -0,0 +1,273 @@
+"""近似重复帖子索引
+
+Linux.do 上转帖和同一活动的重复帖子很多（如各分类中的同一"福利羊毛"），按链接去重无法识别。
+这里对规范化后的标题和首帖正文的字符 2-gram 集合计算 MinHash 签名，估算的 Jaccard 相似度达到阈值即视为近似重复：
+- 读取前按标题聚类：重复帖子不再打开页面
+- 读取后按正文聚类：重复帖子不再调用 AI
+每个聚类只有第一个帖子（代表帖）被读取和总结，其余帖子记为代表帖的相关帖子。
+
+签名按 16 段 × 4 个值分桶（LSH），只与至少一段完全相同的帖子比较，查找不需要遍历全部条目。
+安装了 NumPy 时签名向量化计算，否则逐个计算，结果相同。
+索引按账号保存到磁盘，下次运行时仍能识别与之前帖子重复的新帖。
+"""
+import hashlib
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from modules.forum.linuxdo.discourse_api import parse_topic_id
+from modules.forum.linuxdo.interest_ranker import normalize_text
+
+KIND_TITLE = 'title'
+KIND_CONTENT = 'content'
+
+# 签名长度 = 分段数 × 每段值数
+NUM_PERM = 64
+_BANDS = 16
+_ROWS = NUM_PERM // _BANDS
+
+# 哈希函数族 (a * x + b) mod p（a、b、x 都小于 p，乘积不超过 64 位）
+_PRIME = (1 << 31) - 1
+_rng = random.Random(20240501)
+_PERM_A = [_rng.randrange(1, _PRIME) for _ in range(NUM_PERM)]
+_PERM_B = [_rng.randrange(0, _PRIME) for _ in range(NUM_PERM)]
+
+# 参与计算的正文长度
+CONTENT_CHARS = 500
+
+
+def shingles(text: str) -> set:
+    """规范化文本（去掉标点和空格）的字符 2-gram 集合"""
+    text = normalize_text(text).replace(' ', '')
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def minhash(features: set) -> List[int]:
+    """
+    计算特征集合的 MinHash 签名
+
+    Args:
+        features: 特征集合（非空）
+
+    Returns:
+        NUM_PERM 个 31 位整数
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=4).digest(), 'big') % _PRIME
+        for f in features
+    ]
+    if np is not None:
+        x = np.array(hashes, dtype=np.uint64)
+        a = np.array(_PERM_A, dtype=np.uint64)[:, None]
+        b = np.array(_PERM_B, dtype=np.uint64)[:, None]
+        return ((a * x + b) % np.uint64(_PRIME)).min(axis=1).tolist()
+    return [min((a * x + b) % _PRIME for x in hashes) for a, b in zip(_PERM_A, _PERM_B)]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """由两个签名估算 Jaccard 相似度"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def _encode(signature: List[int]) -> str:
+    return ''.join(f'{v:08x}' for v in signature)
+
+
+def _decode(value: str) -> List[int]:
+    return [int(value[i:i + 8], 16) for i in range(0, len(value), 8)]
+
+
+class DedupIndex:
+    """近似重复帖子索引"""
+
+    def __init__(
+        self,
+        index_file: str,
+        title_threshold: float = 0.75,
+        content_threshold: float = 0.7,
+        min_title_chars: int = 8,
+        min_content_chars: int = 100,
+        retention_days: int = 30
+    ):
+        """
+        初始化索引
+
+        Args:
+            index_file: 索引文件路径
+            title_threshold: 标题相似度（Jaccard）达到此值视为重复
+            content_threshold: 正文相似度达到此值视为重复
+            min_title_chars: 标题（去掉标点和空格后）短于此长度时不按标题去重（过短的标题容易误判）
+            min_content_chars: 正文短于此长度时不按正文去重
+            retention_days: 多少天未再出现的条目从索引中移除
+        """
+        self.index_file = Path(index_file)
+        self.thresholds = {KIND_TITLE: title_threshold, KIND_CONTENT: content_threshold}
+        self.min_chars = {KIND_TITLE: min_title_chars, KIND_CONTENT: min_content_chars}
+        self.retention_days = retention_days
+
+        # topic_id -> {link, title, title_signature, content_signature, duplicate_of, last_seen}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # kind -> {(段号, 段内签名值): [代表帖 topic_id]}
+        self._buckets: Dict[str, Dict[tuple, List[str]]] = {KIND_TITLE: {}, KIND_CONTENT: {}}
+        self.counts = {KIND_TITLE: 0, KIND_CONTENT: 0}
+        self._load()
+
+    def _load(self):
+        """加载索引文件"""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            return
+        for key, entry in self.entries.items():
+            if not entry.get('duplicate_of'):
+                self._index(key, entry)
+
+    def save(self):
+        """
+        清理过期条目后原子地写回磁盘
+
+        只保存有正文签名的代表帖及其重复帖：只按标题登记、本次未读取到正文的帖子不保存，
+        避免下次运行时新帖与一个从未被读取的帖子去重
+        """
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        entries = {
+            key: entry for key, entry in self.entries.items()
+            if entry.get('last_seen', '') >= cutoff and entry.get('content_signature')
+        }
+        for key, entry in self.entries.items():
+            if entry.get('duplicate_of') in entries and entry.get('last_seen', '') >= cutoff:
+                entries[key] = entry
+
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+
+    @staticmethod
+    def _topic_key(topic: Dict[str, Any]) -> Optional[str]:
+        """帖子 ID（JSON 接口直接提供，页面提取时从链接解析，都没有时使用链接）"""
+        topic_id = topic.get('topic_id') or parse_topic_id(topic.get('link', ''))
+        return str(topic_id) if topic_id else topic.get('link') or None
+
+    @staticmethod
+    def _bands(signature: List[int]) -> List[tuple]:
+        return [(band, tuple(signature[band * _ROWS:(band + 1) * _ROWS])) for band in range(_BANDS)]
+
+    def _index(self, key: str, entry: Dict[str, Any]):
+        """把代表帖的签名加入分桶"""
+        for kind in (KIND_TITLE, KIND_CONTENT):
+            encoded = entry.get(f'{kind}_signature')
+            if not encoded:
+                continue
+            for bucket in self._bands(_decode(encoded)):
+                keys = self._buckets[kind].setdefault(bucket, [])
+                if key not in keys:
+                    keys.append(key)
+
+    def _unindex(self, key: str, entry: Dict[str, Any]):
+        """从分桶中移除（代表帖在正文阶段被判定为重复帖时）"""
+        for kind in (KIND_TITLE, KIND_CONTENT):
+            encoded = entry.pop(f'{kind}_signature', None)
+            if not encoded:
+                continue
+            for bucket in self._bands(_decode(encoded)):
+                keys = self._buckets[kind].get(bucket, [])
+                if key in keys:
+                    keys.remove(key)
+
+    def _signature(self, topic: Dict[str, Any], kind: str) -> Optional[List[int]]:
+        """帖子的标题或正文签名（文本过短不参与去重时返回 None）"""
+        if kind == KIND_TITLE:
+            text = topic.get('title', '')
+        else:
+            text = (topic.get('content_summary') or {}).get('first_post', '')[:CONTENT_CHARS]
+        if len(normalize_text(text).replace(' ', '')) < self.min_chars[kind]:
+            return None
+        return minhash(shingles(text))
+
+    def find(self, topic: Dict[str, Any], kind: str) -> Optional[Dict[str, Any]]:
+        """
+        查找帖子所属聚类的代表帖
+
+        Args:
+            topic: 帖子信息（按正文查找时需要 content_summary）
+            kind: title / content
+
+        Returns:
+            代表帖条目（含 link、title），不是重复帖时返回 None
+        """
+        key = self._topic_key(topic)
+        entry = self.entries.get(key) if key else None
+        if entry and entry.get('duplicate_of'):
+            representative = self.entries.get(entry['duplicate_of'])
+            if representative:
+                self.counts[kind] += 1
+            return representative
+        if entry and entry.get(f'{kind}_signature'):
+            # 已经按同一种签名登记为代表帖
+            return None
+
+        signature = self._signature(topic, kind)
+        if not signature:
+            return None
+        checked = {key}
+        for bucket in self._bands(signature):
+            for candidate in self._buckets[kind].get(bucket, []):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                encoded = self.entries[candidate].get(f'{kind}_signature')
+                if encoded and similarity(signature, _decode(encoded)) >= self.thresholds[kind]:
+                    self.counts[kind] += 1
+                    return self.entries[candidate]
+        return None
+
+    def add(self, topic: Dict[str, Any], duplicate_of: Optional[Dict[str, Any]] = None):
+        """
+        登记帖子（有正文时同时登记正文签名）
+
+        Args:
+            topic: 帖子信息
+            duplicate_of: find() 返回的代表帖条目（登记为其重复帖）
+        """
+        key = self._topic_key(topic)
+        if not key:
+            return
+        entry = self.entries.setdefault(key, {})
+        entry['link'] = topic.get('link', '')
+        entry['title'] = topic.get('title', '')
+        entry['last_seen'] = datetime.now().isoformat()
+
+        if duplicate_of:
+            self._unindex(key, entry)
+            entry['duplicate_of'] = self._topic_key(duplicate_of)
+            duplicate_of['last_seen'] = entry['last_seen']
+            return
+
+        for kind in (KIND_TITLE, KIND_CONTENT):
+            if entry.get(f'{kind}_signature'):
+                continue
+            signature = self._signature(topic, kind)
+            if signature:
+                entry[f'{kind}_signature'] = _encode(signature)
+        self._index(key, entry)
+
+    def to_dict(self) -> Dict[str, int]:
+        """导出本次运行的统计"""
+        return {'title_duplicates': self.counts[KIND_TITLE], 'content_duplicates': self.counts[KIND_CONTENT]}
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return f"标题重复 {self.counts[KIND_TITLE]} | 正文重复 {self.counts[KIND_CONTENT]}"
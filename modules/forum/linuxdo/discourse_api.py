@@ -0,0 +1,330 @@
+"""Discourse JSON 接口客户端
+
+直接请求 /latest.json、/top.json、/t/{id}.json 获取帖子列表和正文，
+复用浏览器上下文的 cookies（context.request），不需要渲染页面。
+返回的数据结构与 LinuxDoAdapter 的页面提取结果一致。
+"""
+import logging
+import re
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Optional, Callable
+from playwright.async_api import APIRequestContext
+
+
+class ChallengeRequired(Exception):
+    """接口返回了人机验证页面（如 Cloudflare），需要浏览器处理"""
+    pass
+
+
+class TopicUnavailable(RuntimeError):
+    """论坛以 JSON 形式拒绝了请求（无权限、已删除或不存在），只影响这一个资源"""
+    pass
+
+
+class _CookedTextParser(HTMLParser):
+    """
+    从 Discourse 帖子的 cooked HTML 中提取正文和关键点
+
+    与页面提取逻辑保持一致：去掉代码块、引用和图片，关键点取列表项或加粗文本
+    """
+
+    SKIP_TAGS = {'pre', 'code', 'blockquote', 'aside', 'script', 'style'}
+    BLOCK_TAGS = {'p', 'div', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'ul', 'ol'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.list_items: List[str] = []
+        self.bold_texts: List[str] = []
+        self._skip_depth = 0
+        self._capture_stack: List[List[str]] = []
+        self._capture_tags: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+        if tag in ('li', 'strong', 'b') and not self._skip_depth:
+            self._capture_tags.append(tag)
+            self._capture_stack.append([])
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._capture_tags and self._capture_tags[-1] == tag:
+            self._capture_tags.pop()
+            text = ''.join(self._capture_stack.pop()).strip()
+            (self.list_items if tag == 'li' else self.bold_texts).append(text)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self.parts.append(data)
+        for buffer in self._capture_stack:
+            buffer.append(data)
+
+    def text(self) -> str:
+        text = ''.join(self.parts)
+        text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+        text = re.sub(r'\s*\n\s*', '\n', text)
+        return text.strip()
+
+
+def extract_post_content(cooked: str, max_chars: int = 6000) -> Dict[str, Any]:
+    """
+    从 cooked HTML 提取正文摘要
+
+    Args:
+        cooked: 帖子 HTML
+        max_chars: 正文最大字符数
+
+    Returns:
+        包含 first_post 和 key_points 的字典
+    """
+    parser = _CookedTextParser()
+    parser.feed(cooked or '')
+    parser.close()
+
+    text = parser.text()
+    if len(text) > max_chars:
+        text = text[:max_chars] + '...'
+
+    key_points = [t for t in parser.list_items[:3] if 10 < len(t) < 100]
+    if not key_points:
+        key_points = [t for t in parser.bold_texts[:3] if 5 < len(t) < 100]
+
+    return {'first_post': text, 'key_points': key_points}
+
+
+def parse_topic_id(link: str) -> Optional[int]:
+    """
+    从帖子链接解析帖子 ID
+
+    支持 /t/slug/123、/t/slug/123/4、/t/123、/t/123/4 以及完整 URL
+    （slug 不会是纯数字，/t/123/4 中的 123 是帖子 ID、4 是楼层号）
+
+    Args:
+        link: 帖子链接
+
+    Returns:
+        帖子 ID，无法解析时返回 None
+    """
+    match = re.search(r'/t/(?:[^/?#]*[^\d/?#][^/?#]*/)?(\d+)(?:/\d+)?/?(?:[?#]|$)', link or '')
+    return int(match.group(1)) if match else None
+
+
+class DiscourseClient:
+    """Discourse JSON 接口客户端"""
+
+    def __init__(
+        self,
+        request: APIRequestContext,
+        site_url: str,
+        logger: Optional[logging.Logger] = None,
+        timeout: int = 30000
+    ):
+        """
+        初始化客户端
+
+        Args:
+            request: 请求上下文（使用 context.request 以共享浏览器 cookies）
+            site_url: 站点 URL
+            logger: 日志记录器
+            timeout: 请求超时（毫秒）
+        """
+        self.request = request
+        self.site_url = site_url.rstrip('/')
+        self.logger = logger or logging.getLogger(__name__)
+        self.timeout = timeout
+        self._categories: Optional[Dict[int, str]] = None
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        请求 JSON 接口
+
+        Args:
+            path: 接口路径（如 /latest.json）
+            params: 查询参数
+
+        Returns:
+            解析后的 JSON
+
+        Raises:
+            ChallengeRequired: 返回了人机验证页面
+            TopicUnavailable: 论坛返回了 JSON 格式的 403/404/410（无权限或不存在）
+            RuntimeError: 其他请求错误
+        """
+        response = await self.request.get(
+            f"{self.site_url}{path}",
+            params=params,
+            headers={'Accept': 'application/json', 'X-Requested-With': 'XMLHttpRequest'},
+            timeout=self.timeout
+        )
+        content_type = response.headers.get('content-type', '')
+        is_json = 'json' in content_type
+
+        # 人机验证页面是 HTML（或带 cf-mitigated 头）；论坛自身的 403 是 JSON 格式的权限错误
+        if 'cf-mitigated' in response.headers or (not is_json and (response.ok or response.status in (403, 503))):
+            raise ChallengeRequired(f"{path} 返回 {response.status} ({content_type or '无类型'})")
+        if is_json and response.status in (403, 404, 410):
+            raise TopicUnavailable(f"{path} 不可访问: HTTP {response.status}")
+        if not response.ok:
+            raise RuntimeError(f"{path} 请求失败: HTTP {response.status}")
+
+        return await response.json()
+
+    async def get_categories(self) -> Dict[int, str]:
+        """
+        获取分类 ID 到名称的映射（每个客户端只请求一次）
+
+        Returns:
+            {分类ID: 分类名称}
+        """
+        if self._categories is None:
+            try:
+                site = await self.get_json('/site.json')
+                self._categories = {c['id']: c.get('name', '') for c in site.get('categories', [])}
+            except ChallengeRequired:
+                raise
+            except Exception as e:
+                self.logger.debug(f"获取分类列表失败: {str(e)}")
+                self._categories = {}
+        return self._categories
+
+    def _topic_from_json(
+        self,
+        topic: Dict[str, Any],
+        users: Dict[int, str],
+        categories: Dict[int, str]
+    ) -> Dict[str, Any]:
+        """将接口中的帖子转换为与页面提取一致的结构"""
+        author = ''
+        for poster in topic.get('posters', []):
+            if 'Original Poster' in poster.get('description', '') or not author:
+                author = users.get(poster.get('user_id'), author)
+
+        posts_count = topic.get('posts_count', 1)
+        return {
+            'title': topic.get('title', ''),
+            'link': f"/t/{topic.get('slug', 'topic')}/{topic['id']}",
+            'author': author,
+            'replies': str(max(posts_count - 1, 0)),
+            'views': str(topic.get('views', 0)),
+            'lastActivity': topic.get('bumped_at') or topic.get('last_posted_at') or '',
+            'category': categories.get(topic.get('category_id'), ''),
+            'topic_id': topic['id'],
+            'posts_count': posts_count,
+            'bumped_at': topic.get('bumped_at', ''),
+            'pinned': bool(topic.get('pinned')),
+        }
+
+    async def list_topics(
+        self,
+        path: str,
+        limit: int,
+        params: Optional[Dict[str, Any]] = None,
+        max_pages: int = 5,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取帖子列表（自动翻页直到达到数量）
+
+        Args:
+            path: 列表接口路径（如 /latest.json）
+            limit: 数量限制
+            params: 额外查询参数
+            max_pages: 最多翻页数
+            stop_when: 当前页出现满足条件的帖子时不再翻页（用于增量抓取）
+
+        Returns:
+            帖子列表
+        """
+        categories = await self.get_categories()
+        topics: List[Dict[str, Any]] = []
+        seen = set()
+
+        for page in range(max_pages):
+            query = dict(params or {})
+            if page:
+                query['page'] = page
+            data = await self.get_json(path, query)
+
+            users = {u['id']: u.get('username', '') for u in data.get('users', [])}
+            topic_list = data.get('topic_list', {})
+            reached_known = False
+            for topic in topic_list.get('topics', []):
+                if topic['id'] in seen:
+                    continue
+                seen.add(topic['id'])
+                item = self._topic_from_json(topic, users, categories)
+                topics.append(item)
+                if len(topics) >= limit:
+                    return topics
+                if stop_when and stop_when(item):
+                    reached_known = True
+
+            if reached_known:
+                self.logger.debug(f"{path} 第 {page + 1} 页已到达上次处理过的帖子，停止翻页")
+                break
+            if not topic_list.get('more_topics_url'):
+                break
+
+        return topics
+
+    async def get_topic_content(
+        self,
+        topic_link: str,
+        max_chars: int = 6000,
+        top_replies: int = 0,
+        reply_max_chars: int = 1500
+    ) -> Dict[str, Any]:
+        """
+        获取帖子第一楼内容和点赞最多的回复
+
+        Args:
+            topic_link: 帖子链接
+            max_chars: 正文最大字符数
+            top_replies: 附带的回复数（取第一页中点赞最多的回复，按楼层顺序排列）
+            reply_max_chars: 每条回复最大字符数
+
+        Returns:
+            包含 first_post、key_points 和 replies（回复正文列表）的字典
+        """
+        topic_id = parse_topic_id(topic_link)
+        if topic_id is None:
+            raise ValueError(f"无法解析帖子 ID: {topic_link}")
+
+        data = await self.get_json(f"/t/{topic_id}.json")
+        posts = data.get('post_stream', {}).get('posts', [])
+        first_post = next((p for p in posts if p.get('post_number') == 1), posts[0] if posts else None)
+        if not first_post:
+            return {"first_post": "", "key_points": [], "replies": []}
+
+        content = extract_post_content(first_post.get('cooked', ''), max_chars=max_chars)
+        content['replies'] = self._top_replies(posts, first_post, top_replies, reply_max_chars)
+        return content
+
+    @staticmethod
+    def _top_replies(posts: List[Dict[str, Any]], first_post: Dict[str, Any], count: int, max_chars: int) -> List[str]:
+        """第一页中点赞最多的回复正文（过短的回复不计）"""
+        if count <= 0:
+            return []
+
+        def likes(post):
+            if post.get('like_count') is not None:
+                return post['like_count']
+            return sum(a.get('count', 0) for a in post.get('actions_summary', []) if a.get('id') == 2)
+
+        replies = []
+        for post in posts:
+            if post is first_post or post.get('post_type', 1) != 1:
+                continue
+            text = extract_post_content(post.get('cooked', ''), max_chars=max_chars)['first_post']
+            if len(text) >= 20:
+                replies.append((likes(post), post.get('post_number', 0), text))
+
+        top = sorted(replies, key=lambda r: (-r[0], r[1]))[:count]
+        return [text for _, _, text in sorted(top, key=lambda r: r[1])]
@@ -0,0 +1,320 @@
+"""本地抽取式摘要
+
+不调用 AI 时（未配置 API、调用失败或使用 extractive 模式）在本地生成与 AI 总结相同结构的结果：
+- 按中英文句末标点和换行分句
+- 句子表示为字符 n-gram 的 TF-IDF 向量，按句子间余弦相似度构图做 TextRank，
+  随机跳转偏向靠前的句子和与标题相似的句子；得分最高的句子作为摘要和关键点
+- 按词频从正文中提取标签（英文单词和中文 2-4 字片段，去掉虚词）
+
+安装了 NumPy 时整篇向量化计算（正文 6000 字约 2-10 毫秒），否则逐句计算，结果相同。
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from modules.forum.linuxdo.content_prep import REPLY_MARKER, clean_content
+from modules.forum.linuxdo.interest_ranker import hash_ngrams_np, hash_ngrams_py, normalize_text
+
+# 摘要结果版本（修改算法时递增，使缓存的分析结果失效）
+EXTRACTIVE_VERSION = 1
+
+# 参与排序的句子数上限（超出部分丢弃，长帖中靠后的回复）
+MAX_SENTENCES = 120
+
+# 句子（去掉标点和空格后）短于此长度时不参与排序
+MIN_SENTENCE_CHARS = 6
+
+# TextRank 阻尼系数和迭代次数
+_DAMPING = 0.85
+_ITERATIONS = 30
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[。！？!?；;…])|\n|(?<=\.)\s+')
+_LATIN_WORD = re.compile(r'[A-Za-z][A-Za-z0-9+#.\-]*[A-Za-z0-9+#]')
+
+# 不构成关键词的中文虚词和代词
+_CJK_STOP_CHARS = set('的了是在我你他她它们这那哪吗呢吧啊呀哦就都也和与及或而但很还被把给着过么个些吧嘛啦')
+# 英文单词（多为产品名、命令名）作为关键词时的得分权重（中文片段为 √长度）
+_LATIN_WEIGHT = 2.0
+_LATIN_STOP_WORDS = {
+    'the', 'and', 'for', 'with', 'this', 'that', 'you', 'are', 'was', 'not', 'but', 'can', 'have', 'has',
+    'from', 'will', 'your', 'its', 'any', 'all', 'one', 'use', 'http', 'https', 'www', 'com', 'to', 'of',
+    'in', 'on', 'is', 'it', 'be', 'as', 'at', 'or', 'an', 'if', 'so', 'do', 'no', 'we', 'my', 'me',
+}
+
+# 按标题和正文开头的关键字粗略判断分类（依次匹配，都不匹配时为"其他"）
+_CATEGORY_RULES = [
+    ('求助', re.compile(r'[?？]|求助|请问|请教|怎么|如何|为什么|有没有|求推荐')),
+    ('分享', re.compile(r'分享|教程|推荐|开源|发布|整理|合集|免费|福利')),
+    ('技术讨论', re.compile(r'讨论|对比|评测|原理|架构|性能|部署|配置|代码|bug', re.IGNORECASE)),
+]
+
+# 摘要和关键点的最大长度（与 AI 总结提示词中的要求一致）
+SUMMARY_CHARS = 50
+KEY_POINT_CHARS = 60
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    分句（中英文句末标点、分号和换行）
+
+    Args:
+        text: 清理后的正文
+
+    Returns:
+        去掉首尾空白和回复标记的句子列表（过短的句子和重复的句子已去掉）
+    """
+    sentences = []
+    seen = set()
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.replace(REPLY_MARKER, '').strip()
+        if len(normalize_text(sentence).replace(' ', '')) >= MIN_SENTENCE_CHARS and sentence not in seen:
+            seen.add(sentence)
+            sentences.append(sentence)
+    return sentences
+
+
+def _cjk_terms_np(text: str) -> Counter:
+    """NumPy 统计中文 2-4 字片段的出现次数（不含虚词，只保留出现两次以上的）"""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    stop = np.array(sorted(ord(ch) for ch in _CJK_STOP_CHARS), dtype=np.int64)
+    valid = (codes >= 0x4e00) & (codes <= 0x9fff) & ~np.isin(codes, stop)
+
+    # 码位小于 2^21：2-3 个字直接拼接成整数作为键，4 字片段用 3 字片段的序号和第 4 个字拼接
+    mask = (1 << 21) - 1
+    valid2 = valid[:-1] & valid[1:]
+    valid3 = valid2[:-1] & valid[2:]
+    valid4 = valid3[:-1] & valid[3:]
+    keys2 = codes[:-1] << 21 | codes[1:]
+    keys3 = codes[:-2] << 42 | codes[1:-1] << 21 | codes[2:]
+    trigrams, trigram_ids = np.unique(keys3, return_inverse=True)
+    keys4 = trigram_ids[:-1] << 21 | codes[3:]
+
+    def decode3(key):
+        return chr(key >> 42) + chr((key >> 21) & mask) + chr(key & mask)
+
+    decoders = (
+        lambda key: chr(key >> 21) + chr(key & mask),
+        decode3,
+        lambda key: decode3(int(trigrams[key >> 21])) + chr(key & mask),
+    )
+    counts = Counter()
+    for keys, kept, decode in zip((keys2, keys3, keys4), (valid2, valid3, valid4), decoders):
+        unique, freq = np.unique(keys[kept], return_counts=True)
+        repeated = freq >= 2
+        for key, count in zip(unique[repeated].tolist(), freq[repeated].tolist()):
+            counts[decode(key)] = count
+    return counts
+
+
+def _cjk_terms_py(text: str) -> Counter:
+    """纯 Python 统计中文 2-4 字片段的出现次数（与 NumPy 版本结果一致）"""
+    valid = [('\u4e00' <= ch <= '\u9fff') and ch not in _CJK_STOP_CHARS for ch in text]
+    counts = Counter()
+    for length in (2, 3, 4):
+        for i in range(len(text) - length + 1):
+            if all(valid[i:i + length]):
+                counts[text[i:i + length]] += 1
+    return Counter({term: count for term, count in counts.items() if count >= 2})
+
+
+def extract_keywords(text: str, limit: int = 3) -> List[str]:
+    """
+    按词频提取关键词
+
+    英文单词（不区分大小写计数，保留最常见的写法）和中文 2-4 字片段都出现两次以上才计入，
+    按 出现次数 × 长度加权 排序，与已选关键词重叠的片段（如"服务器"和"服务"）只保留得分高的
+
+    Args:
+        text: 清理后的正文
+        limit: 返回数量
+
+    Returns:
+        关键词列表
+    """
+    latin = Counter()
+    spellings: Dict[str, Counter] = {}
+    for word in _LATIN_WORD.findall(text):
+        lower = word.lower()
+        if lower in _LATIN_STOP_WORDS or len(lower) < 2:
+            continue
+        latin[lower] += 1
+        spellings.setdefault(lower, Counter())[word] += 1
+
+    cjk = _cjk_terms_np(text) if np is not None else _cjk_terms_py(text)
+
+    candidates = [(count * _LATIN_WEIGHT, spellings[word].most_common(1)[0][0]) for word, count in latin.items() if count >= 2]
+    candidates.extend((count * math.sqrt(len(term)), term) for term, count in cjk.items())
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    keywords = []
+    for _, term in candidates:
+        lower = term.lower()
+        if any(lower in k.lower() or k.lower() in lower for k in keywords):
+            continue
+        keywords.append(term)
+        if len(keywords) >= limit:
+            break
+    return keywords
+
+
+def _position_prior(count: int) -> List[float]:
+    """随机跳转中的位置先验（靠前的句子权重大）"""
+    weights = [1 / math.sqrt(i + 1) for i in range(count)]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def _textrank_np(sentences: List[str], title: str) -> List[float]:
+    """NumPy 计算句子得分"""
+    n = len(sentences)
+    rows, feats = hash_ngrams_np(sentences + [title])
+    vocabulary, columns = np.unique(feats, return_inverse=True)
+    in_sentences = rows < n
+    df = np.bincount(columns[in_sentences], minlength=len(vocabulary))
+    in_title = np.zeros(len(vocabulary), dtype=bool)
+    in_title[columns[~in_sentences]] = True
+
+    # 向量长度按全部特征计算；相似度只涉及至少两行共有的特征，矩阵只保留这些列
+    weights = np.log((1 + n) / (1 + df[columns])) + 1
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n + 1))
+    shared = (df >= 2) | (in_title & (df >= 1))
+    compact = np.cumsum(shared) - 1
+    kept = shared[columns]
+    matrix = np.zeros((n + 1, int(shared.sum())), dtype=np.float64)
+    matrix[rows[kept], compact[columns[kept]]] = weights[kept] / np.maximum(norms[rows[kept]], 1e-9)
+
+    similarity = matrix[:n] @ matrix[:n].T
+    np.fill_diagonal(similarity, 0.0)
+    transition = similarity / np.maximum(similarity.sum(axis=1, keepdims=True), 1e-9)
+
+    title_similarity = matrix[:n] @ matrix[n]
+    jump = np.array(_position_prior(n)) + title_similarity / max(title_similarity.sum(), 1e-9)
+    jump /= jump.sum()
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(_ITERATIONS):
+        scores = (1 - _DAMPING) * jump + _DAMPING * (transition.T @ scores)
+    return scores.tolist()
+
+
+def _textrank_py(sentences: List[str], title: str) -> List[float]:
+    """纯 Python 计算句子得分（与 NumPy 版本结果一致）"""
+    n = len(sentences)
+    features = [hash_ngrams_py(normalize_text(s)) for s in sentences]
+    df = Counter(f for feats in features for f in feats)
+    idf = {f: math.log((1 + n) / (1 + count)) + 1 for f, count in df.items()}
+
+    def vector(feats):
+        weights = {f: idf.get(f, math.log(1 + n) + 1) for f in feats}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1e-9
+        return {f: w / norm for f, w in weights.items()}
+
+    vectors = [vector(feats) for feats in features]
+    title_vector = vector(hash_ngrams_py(normalize_text(title)))
+
+    def dot(a, b):
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(w * b.get(f, 0.0) for f, w in a.items())
+
+    similarity = [[dot(vectors[i], vectors[j]) if i != j else 0.0 for j in range(n)] for i in range(n)]
+    row_sums = [max(sum(row), 1e-9) for row in similarity]
+
+    title_similarity = [dot(v, title_vector) for v in vectors]
+    title_total = max(sum(title_similarity), 1e-9)
+    jump = [p + t / title_total for p, t in zip(_position_prior(n), title_similarity)]
+    jump_total = sum(jump)
+    jump = [j / jump_total for j in jump]
+
+    scores = [1.0 / n] * n
+    for _ in range(_ITERATIONS):
+        scores = [
+            (1 - _DAMPING) * jump[j]
+            + _DAMPING * sum(similarity[i][j] / row_sums[i] * scores[i] for i in range(n))
+            for j in range(n)
+        ]
+    return scores
+
+
+def _clip(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + '...'
+
+
+def _guess_category(title: str, text: str) -> str:
+    head = f"{title}\n{text[:200]}"
+    for category, pattern in _CATEGORY_RULES:
+        if pattern.search(head):
+            return category
+    return '其他'
+
+
+class ExtractiveSummarizer:
+    """本地抽取式摘要（结果字段与 AI 总结相同）"""
+
+    def __init__(self, key_points: int = 3, tags: int = 3):
+        """
+        初始化摘要器
+
+        Args:
+            key_points: 关键点数量
+            tags: 标签数量
+        """
+        self.key_points = key_points
+        self.tags = tags
+
+    def rank_sentences(self, sentences: List[str], title: str = '') -> List[Tuple[int, float]]:
+        """
+        为句子打分
+
+        Args:
+            sentences: 句子列表
+            title: 帖子标题（与标题相似的句子得分更高）
+
+        Returns:
+            按得分降序的 (句子序号, 得分)
+        """
+        if not sentences:
+            return []
+        if len(sentences) == 1:
+            return [(0, 1.0)]
+        scores = _textrank_np(sentences, title) if np is not None else _textrank_py(sentences, title)
+        return sorted(enumerate(scores), key=lambda s: (-s[1], s[0]))
+
+    def summarize(self, content: str, title: str = '') -> Dict[str, Any]:
+        """
+        生成摘要
+
+        Args:
+            content: 帖子正文（可包含 REPLY_MARKER 分隔的回复）
+            title: 帖子标题
+
+        Returns:
+            总结结果字典（summary/key_points/tags/sentiment/category）
+        """
+        text = clean_content(content)
+        all_sentences = split_sentences(text)
+        sentences = all_sentences[:MAX_SENTENCES]
+        ranked = self.rank_sentences(sentences, title)
+
+        if ranked:
+            summary = _clip(sentences[ranked[0][0]], SUMMARY_CHARS)
+            top = sorted(index for index, _ in ranked[:self.key_points])
+            key_points = [_clip(sentences[index], KEY_POINT_CHARS) for index in top] if len(sentences) > 1 else []
+        else:
+            summary = _clip(text.replace('\n', ' '), 150)
+            key_points = []
+
+        return {
+            "summary": summary,
+            "key_points": key_points,
+            "tags": extract_keywords('\n'.join([title] + (all_sentences or [text])), self.tags),
+            "sentiment": "neutral",
+            "category": _guess_category(title, text),
+        }
+
@@ -0,0 +1,427 @@
+"""Linux.do 帖子处理流水线
+
+列表 → 过滤 → 读取内容 → AI 分析 四个阶段通过 asyncio 队列串联：
+每个列表返回并过滤后立即进入读取队列，每篇内容读取完成后立即进入 AI 队列，
+各阶段有独立的并发上限，队列有长度上限（下游处理不过来时上游等待）。
+总耗时接近最慢的阶段，而不是各阶段耗时之和。
+AI 阶段可以批量总结（ai_batch_size > 1）：把已读取完成的多个帖子合并到一次请求中。
+
+读取前先查缓存：已有 AI 分析结果和正文、且回复数没有增加的帖子直接复用，
+不打开页面也不占用读取和 AI 名额，名额留给后面的新帖子。
+
+提供近似重复索引时，标题与已登记帖子近似的帖子不读取，正文近似的帖子不调用 AI，
+重复帖子记在代表帖的 related_topics 中。标题按读取顺序（评分优先）登记，
+只有实际读取（或复用缓存）的帖子才会成为代表帖。
+"""
+import asyncio
+import itertools
+import time
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional
+
+from modules.forum.linuxdo.ai_analyzer import FallbackSummary
+from modules.forum.linuxdo.content_prep import thread_text
+from modules.forum.linuxdo.crawl_state import STATUS_UNCHANGED, topic_posts_count
+from modules.forum.linuxdo.dedup_index import KIND_TITLE, KIND_CONTENT
+
+# 列表来源：(结果分组名, 获取函数)
+ListSource = Tuple[str, Callable[[], Awaitable[List[Dict[str, Any]]]]]
+
+
+class StageTimer:
+    """记录阶段从开始到结束的时间跨度"""
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.items = 0
+
+    def start(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class TopicPipeline:
+    """帖子处理流水线"""
+
+    def __init__(
+        self,
+        adapter,
+        read_limit: int,
+        ai_limit: int,
+        read_concurrency: int = 3,
+        ai_concurrency: int = 3,
+        queue_size: int = 10,
+        list_interval: float = 0.3,
+        read_interval: float = 0.3,
+        crawl_state=None,
+        ai_batch_size: int = 1,
+        ai_batch_linger: float = 0.5,
+        dedup=None
+    ):
+        """
+        初始化流水线
+
+        Args:
+            adapter: LinuxDoAdapter（提供过滤、读取、AI 分析器和缓存）
+            read_limit: 读取内容的帖子数
+            ai_limit: AI 分析的帖子数
+            read_concurrency: 读取并发数
+            ai_concurrency: AI 分析并发数
+            queue_size: 各阶段队列长度上限
+            list_interval: 列表请求间隔（秒，避免触发限制）
+            read_interval: 每次读取前的间隔（秒）
+            crawl_state: 增量抓取状态（CrawlState），提供时只读取新帖和有更新的帖子
+            ai_batch_size: 每次 AI 请求最多总结的帖子数（1 为逐个总结）
+            ai_batch_linger: 批量模式下等待更多帖子读取完成的最长时间（秒）
+            dedup: 近似重复帖子索引（DedupIndex），提供时每组重复帖子只读取和分析一篇
+        """
+        self.adapter = adapter
+        self.logger = adapter.logger
+        self.read_limit = read_limit
+        self.ai_limit = ai_limit
+        self.read_concurrency = read_concurrency
+        self.ai_concurrency = ai_concurrency
+        self.queue_size = queue_size
+        self.list_interval = list_interval
+        self.read_interval = read_interval
+        self.crawl_state = crawl_state
+        self.ai_batch_size = ai_batch_size
+        self.ai_batch_linger = ai_batch_linger
+        self.dedup = dedup
+
+        self.timers = {'list': StageTimer(), 'read': StageTimer(), 'ai': StageTimer()}
+        self.wall_seconds = 0.0
+        self.reads_skipped = 0
+        self.duplicates_skipped = 0
+
+    def _plan_from_cache(self, topic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        查找可以直接复用的缓存结果
+
+        Args:
+            topic: 列表中的帖子
+
+        Returns:
+            带内容和 AI 分析结果的帖子；没有缓存、缓存中没有正文或回复数增加时返回 None
+        """
+        cached = self.adapter.cache.get(topic)
+        if not cached:
+            return None
+        cached_topic = cached.get('topic', {})
+        content = cached_topic.get('content_summary')
+        if not content or not content.get('first_post', '').strip():
+            return None
+
+        cached_posts = topic_posts_count(cached_topic)
+        current_posts = topic_posts_count(topic)
+        if cached_posts is not None and current_posts is not None and current_posts > cached_posts:
+            return None
+
+        planned = topic.copy()
+        planned['content_summary'] = content
+        planned['ai_summary'] = cached.get('analysis', {})
+        return planned
+
+    def _is_duplicate(self, topic: Dict[str, Any], kind: str) -> bool:
+        """
+        按标题或正文检查近似重复并登记帖子
+
+        Args:
+            topic: 帖子信息
+            kind: title / content
+
+        Returns:
+            是否为已登记帖子的重复帖（是时在帖子上记录 duplicate_of）
+        """
+        if not self.dedup:
+            return False
+        representative = self.dedup.find(topic, kind)
+        self.dedup.add(topic, representative)
+        if not representative:
+            return False
+        topic['duplicate_of'] = {'title': representative.get('title', ''), 'link': representative.get('link', '')}
+        self.duplicates_skipped += 1
+        return True
+
+    @staticmethod
+    def _attach_related(duplicates: List[Dict[str, Any]], *topic_lists: List[Dict[str, Any]]):
+        """把重复帖子记到代表帖的 related_topics 中"""
+        related: Dict[str, List[Dict[str, str]]] = {}
+        for topic in duplicates:
+            related.setdefault(topic['duplicate_of']['link'], []).append(
+                {'title': topic.get('title', ''), 'link': topic['link']}
+            )
+        for topics in topic_lists:
+            for topic in topics:
+                if topic['link'] in related:
+                    topic['related_topics'] = related[topic['link']]
+
+    async def run(self, sources: List[ListSource]) -> Dict[str, Any]:
+        """
+        运行流水线
+
+        Args:
+            sources: 列表来源（按顺序串行请求）
+
+        Returns:
+            字典，包含：
+            - lists: {分组名: 过滤后的帖子列表}
+            - all_topics: 去重后的全部帖子（按评分排序）
+            - topics_with_content: 读取到内容的帖子（按评分排序）
+            - ai_summaries: 有 AI 分析结果的帖子（按评分排序）
+            - cached_count: 使用缓存的帖子数
+            - duplicates: 近似重复而未读取或未分析的帖子（带 duplicate_of）
+            - skipped: 已成功读取但无需分析的帖子（正文为空、过短或帖子不可访问）
+            - processed: 本次已处理完的帖子（未变化、已完成分析、近似重复和 skipped），
+              用于记录增量抓取状态；读取失败、超出名额和 AI 调用失败的帖子不在其中，下次运行仍会处理
+        """
+        # 读取队列按评分优先：后到的高分帖子会排在先到的低分帖子前面
+        read_queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=self.queue_size)
+        ai_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        sequence = itertools.count()
+
+        lists: Dict[str, List[Dict[str, Any]]] = {}
+        all_topics: List[Dict[str, Any]] = []
+        topics_with_content: List[Dict[str, Any]] = []
+        ai_summaries: List[Dict[str, Any]] = []
+        duplicates: List[Dict[str, Any]] = []
+        skipped: List[Dict[str, Any]] = []
+        counters = {'read_started': 0, 'ai_considered': 0, 'cached': 0}
+        wall_start = time.perf_counter()
+
+        async def produce():
+            timer = self.timers['list']
+            timer.start()
+            seen = set()
+            for index, (group, fetch) in enumerate(sources):
+                if index:
+                    await asyncio.sleep(self.list_interval)
+                try:
+                    raw_topics = await fetch()
+                except Exception as e:
+                    self.logger.debug(f"列表 '{group}' 获取失败: {str(e)}")
+                    continue
+
+                filtered = self.adapter._filter_quality_topics(raw_topics) if raw_topics else []
+                lists.setdefault(group, []).extend(filtered)
+                for topic in filtered:
+                    if topic['link'] in seen:
+                        continue
+                    seen.add(topic['link'])
+                    all_topics.append(topic)
+                    timer.items += 1
+                    # 上次运行后没有变化的帖子不再读取和分析
+                    if self.crawl_state and self.crawl_state.mark(topic) == STATUS_UNCHANGED:
+                        continue
+                    await read_queue.put((-topic.get('quality_score', 0), next(sequence), topic))
+            timer.finish()
+
+            # 每个读取任务一个结束标记（排在所有帖子之后）
+            for _ in range(self.read_concurrency):
+                await read_queue.put((float('inf'), next(sequence), None))
+
+        async def read_worker():
+            timer = self.timers['read']
+            while True:
+                _, _, topic = await read_queue.get()
+                if topic is None:
+                    return
+                # 可以复用缓存的帖子不打开页面，不占用读取名额（名额用完后仍可复用）
+                planned = self._plan_from_cache(topic)
+                # 读取名额用完后继续取出队列中的帖子（不读取），避免上游阻塞
+                if not planned and counters['read_started'] >= self.read_limit:
+                    continue
+                # 标题与已登记帖子近似的转帖/重复帖不读取（在确定读取时才登记，代表帖一定会被读取）
+                if self._is_duplicate(topic, KIND_TITLE):
+                    duplicates.append(topic)
+                    continue
+
+                if planned:
+                    if self.dedup:
+                        self.dedup.add(planned)
+                    self.reads_skipped += 1
+                    counters['cached'] += 1
+                    topics_with_content.append(planned)
+                    ai_summaries.append(planned)
+                    continue
+
+                counters['read_started'] += 1
+                timer.start()
+
+                await asyncio.sleep(self.read_interval)
+                try:
+                    content = await self.adapter.get_topic_content(topic['link'])
+                except Exception as e:
+                    self.logger.debug(f"内容获取失败: {topic['title'][:30]} ({str(e)})")
+                    content = None
+                timer.finish()
+
+                if content and content.get('first_post', '').strip():
+                    topic_with_content = topic.copy()
+                    topic_with_content['content_summary'] = content
+                    topics_with_content.append(topic_with_content)
+                    timer.items += 1
+                    # 正文与已登记帖子近似的帖子不再 AI 分析
+                    if self._is_duplicate(topic_with_content, KIND_CONTENT):
+                        duplicates.append(topic_with_content)
+                        continue
+                    await ai_queue.put(topic_with_content)
+                elif content is not None:
+                    # 读取成功但正文为空（纯图片帖、已删除或无权限）：不分析，但记为已处理
+                    skipped.append(topic)
+
+        def use_cached(topic, cached_data):
+            topic['ai_summary'] = cached_data.get('analysis', {})
+            # 正文未变但回复数增加：更新缓存中的帖子信息，下次运行可直接复用
+            if topic_posts_count(topic) != topic_posts_count(cached_data.get('topic', {})):
+                self.adapter.cache.set(topic, topic['ai_summary'], cached_data.get('version'))
+            ai_summaries.append(topic)
+            counters['cached'] += 1
+
+        async def prepare(topic) -> Optional[str]:
+            """检查名额和缓存并认领帖子，需要调用 AI 时返回正文"""
+            cache = self.adapter.cache
+            content = topic.get('content_summary', {})
+            # 正文过短的帖子不分析（不占用 AI 名额），记为已处理
+            if len(content.get('first_post', '')) <= 100:
+                skipped.append(topic)
+                return None
+
+            if counters['ai_considered'] >= self.ai_limit:
+                return None
+            counters['ai_considered'] += 1
+
+            cached_data = cache.get(topic)
+            if cached_data:
+                use_cached(topic, cached_data)
+                return None
+
+            # 首帖和高赞回复一起分析（全文过长时分段总结）
+            content_text = thread_text(content)
+
+            # 其他进程（另一个账号或重叠的定时任务）正在分析同一帖子时等待其结果
+            if not cache.claim(topic):
+                cached_data = await cache.wait_for_result(topic)
+                if cached_data:
+                    use_cached(topic, cached_data)
+                    return None
+            return content_text
+
+        async def collect_batch(first):
+            """批量模式下收集已就绪的帖子（最多等待 ai_batch_linger 秒），返回 (帖子列表, 是否已收到结束标记)"""
+            batch = [first]
+            deadline = time.monotonic() + self.ai_batch_linger
+            while len(batch) < self.ai_batch_size:
+                try:
+                    topic = ai_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    if time.monotonic() >= deadline:
+                        break
+                    await asyncio.sleep(0.05)
+                    continue
+                if topic is None:
+                    return batch, True
+                batch.append(topic)
+            return batch, False
+
+        async def analyze(pending):
+            timer = self.timers['ai']
+            cache = self.adapter.cache
+            analyzer = self.adapter.ai_analyzer
+            timer.start()
+            try:
+                if len(pending) == 1:
+                    topic, content_text = pending[0]
+                    results = {'0': await analyzer.summarize_topic(topic, content_text)}
+                else:
+                    results = await analyzer.summarize_topics(
+                        [(str(index), topic, content_text) for index, (topic, content_text) in enumerate(pending)]
+                    )
+            except Exception as e:
+                self.logger.debug(f"AI 分析失败: {len(pending)} 个帖子 ({str(e)})")
+                results = {}
+            finally:
+                timer.finish()
+
+            for index, (topic, _) in enumerate(pending):
+                ai_result = results.get(str(index))
+                if ai_result is not None:
+                    topic['ai_summary'] = ai_result
+                    ai_summaries.append(topic)
+                    timer.items += 1
+                    # AI 调用失败时的抽取式摘要不按 AI 版本缓存，下次运行重新分析；
+                    # AI 结果按实际返回结果的接口的版本缓存
+                    if not isinstance(ai_result, FallbackSummary):
+                        cache.set(topic, ai_result, getattr(ai_result, 'version', None))
+                cache.release(topic)
+
+        async def ai_worker():
+            while True:
+                topic = await ai_queue.get()
+                if topic is None:
+                    return
+                topics, stop = await collect_batch(topic) if self.ai_batch_size > 1 else ([topic], False)
+
+                pending = []
+                for topic in topics:
+                    content_text = await prepare(topic)
+                    if content_text:
+                        pending.append((topic, content_text))
+                if pending:
+                    await analyze(pending)
+                if stop:
+                    return
+
+        readers = [asyncio.create_task(read_worker()) for _ in range(self.read_concurrency)]
+        analyzers = [asyncio.create_task(ai_worker()) for _ in range(self.ai_concurrency)]
+        try:
+            await produce()
+            await asyncio.gather(*readers)
+            for _ in range(self.ai_concurrency):
+                await ai_queue.put(None)
+            await asyncio.gather(*analyzers)
+        finally:
+            for task in readers + analyzers:
+                task.cancel()
+
+        self.wall_seconds = time.perf_counter() - wall_start
+
+        def by_score(topics):
+            return sorted(topics, key=lambda t: t.get('quality_score', 0), reverse=True)
+
+        self._attach_related(duplicates, all_topics, topics_with_content)
+
+        unchanged = [t for t in all_topics if t.get('crawl_status') == STATUS_UNCHANGED]
+        analyzed = [t for t in ai_summaries if not isinstance(t.get('ai_summary'), FallbackSummary)]
+
+        return {
+            'lists': lists,
+            'all_topics': by_score(all_topics),
+            'topics_with_content': by_score(topics_with_content),
+            'ai_summaries': by_score(ai_summaries),
+            'cached_count': counters['cached'],
+            'duplicates': duplicates,
+            'skipped': skipped,
+            'processed': unchanged + analyzed + duplicates + skipped,
+        }
+
+    def format_summary(self) -> str:
+        """生成各阶段耗时摘要"""
+        timers = self.timers
+        return (
+            f"列表 {timers['list'].seconds:.1f}s（{timers['list'].items} 个帖子），"
+            f"读取 {timers['read'].seconds:.1f}s（{timers['read'].items} 篇），"
+            f"AI {timers['ai'].seconds:.1f}s（{timers['ai'].items} 篇），"
+            f"缓存复用 {self.reads_skipped} 篇，"
+            f"近似重复 {self.duplicates_skipped} 篇，"
+            f"总耗时 {self.wall_seconds:.1f}s"
+        )
@@ -0,0 +1,171 @@
+"""AI 响应缓存
+
+按 (模型, 温度, 最大长度, 消息) 的哈希保存模型回复，相同请求在有效期内直接返回缓存的回复：
+调试时重复运行、崩溃后重跑都不会再次调用 API。
+
+保存在 SQLite（WAL 模式）中，多个进程可以共用；条目数超过上限时按最近使用时间淘汰。
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+def request_key(model: str, temperature: float, max_tokens: int, messages: List[Dict[str, str]]) -> str:
+    """
+    计算请求的缓存键
+
+    Args:
+        model: 模型名称
+        temperature: 温度参数
+        max_tokens: 最大生成长度
+        messages: 消息列表
+
+    Returns:
+        SHA-256 十六进制字符串
+    """
+    payload = json.dumps(
+        {'model': model, 'temperature': temperature, 'max_tokens': max_tokens, 'messages': messages},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """AI 响应缓存（SQLite）"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at);
+    """
+
+    def __init__(self, db_file: str, ttl_hours: float = 168, max_entries: int = 2000):
+        """
+        初始化响应缓存
+
+        Args:
+            db_file: 数据库文件路径
+            ttl_hours: 有效期（小时）
+            max_entries: 最多条目数
+        """
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+
+        self.conn = sqlite3.connect(str(self.db_file), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        with self.conn:
+            self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的回复
+
+        Args:
+            key: 请求缓存键
+
+        Returns:
+            模型回复，未命中时返回 None
+        """
+        hit = self.get_first([key])
+        return hit[1] if hit else None
+
+    def get_first(self, keys: List[str]) -> Optional[Tuple[str, str]]:
+        """
+        按顺序查找多个缓存键（同一请求发给不同模型时各有一个键），返回第一个命中的回复
+
+        只计一次命中或未命中
+
+        Args:
+            keys: 请求缓存键列表（按优先级排列）
+
+        Returns:
+            (命中的缓存键, 模型回复)，都未命中时返回 None
+        """
+        now = time.time()
+        rows = self.conn.execute(
+            f"SELECT key, response FROM responses WHERE key IN ({','.join('?' * len(keys))}) AND expires_at > ?",
+            (*keys, now)
+        ).fetchall()
+        found = {row['key']: row['response'] for row in rows}
+        key = next((k for k in keys if k in found), None)
+        if key is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            with self.conn:
+                self.conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            pass
+        return key, found[key]
+
+    def set(self, key: str, kind: str, response: str):
+        """
+        保存回复，超出条目上限时淘汰最久未使用的条目
+
+        Args:
+            key: 请求缓存键
+            kind: 调用类型（summary/interests 等）
+            response: 模型回复
+        """
+        now = time.time()
+        try:
+            with self.conn:
+                self.conn.execute(
+                    """
+                    INSERT INTO responses (key, kind, response, created_at, expires_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        response = excluded.response,
+                        created_at = excluded.created_at,
+                        expires_at = excluded.expires_at,
+                        last_used_at = excluded.last_used_at
+                    """,
+                    (key, kind, response, now, now + self.ttl_seconds, now)
+                )
+                count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    cursor = self.conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used_at LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                    self.evictions += cursor.rowcount
+        except sqlite3.Error:
+            # 缓存写入失败不影响本次结果
+            pass
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return f"命中 {self.hits} | 未命中 {self.misses} | 淘汰 {self.evictions}"
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
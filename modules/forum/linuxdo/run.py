@@ -177,12 +177,20 @@ async def run_linuxdo(
     scroll_times = content_config.get('scroll_times', 3)
     scroll_interval = content_config.get('scroll_interval', 2)
     fetch_categories = content_config.get('fetch_priority_categories', False)
+    fetch_engine = content_config.get('fetch_engine', 'http')
+    incremental = content_config.get('incremental', True)
+    dedup = content_config.get('dedup', True)
 
     logger.info(f"内容获取配置: 最新{latest_limit}条, 热门{hot_limit}条, 深度阅读{read_limit}条, AI分析{ai_limit}条")
     if enable_scroll:
         logger.info(f"滚动加载已启用: {scroll_times}次滚动, 间隔{scroll_interval}秒")
     if fetch_categories:
         logger.info(f"优先分类获取已启用")
+    logger.info(f"内容获取方式: {'JSON 接口' if fetch_engine == 'http' else '浏览器页面提取'}")
+    if incremental:
+        logger.info("增量抓取已启用: 只读取和分析上次运行后的新帖和有更新的帖子")
+    if dedup:
+        logger.info("近似重复检测已启用: 转帖和重复帖只读取和分析一篇")
 
     # 获取过滤配置
     filter_config = config.get('filter', {})
@@ -204,6 +212,10 @@ async def run_linuxdo(
     ai_config = config.get('ai', {})
     ai_enabled = ai_config.get('enabled', True)
 
+    # extractive 模式只使用本地抽取式摘要，不调用 API
+    if ai_config.get('mode', 'ai') == 'extractive':
+        ai_enabled = False
+
     if ai_enabled:
         # 处理环境变量替换
         def resolve_env_var(value):
@@ -220,10 +232,10 @@ async def run_linuxdo(
         if api_key:
             logger.info(f"AI 功能已启用 - 模型: {model} - 端点: {api_base}")
         else:
-            logger.warning("AI 功能已启用但未配置 API Key，将使用简化模式")
+            logger.warning("AI 功能已启用但未配置 API Key，将使用本地抽取式摘要")
             ai_enabled = False
     else:
-        logger.info("AI 功能未启用，使用简化模式")
+        logger.info("AI 功能未启用，使用本地抽取式摘要")
         api_key = None
         api_base = None
         model = None
@@ -232,7 +244,15 @@ async def run_linuxdo(
     browser_config = config.get('browser', {})
     headless = not debug if debug else browser_config.get('headless', True)
 
-    browser_manager = BrowserManager(headless=headless)
+    browser_manager = BrowserManager(
+        headless=headless,
+        endpoint=browser_config.get('endpoint'),
+        attach=not debug,
+        session_backend=browser_config.get('session_backend', 'sqlite'),
+        session_freshness_hours=browser_config.get('session_freshness_hours', 0)
+    )
+    browser_manager.set_resource_policy('linuxdo', browser_config.get('resource_blocking'))
+    browser_manager.enable_asset_cache(browser_config.get('asset_cache'))
 
     # 初始化结果存储
     results = {site_name: []}
@@ -280,6 +300,9 @@ async def run_linuxdo(
                     scroll_times=scroll_times,
                     scroll_interval=scroll_interval,
                     fetch_priority_categories=fetch_categories,
+                    fetch_engine=fetch_engine,
+                    incremental=incremental,
+                    dedup=dedup,
                     # 传入过滤配置
                     exclude_categories=exclude_categories,
                     exclude_keywords=exclude_keywords,
@@ -294,14 +317,24 @@ async def run_linuxdo(
                     ai_model=model,
                     ai_temperature=ai_config.get('temperature', 0.7),
                     ai_max_tokens=ai_config.get('max_tokens', 800),
+                    ai_content_token_budget=ai_config.get('content_token_budget', 1500),
+                    ai_batch_size=ai_config.get('batch_size', 1),
+                    ai_rate_limit=ai_config.get('rate_limit'),
+                    ai_response_cache=ai_config.get('response_cache'),
+                    ai_ranking=ai_config.get('ranking'),
+                    ai_map_reduce=ai_config.get('map_reduce'),
+                    ai_endpoints=ai_config.get('endpoints'),
+                    ai_routing=ai_config.get('routing'),
                     user_interests=ai_config.get('user_interests')
                 )
 
                 # 执行获取
-                result = await adapter.run(context)
+                result = await adapter.run(context, session_validity=browser_manager.session_validity)
 
                 # 保存会话
-                await browser_manager.save_context(context, 'linuxdo', username)
+                await browser_manager.save_context(
+                    context, 'linuxdo', username, auth_cookie_names=adapter.AUTH_COOKIE_NAMES
+                )
                 await context.close()
 
                 if result.success:
@@ -337,6 +370,13 @@ async def run_linuxdo(
     logger.info(f"Linux.do 论坛动态获取完成")
     logger.info("=" * 60)
 
+    # 网络流量统计（启用资源拦截时）
+    network_stats = browser_manager.get_network_stats('linuxdo')
+    if network_stats:
+        logger.info(f"网络统计: {network_stats.format_summary()}")
+    if browser_manager.asset_cache:
+        logger.info(f"静态资源缓存: {browser_manager.asset_cache.format_summary()}")
+
     # 保存总结到文件
     _save_summary_to_file(results, logger)
 
@@ -0,0 +1,639 @@
+"""Linux.do 帖子分析缓存
+
+AI 分析结果保存在 SQLite（WAL 模式）中：
+- 每次写入只插入/更新一条记录，不再整体重写缓存文件
+- expires_at 列有索引，清理过期条目是一次范围删除，不需要扫描全部条目
+- 写入是事务性的，进程中途退出不会损坏已有缓存
+
+旧版 storage/cache/linuxdo_<用户名>_topics.json 可通过 import_json 一次性导入。
+
+SQLite 前面有一层进程内的 LRU 缓存（MemoryTier），按条目数和字节数限制大小，
+过期时间放在最小堆中，过期条目在访问时按堆顺序惰性清除。
+
+缓存键是帖子 ID（/t/slug/123、/t/123、/t/slug/123/4 都对应同一条目），
+每条记录附带内容指纹（第一楼正文 + 模型/提示词版本）：查询时先按 ID 找到条目，
+指纹不一致（帖子被编辑、换了模型或提示词）视为未命中，重新分析。
+
+多个进程（多个账号、重叠的定时任务）可以同时使用同一个数据库：
+- 所有写入都在事务中完成，锁冲突时等待（busy_timeout）而不是报错
+- 内存中的条目与数据库不一致时以数据库为准，其他进程写入的结果立即可见
+- 分析前通过租约（leases 表）认领帖子，同一帖子正在被其他进程分析时等待其结果，避免重复调用 AI
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import socket
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from modules.forum.linuxdo.discourse_api import parse_topic_id
+
+
+def content_fingerprint(content: str, version: str = '') -> str:
+    """
+    计算内容指纹（忽略空白差异）
+
+    Args:
+        content: 第一楼正文
+        version: 分析版本（模型和提示词版本）
+
+    Returns:
+        SHA-1 十六进制字符串
+    """
+    normalized = ' '.join(content.split())
+    return hashlib.sha1(f"{version}\n{normalized}".encode('utf-8')).hexdigest()
+
+
+class MemoryTier:
+    """有上限的进程内 LRU 缓存（带过期时间）"""
+
+    def __init__(self, max_entries: int = 500, max_bytes: int = 8 * 1024 * 1024):
+        """
+        初始化内存缓存
+
+        Args:
+            max_entries: 最多条目数
+            max_bytes: 最多占用字节数（按 JSON 序列化长度估算）
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expires_at, size)，按最近访问排序（末尾最新）
+        self._entries: OrderedDict = OrderedDict()
+        # (expires_at, key) 最小堆；条目被覆盖后旧的堆记录在弹出时忽略
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.bytes = 0
+
+        # 统计
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def _expire(self, now: float):
+        """按过期时间顺序清除已过期的条目（每条 O(log n)）"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取条目（命中时移到最近使用）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，不存在或已过期时返回 None
+        """
+        self._expire(time.time())
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float):
+        """
+        写入条目，超出上限时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expires_at: 过期时间（Unix 时间戳）
+        """
+        size = len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, expires_at, size)
+        self.bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+        # 被淘汰/覆盖的条目在堆中留下的旧记录过多时重建堆
+        if len(self._expiry_heap) > 2 * self.max_entries + 64:
+            self._expiry_heap = [(entry[1], k) for k, entry in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TopicCache:
+    """帖子分析缓存（内存 LRU + SQLite 两级）"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS topic_cache (
+            key TEXT PRIMARY KEY,
+            topic TEXT NOT NULL,
+            analysis TEXT NOT NULL,
+            cached_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            fingerprint TEXT NOT NULL DEFAULT '',
+            analysis_version TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_topic_cache_expires ON topic_cache (expires_at);
+        CREATE TABLE IF NOT EXISTS imports (
+            source TEXT PRIMARY KEY,
+            entries INTEGER NOT NULL,
+            imported_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    """
+
+    # 锁冲突时的最长等待时间（毫秒）
+    BUSY_TIMEOUT_MS = 30000
+    # 等待其他进程结果时每次检查的锁等待上限（毫秒），锁被占用时视为尚无结果，稍后再查
+    POLL_BUSY_TIMEOUT_MS = 50
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self,
+        db_file: str,
+        cache_days: int = 7,
+        logger=None,
+        analysis_version: str = '',
+        accepted_versions: Optional[List[str]] = None,
+        memory_max_entries: int = 500,
+        memory_max_bytes: int = 8 * 1024 * 1024
+    ):
+        """
+        初始化缓存
+
+        Args:
+            db_file: 数据库文件路径
+            cache_days: 缓存有效天数
+            logger: 日志记录器
+            analysis_version: 分析版本（模型和提示词版本，参与内容指纹计算），写入时未指定版本的结果按此版本保存
+            accepted_versions: 其他仍然有效的分析版本（如配置的备用 AI 接口的模型），这些版本的结果同样命中
+            memory_max_entries: 内存缓存最多条目数
+            memory_max_bytes: 内存缓存最多占用字节数
+        """
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_days = cache_days
+        self.ttl_seconds = cache_days * 86400
+        self.logger = logger
+        self.analysis_version = analysis_version
+        self.analysis_versions = list(dict.fromkeys([analysis_version] + (accepted_versions or [])))
+        self.memory = MemoryTier(memory_max_entries, memory_max_bytes)
+
+        # 统计
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale = 0
+
+        # 租约持有者标识（主机 + 进程 + 实例）
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.leases_waited = 0
+
+        self.conn = sqlite3.connect(str(self.db_file), timeout=self.BUSY_TIMEOUT_MS / 1000)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+        self._migrate()
+        self.purge_expired()
+
+    @contextmanager
+    def _write_transaction(self):
+        """
+        立即获取写锁的事务（先读后写的操作在事务内读取，避免与其他进程交错）
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def _migrate(self):
+        """升级旧版数据库：增加指纹列和分析版本列，按链接 MD5 保存的条目改为按帖子 ID 保存"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+
+        with self._write_transaction():
+            # 其他进程可能已经完成升级
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self.SCHEMA_VERSION:
+                return
+            columns = [row['name'] for row in self.conn.execute("PRAGMA table_info(topic_cache)")]
+            if 'fingerprint' not in columns:
+                self.conn.execute("ALTER TABLE topic_cache ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''")
+            if 'analysis_version' not in columns:
+                self.conn.execute("ALTER TABLE topic_cache ADD COLUMN analysis_version TEXT NOT NULL DEFAULT ''")
+
+            rows = self.conn.execute("SELECT key, topic, cached_at FROM topic_cache").fetchall()
+            for row in rows:
+                try:
+                    new_key = self.get_topic_id(json.loads(row['topic']))
+                except ValueError:
+                    continue
+                if new_key == row['key']:
+                    continue
+                # 同一帖子有多个旧条目时保留最新的
+                existing = self.conn.execute(
+                    "SELECT cached_at FROM topic_cache WHERE key = ?", (new_key,)
+                ).fetchone()
+                if existing and existing['cached_at'] >= row['cached_at']:
+                    self.conn.execute("DELETE FROM topic_cache WHERE key = ?", (row['key'],))
+                    continue
+                self.conn.execute("DELETE FROM topic_cache WHERE key = ?", (new_key,))
+                self.conn.execute("UPDATE topic_cache SET key = ? WHERE key = ?", (new_key, row['key']))
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def purge_expired(self) -> int:
+        """
+        删除过期条目
+
+        Returns:
+            删除的条目数
+        """
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM topic_cache WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def get_topic_id(self, topic: Dict[str, Any]) -> str:
+        """生成帖子唯一标识（帖子 ID，链接无法解析时使用链接的 MD5）"""
+        link = topic.get('link', '')
+        topic_id = topic.get('topic_id') or parse_topic_id(link)
+        if topic_id:
+            return str(topic_id)
+        return hashlib.md5(link.encode()).hexdigest()
+
+    def get_fingerprint(self, topic: Dict[str, Any], version: Optional[str] = None) -> Optional[str]:
+        """
+        计算帖子当前内容的指纹
+
+        Args:
+            topic: 帖子信息（读取内容后包含 content_summary）
+            version: 分析版本（默认为 analysis_version）
+
+        Returns:
+            指纹，尚未读取内容时返回 None
+        """
+        content = topic.get('content_summary', {}).get('first_post')
+        if not content:
+            return None
+        return content_fingerprint(content, self.analysis_version if version is None else version)
+
+    def _is_current(self, topic: Dict[str, Any], cached: Dict[str, Any]) -> bool:
+        """
+        缓存条目对帖子当前内容和当前配置的模型是否仍然有效
+
+        条目的分析版本不在 analysis_versions 中时无效；帖子带有内容时比较指纹
+        （升级前保存的条目没有版本，按各有效版本比较；旧版导入的条目没有指纹，不做比较）
+        """
+        version = cached.get('version')
+        if version and version not in self.analysis_versions:
+            return False
+        if not cached['fingerprint']:
+            return True
+        versions = [version] if version else self.analysis_versions
+        fingerprints = {self.get_fingerprint(topic, v) for v in versions}
+        return None in fingerprints or cached['fingerprint'] in fingerprints
+
+    def get(self, topic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存的帖子分析结果
+
+        先按帖子 ID 查找（先查内存，未命中再查数据库并放入内存），
+        再检查条目的分析版本和内容指纹（见 _is_current），无效视为未命中。
+
+        Args:
+            topic: 帖子信息
+
+        Returns:
+            {topic, analysis, cached_at, fingerprint, version}，未命中时返回 None
+        """
+        key = self.get_topic_id(topic)
+        cached = self.memory.get(key)
+        # 内存中的条目已失效时，可能是其他进程已更新，重新读取数据库
+        if cached is not None and not self._is_current(topic, cached):
+            cached = None
+        from_memory = cached is not None
+
+        if cached is None:
+            row = self._select_entry(self.conn, key)
+            cached = self._entry_from_row(row) if row else None
+            if cached is None:
+                self.misses += 1
+                return None
+            self.memory.set(key, cached, row['expires_at'])
+
+        if not self._is_current(topic, cached):
+            self.stale += 1
+            return None
+
+        if from_memory:
+            self.memory_hits += 1
+        else:
+            self.disk_hits += 1
+        return cached
+
+    @staticmethod
+    def _select_entry(conn: sqlite3.Connection, key: str) -> Optional[sqlite3.Row]:
+        """查询未过期的条目"""
+        return conn.execute(
+            "SELECT topic, analysis, cached_at, expires_at, fingerprint, analysis_version FROM topic_cache "
+            "WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+
+    @staticmethod
+    def _entry_from_row(row: sqlite3.Row) -> Optional[Dict[str, Any]]:
+        """把数据库记录转换为缓存条目，内容损坏时返回 None"""
+        try:
+            return {
+                'topic': json.loads(row['topic']),
+                'analysis': json.loads(row['analysis']),
+                'cached_at': datetime.fromtimestamp(row['cached_at']).isoformat(),
+                'fingerprint': row['fingerprint'],
+                'version': row['analysis_version']
+            }
+        except ValueError:
+            return None
+
+    def set(self, topic: Dict[str, Any], analysis: Dict[str, Any], version: Optional[str] = None):
+        """
+        缓存帖子分析结果
+
+        Args:
+            topic: 帖子信息
+            analysis: 分析结果
+            version: 实际生成结果的分析版本（如故障转移后由备用接口的模型生成），默认为 analysis_version
+        """
+        now = time.time()
+        key = self.get_topic_id(topic)
+        version = version or self.analysis_version
+        fingerprint = self.get_fingerprint(topic, version) or ''
+        self.memory.set(key, {
+            'topic': topic,
+            'analysis': analysis,
+            'cached_at': datetime.fromtimestamp(now).isoformat(),
+            'fingerprint': fingerprint,
+            'version': version
+        }, now + self.ttl_seconds)
+        try:
+            with self.conn:
+                self.conn.execute(
+                    """
+                    INSERT INTO topic_cache (key, topic, analysis, cached_at, expires_at, fingerprint, analysis_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        topic = excluded.topic,
+                        analysis = excluded.analysis,
+                        cached_at = excluded.cached_at,
+                        expires_at = excluded.expires_at,
+                        fingerprint = excluded.fingerprint,
+                        analysis_version = excluded.analysis_version
+                    """,
+                    (
+                        key,
+                        json.dumps(topic, ensure_ascii=False),
+                        json.dumps(analysis, ensure_ascii=False),
+                        now,
+                        now + self.ttl_seconds,
+                        fingerprint,
+                        version
+                    )
+                )
+        except sqlite3.Error as e:
+            # 缓存写入失败不影响本次结果
+            if self.logger:
+                self.logger.debug(f"缓存写入失败: {str(e)}")
+
+    def is_cached(self, topic: Dict[str, Any]) -> bool:
+        """检查帖子是否已缓存"""
+        return self.get(topic) is not None
+
+    def claim(self, topic: Dict[str, Any], lease_seconds: float = 120) -> bool:
+        """
+        认领帖子的分析租约
+
+        Args:
+            topic: 帖子信息
+            lease_seconds: 租约时长（持有进程异常退出时，到期后其他进程可以认领）
+
+        Returns:
+            是否认领成功（False 表示其他进程正在分析）
+        """
+        now = time.time()
+        try:
+            with self._write_transaction():
+                cursor = self.conn.execute(
+                    """
+                    INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        owner = excluded.owner,
+                        expires_at = excluded.expires_at
+                    WHERE leases.expires_at <= ? OR leases.owner = excluded.owner
+                    """,
+                    (self.get_topic_id(topic), self.owner, now + lease_seconds, now)
+                )
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            # 无法认领时按未加锁处理，最多重复分析一次
+            if self.logger:
+                self.logger.debug(f"缓存租约认领失败: {str(e)}")
+            return True
+
+    def release(self, topic: Dict[str, Any]):
+        """释放本进程持有的分析租约"""
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM leases WHERE key = ? AND owner = ?",
+                    (self.get_topic_id(topic), self.owner)
+                )
+        except sqlite3.Error:
+            pass
+
+    async def wait_for_result(
+        self,
+        topic: Dict[str, Any],
+        timeout: float = 60,
+        poll_interval: float = 0.5
+    ) -> Optional[Dict[str, Any]]:
+        """
+        等待其他进程写入分析结果
+
+        每次检查在线程中使用独立的短连接（锁等待不超过 POLL_BUSY_TIMEOUT_MS），不阻塞事件循环；
+        检查不计入缓存命中统计
+
+        Args:
+            topic: 帖子信息
+            timeout: 最长等待时间（秒）
+            poll_interval: 检查间隔（秒）
+
+        Returns:
+            缓存结果；超时或对方租约已释放仍无结果时返回 None
+        """
+        self.leases_waited += 1
+        key = self.get_topic_id(topic)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            try:
+                cached, expires_at, leased = await asyncio.to_thread(self._poll_result, key, topic)
+            except sqlite3.Error as e:
+                if self.logger:
+                    self.logger.debug(f"等待分析结果时数据库繁忙，稍后重试: {str(e)}")
+                continue
+            if cached:
+                self.memory.set(key, cached, expires_at)
+                return cached
+            if not leased:
+                return None
+        return None
+
+    def _poll_result(self, key: str, topic: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], float, bool]:
+        """
+        查询其他进程写入的结果和租约（在线程中运行，使用独立连接）
+
+        Returns:
+            (缓存条目（已失效时为 None）, 过期时间, 租约是否仍有效)
+        """
+        conn = sqlite3.connect(str(self.db_file), timeout=self.POLL_BUSY_TIMEOUT_MS / 1000)
+        conn.row_factory = sqlite3.Row
+        try:
+            row = self._select_entry(conn, key)
+            cached = self._entry_from_row(row) if row else None
+            if cached and not self._is_current(topic, cached):
+                cached = None
+            if cached:
+                return cached, row['expires_at'], True
+            lease = conn.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            return None, 0.0, lease is not None
+        finally:
+            conn.close()
+
+    def import_json(self, json_file: str) -> Optional[int]:
+        """
+        一次性导入旧版 JSON 缓存文件
+
+        同一文件只导入一次；数据库中已有的条目不会被覆盖，已过期的条目跳过。
+
+        Args:
+            json_file: 旧版缓存文件路径（{key: {topic, analysis, cached_at}}）
+
+        Returns:
+            导入的条目数，文件已导入过或不存在时返回 None
+        """
+        json_path = Path(json_file)
+        source = str(json_path.resolve())
+        if not json_path.exists():
+            return None
+        if self._is_imported(source):
+            return None
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"旧版缓存文件无法读取，跳过导入: {json_path} ({str(e)})")
+            return None
+
+        now = time.time()
+        rows = []
+        for value in data.values():
+            try:
+                cached_at = datetime.fromisoformat(value.get('cached_at', '2000-01-01')).timestamp()
+            except (AttributeError, ValueError):
+                continue
+            expires_at = cached_at + self.ttl_seconds
+            if expires_at <= now:
+                continue
+            topic = value.get('topic', {})
+            rows.append((
+                self.get_topic_id(topic),
+                json.dumps(topic, ensure_ascii=False),
+                json.dumps(value.get('analysis', {}), ensure_ascii=False),
+                cached_at,
+                expires_at
+            ))
+        # 旧版按链接保存，同一帖子可能有多个条目，保留最新的
+        rows.sort(key=lambda row: row[3], reverse=True)
+
+        with self._write_transaction():
+            # 其他进程可能同时在导入同一文件
+            if self._is_imported(source):
+                return None
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO topic_cache (key, topic, analysis, cached_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            imported = max(cursor.rowcount, 0)
+            self.conn.execute(
+                "INSERT INTO imports (source, entries, imported_at) VALUES (?, ?, ?)",
+                (source, imported, now)
+            )
+        return imported
+
+    def _is_imported(self, source: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM topic_cache WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return row[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出统计结果"""
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory.bytes,
+            'evictions': self.memory.evictions,
+            'expirations': self.memory.expirations,
+            'leases_waited': self.leases_waited,
+        }
+
+    def format_summary(self) -> str:
+        """生成可读的统计摘要"""
+        return (
+            f"内存命中 {self.memory_hits} | 数据库命中 {self.disk_hits} | 未命中 {self.misses} | 内容变化 {self.stale} | "
+            f"内存 {len(self.memory)} 条 {self.memory.bytes / 1024:.0f} KB | "
+            f"淘汰 {self.memory.evictions} | 过期 {self.memory.expirations} | "
+            f"等待其他进程 {self.leases_waited}"
+        )
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
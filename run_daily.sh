@@ -29,6 +29,11 @@ if [ -d "$PROJECT_ROOT/venv" ]; then
     source "$PROJECT_ROOT/venv/bin/activate"
 fi
 
+# 常驻浏览器服务（各模块自动连接复用，不可用时回退到冷启动）
+echo "" | tee -a "$LOG_FILE"
+echo ">>> 检查常驻浏览器服务..." | tee -a "$LOG_FILE"
+python3 "$PROJECT_ROOT/core/browser_server.py" ensure >> "$LOG_FILE" 2>&1 || true
+
 # AnyRouter 签到
 echo "" | tee -a "$LOG_FILE"
 echo ">>> 执行 AnyRouter 签到..." | tee -a "$LOG_FILE"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+浏览器启动耗时对比
+比较冷启动 Chromium 与连接常驻浏览器服务（创建上下文 + 打开页面）的耗时
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.browser_manager import BrowserManager
+from core.browser_server import read_endpoint, check_health
+
+
+async def measure(endpoint, attach: bool) -> float:
+    """
+    测量一次启动到页面可用的耗时
+
+    Args:
+        endpoint: 常驻浏览器端点
+        attach: 是否连接常驻浏览器
+
+    Returns:
+        耗时（毫秒）
+    """
+    start_time = time.perf_counter()
+    manager = BrowserManager(storage_dir="/tmp/bench_sessions", endpoint=endpoint, attach=attach)
+    await manager.start()
+    context = await manager.create_context('bench', 'bench', load_session=False)
+    page = await context.new_page()
+    await page.goto('about:blank')
+    elapsed = (time.perf_counter() - start_time) * 1000
+    await context.close()
+    await manager.close()
+
+    if attach and not manager.attached:
+        raise RuntimeError("未能连接常驻浏览器，请先运行: python3 core/browser_server.py ensure")
+    return elapsed
+
+
+def report(name: str, samples):
+    """输出统计结果"""
+    print(
+        f"{name:<12} 平均 {statistics.mean(samples):7.0f} ms | "
+        f"中位 {statistics.median(samples):7.0f} ms | "
+        f"最小 {min(samples):7.0f} ms | 最大 {max(samples):7.0f} ms"
+    )
+
+
+async def main_async(rounds: int):
+    endpoint = read_endpoint()
+    if not endpoint or not await check_health(endpoint):
+        print("常驻浏览器未运行，请先运行: python3 core/browser_server.py ensure")
+        return
+
+    cold = [await measure(None, attach=False) for _ in range(rounds)]
+    warm = [await measure(endpoint, attach=True) for _ in range(rounds)]
+
+    print("=" * 70)
+    print(f"浏览器启动耗时（{rounds} 轮，启动到页面可用）")
+    print("=" * 70)
+    report("冷启动", cold)
+    report("连接常驻", warm)
+    print(f"加速比: {statistics.mean(cold) / max(statistics.mean(warm), 1e-6):.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='浏览器启动耗时对比')
+    parser.add_argument('--rounds', type=int, default=5, help='测量轮数（默认: 5）')
+    args = parser.parse_args()
+    asyncio.run(main_async(args.rounds))
+
+
+if __name__ == '__main__':
+    main()
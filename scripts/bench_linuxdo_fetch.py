@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Linux.do 内容获取方式对比
+在本地启动模拟的 Discourse 站点（同时提供 HTML 页面和 JSON 接口），
+分别用浏览器页面提取（browser）和 JSON 接口（http）获取帖子列表和正文，
+比较每个帖子的耗时和内存占用
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.browser_manager import BrowserManager
+from modules.forum.linuxdo.adapter import LinuxDoAdapter
+
+CATEGORIES = [(1, '开发调优'), (2, '资源荟萃'), (3, '搞七捻三')]
+
+
+def build_fixtures(topic_count: int, page_weight_kb: int):
+    """
+    生成模拟站点的响应
+
+    Args:
+        topic_count: 帖子数量
+        page_weight_kb: 每个 HTML 页面附带的脚本体积（模拟 Discourse 前端包）
+
+    Returns:
+        {路径: (content-type, body)}
+    """
+    users = [{'id': i, 'username': f'user{i}'} for i in range(1, 11)]
+    topics = []
+    for i in range(1, topic_count + 1):
+        topics.append({
+            'id': 1000 + i,
+            'slug': f'topic-{i}',
+            'title': f'测试帖子 {i}：Docker 部署与性能调优经验',
+            'posts_count': i % 30 + 1,
+            'views': 100 + i * 37,
+            'bumped_at': f'2025-01-{i % 28 + 1:02d}T08:00:00.000Z',
+            'category_id': CATEGORIES[i % len(CATEGORIES)][0],
+            'posters': [{'user_id': i % 10 + 1, 'description': 'Original Poster'}],
+        })
+
+    fixtures = {
+        '/site.json': ('application/json', json.dumps({
+            'categories': [{'id': cid, 'name': name} for cid, name in CATEGORIES]
+        })),
+        '/latest.json': ('application/json', json.dumps({
+            'users': users, 'topic_list': {'topics': topics}
+        })),
+        '/top.json': ('application/json', json.dumps({
+            'users': users, 'topic_list': {'topics': list(reversed(topics))}
+        })),
+    }
+
+    padding = f"<script>var bundle = '{'x' * page_weight_kb * 1024}';</script>"
+    category_names = dict(CATEGORIES)
+    rows = []
+    for t in topics:
+        rows.append(
+            f"<tr class='topic-list-item' data-topic-id='{t['id']}'>"
+            f"<td class='main-link'><span class='title'><a href='/t/{t['slug']}/{t['id']}'>{t['title']}</a></span>"
+            f"<span class='badge-category'>{category_names[t['category_id']]}</span></td>"
+            f"<td class='topic-poster'><a data-user-card='user{t['id'] % 10 + 1}'>user</a></td>"
+            f"<td class='num posts'>{t['posts_count'] - 1}</td>"
+            f"<td class='num views'>{t['views']}</td>"
+            f"<td class='age activity'><a title='{t['bumped_at']}'>1d</a></td></tr>"
+        )
+    list_html = f"<html><body><table>{''.join(rows)}</table>{padding}</body></html>"
+    fixtures['/latest'] = ('text/html; charset=utf-8', list_html)
+    fixtures['/top'] = ('text/html; charset=utf-8', list_html)
+
+    for t in topics:
+        cooked = (
+            f"<p>这是帖子 {t['id']} 的正文，介绍如何在生产环境中部署容器并调优性能。</p>"
+            "<ul><li>使用多阶段构建减小镜像体积</li><li>为容器设置合理的内存和 CPU 限制</li>"
+            "<li>开启日志轮转，避免磁盘被占满</li></ul>"
+            "<pre><code>docker run --memory 512m app</code></pre>"
+            + "<p>" + "补充说明内容。" * 60 + "</p>"
+        )
+        fixtures[f"/t/{t['id']}.json"] = ('application/json', json.dumps({
+            'post_stream': {'posts': [{'post_number': 1, 'cooked': cooked}]}
+        }))
+        fixtures[f"/t/{t['slug']}/{t['id']}"] = (
+            'text/html; charset=utf-8',
+            f"<html><body><article class='topic-post post'><div class='cooked'>{cooked}</div></article>"
+            f"{padding}</body></html>"
+        )
+
+    return fixtures
+
+
+def start_fixture_server(fixtures) -> ThreadingHTTPServer:
+    """在后台线程启动模拟站点"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path not in fixtures:
+                self.send_response(404)
+                self.end_headers()
+                return
+            content_type, body = fixtures[path]
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_engine(manager: BrowserManager, site_url: str, engine: str, list_limit: int, read_count: int):
+    """
+    用指定方式获取帖子列表和正文
+
+    Returns:
+        (列表耗时毫秒, 每个帖子耗时列表, 内存占用字节, 帖子列表, 正文列表)
+    """
+    context = await manager.create_context('bench', engine, load_session=False)
+    adapter = LinuxDoAdapter(
+        site_url=site_url,
+        username=f'bench_{engine}',
+        password='',
+        ai_enabled=False,
+        fetch_engine=engine
+    )
+    adapter.context = context
+    adapter.page = await context.new_page()
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    topics = await adapter.get_latest_topics(limit=list_limit)
+    list_ms = (time.perf_counter() - start_time) * 1000
+
+    per_topic = []
+    contents = []
+    for topic in topics[:read_count]:
+        start_time = time.perf_counter()
+        contents.append(await adapter.get_topic_content(topic['link']))
+        per_topic.append((time.perf_counter() - start_time) * 1000)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    memory = python_peak
+    if engine == 'browser':
+        # 页面方式的内存主要在渲染进程中，取页面 JS 堆占用
+        cdp = await context.new_cdp_session(adapter.page)
+        await cdp.send('Performance.enable')
+        metrics = await cdp.send('Performance.getMetrics')
+        memory = next((m['value'] for m in metrics['metrics'] if m['name'] == 'JSHeapUsedSize'), 0)
+
+    await context.close()
+    return list_ms, per_topic, int(memory), topics, contents
+
+
+async def main_async(topic_count: int, read_count: int, page_weight_kb: int):
+    server = start_fixture_server(build_fixtures(topic_count, page_weight_kb))
+    site_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    manager = BrowserManager(storage_dir="/tmp/bench_sessions", attach=False)
+    await manager.start()
+    try:
+        results = {
+            engine: await run_engine(manager, site_url, engine, topic_count, read_count)
+            for engine in ('browser', 'http')
+        }
+    finally:
+        await manager.close()
+        server.shutdown()
+
+    print("=" * 70)
+    print(f"内容获取方式对比（{topic_count} 个帖子，读取 {read_count} 篇，页面附带 {page_weight_kb} KB 脚本）")
+    print("=" * 70)
+    for engine, (list_ms, per_topic, memory, topics, _) in results.items():
+        print(
+            f"{engine:<8} 列表 {list_ms:7.0f} ms ({len(topics)} 个) | "
+            f"每帖 平均 {statistics.mean(per_topic):6.0f} ms / 中位 {statistics.median(per_topic):6.0f} ms | "
+            f"内存 {memory / 1024 / 1024:6.2f} MB"
+        )
+
+    browser_per_topic = statistics.mean(results['browser'][1])
+    http_per_topic = statistics.mean(results['http'][1])
+    print(f"每帖加速比: {browser_per_topic / max(http_per_topic, 1e-6):.1f}x")
+    print("（browser 内存为页面 JS 堆，http 内存为 Python 端峰值分配）")
+
+    # 两种方式的结果应一致
+    browser_titles = [t['title'] for t in results['browser'][3]]
+    http_titles = [t['title'] for t in results['http'][3]]
+    same_keys = [c['key_points'] for c in results['browser'][4]] == [c['key_points'] for c in results['http'][4]]
+    print(f"结果一致性: 标题 {'一致' if browser_titles == http_titles else '不一致'}，"
+          f"关键点 {'一致' if same_keys else '不一致'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Linux.do 内容获取方式对比（本地模拟站点）')
+    parser.add_argument('--topics', type=int, default=20, help='帖子数量（默认: 20）')
+    parser.add_argument('--read', type=int, default=5, help='读取正文的帖子数（默认: 5）')
+    parser.add_argument('--page-weight-kb', type=int, default=500, help='每个页面附带的脚本体积 KB（默认: 500）')
+    args = parser.parse_args()
+    asyncio.run(main_async(args.topics, args.read, args.page_weight_kb))
+
+
+if __name__ == '__main__':
+    main()
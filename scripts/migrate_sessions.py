@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+会话迁移脚本
+将旧版 storage/sessions/<site>_<user>/state.json 导入 SQLite 会话存储
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.session_store import SqliteSessionStore
+from modules.checkin.anyrouter.adapter import AnyrouterAdapter
+from modules.forum.linuxdo.adapter import LinuxDoAdapter
+
+# 各站点的登录 cookie 名称（用于记录登录凭证的过期时间）
+AUTH_COOKIE_NAMES = {
+    'linuxdo': LinuxDoAdapter.AUTH_COOKIE_NAMES,
+    'anyrouter': AnyrouterAdapter.AUTH_COOKIE_NAMES,
+}
+
+
+def migrate_sessions(storage_dir: str = "storage/sessions", dry_run: bool = False):
+    """
+    导入旧版 JSON 会话
+
+    Args:
+        storage_dir: 会话存储目录
+        dry_run: 模拟运行，不实际写入
+    """
+    sessions_dir = Path(storage_dir)
+    if not sessions_dir.exists():
+        print(f"会话目录不存在: {sessions_dir}")
+        return
+
+    store = None if dry_run else SqliteSessionStore(str(sessions_dir / "sessions.db"))
+    imported = 0
+    unchanged = 0
+    failed = 0
+
+    print(f"{'[模拟]' if dry_run else ''} 导入 {sessions_dir} 下的旧版会话...")
+    print("-" * 60)
+
+    for state_file in sorted(sessions_dir.glob("*_*/state.json")):
+        # 目录名格式: <site>_<user>，站点名不含下划线，用户名可能包含
+        site_name, user_id = state_file.parent.name.split('_', 1)
+
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[失败] {site_name}/{user_id}: {e}")
+            failed += 1
+            continue
+
+        if dry_run:
+            print(f"[将导入] {site_name}/{user_id} ({len(state.get('cookies', []))} 个 cookies)")
+            imported += 1
+        elif store.save(site_name, user_id, state, AUTH_COOKIE_NAMES.get(site_name)):
+            print(f"[导入] {site_name}/{user_id} ({len(state.get('cookies', []))} 个 cookies)")
+            imported += 1
+        else:
+            print(f"[未变化] {site_name}/{user_id}")
+            unchanged += 1
+
+    if store:
+        store.close()
+
+    print("-" * 60)
+    print(f"{'预计' if dry_run else '已'}导入 {imported} 个会话，未变化 {unchanged} 个，失败 {failed} 个")
+    if not dry_run and imported:
+        print("旧版目录已保留，确认无误后可手动删除")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入旧版 JSON 会话到 SQLite')
+    parser.add_argument(
+        '--storage-dir',
+        default='storage/sessions',
+        help='会话存储目录（默认: storage/sessions）'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='模拟运行，不实际写入'
+    )
+
+    args = parser.parse_args()
+    migrate_sessions(storage_dir=args.storage_dir, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+帖子缓存迁移脚本
+将旧版 storage/cache/linuxdo_<user>_topics.json 导入 SQLite 帖子缓存
+（适配器首次运行时也会自动导入当前账号的旧版文件）
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules.forum.linuxdo.topic_cache import TopicCache
+
+
+def migrate_topic_cache(cache_dir: str = "storage/cache", cache_days: int = 7, dry_run: bool = False):
+    """
+    导入旧版 JSON 帖子缓存
+
+    Args:
+        cache_dir: 缓存目录
+        cache_days: 缓存有效天数（已过期的条目不导入）
+        dry_run: 模拟运行，不实际写入
+    """
+    cache_path = Path(cache_dir)
+    legacy_files = sorted(cache_path.glob("linuxdo_*_topics.json"))
+    if not legacy_files:
+        print(f"没有找到旧版缓存文件: {cache_path}/linuxdo_*_topics.json")
+        return
+
+    cache = None if dry_run else TopicCache(str(cache_path / "linuxdo_topics.db"), cache_days=cache_days)
+    imported = 0
+    skipped = 0
+
+    print(f"{'[模拟]' if dry_run else ''} 导入 {cache_path} 下的旧版帖子缓存...")
+    print("-" * 60)
+
+    for legacy_file in legacy_files:
+        if dry_run:
+            try:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    entries = len(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"[失败] {legacy_file.name}: {e}")
+                skipped += 1
+                continue
+            print(f"[将导入] {legacy_file.name} ({entries} 条，过期条目会跳过)")
+            imported += entries
+            continue
+
+        count = cache.import_json(str(legacy_file))
+        if count is None:
+            print(f"[跳过] {legacy_file.name}（已导入过或无法读取）")
+            skipped += 1
+        else:
+            print(f"[导入] {legacy_file.name} ({count} 条)")
+            imported += count
+
+    if cache:
+        print(f"数据库中共 {len(cache)} 条有效缓存")
+        cache.close()
+
+    print("-" * 60)
+    print(f"{'预计' if dry_run else '已'}导入 {imported} 条缓存，跳过 {skipped} 个文件")
+    if not dry_run and imported:
+        print("旧版文件已保留，确认无误后可手动删除")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入旧版 JSON 帖子缓存到 SQLite')
+    parser.add_argument(
+        '--cache-dir',
+        default='storage/cache',
+        help='缓存目录（默认: storage/cache）'
+    )
+    parser.add_argument(
+        '--cache-days',
+        type=int,
+        default=7,
+        help='缓存有效天数（默认: 7）'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='模拟运行，不实际写入'
+    )
+
+    args = parser.parse_args()
+    migrate_topic_cache(cache_dir=args.cache_dir, cache_days=args.cache_days, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
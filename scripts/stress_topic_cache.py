@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+帖子缓存多进程压力测试
+多个进程同时读写同一个 SQLite 帖子缓存，检查：
+1. 写入不丢失：每个进程写入的条目最终都能读到，且同一条目的最终值来自某个写入者的完整写入
+2. 结果共享：多个进程分析同一批帖子时，通过租约等待其他进程的结果，AI 调用次数接近帖子数而不是进程数 × 帖子数
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from modules.forum.linuxdo.topic_cache import TopicCache
+
+
+def make_topic(topic_id: int, content: str = '') -> dict:
+    topic = {'link': f'/t/topic-{topic_id}/{topic_id}', 'title': f'帖子 {topic_id}'}
+    if content:
+        topic['content_summary'] = {'first_post': content, 'key_points': []}
+    return topic
+
+
+def write_worker(db_file: str, worker: int, writes: int, shared_keys: int):
+    """写入本进程独有的条目，同时反复覆盖共享条目"""
+    cache = TopicCache(db_file)
+    for i in range(writes):
+        cache.set(make_topic(100000 + worker * writes + i), {'worker': worker, 'seq': i})
+        shared = make_topic(i % shared_keys + 1)
+        cache.set(shared, {'worker': worker, 'seq': i})
+        cache.get(shared)
+    cache.close()
+
+
+def analyze_worker(db_file: str, topic_count: int, ai_seconds: float, result_queue):
+    """模拟流水线的 AI 阶段：查缓存 → 认领 → 分析或等待其他进程的结果"""
+
+    async def run():
+        cache = TopicCache(db_file)
+        ai_calls = 0
+        for topic_id in range(1, topic_count + 1):
+            topic = make_topic(200000 + topic_id, content=f'帖子 {topic_id} 的正文')
+            if cache.get(topic):
+                continue
+            if not cache.claim(topic):
+                if await cache.wait_for_result(topic, timeout=ai_seconds * 10, poll_interval=0.02):
+                    continue
+            await asyncio.sleep(ai_seconds)
+            ai_calls += 1
+            cache.set(topic, {'summary': f'摘要 {topic_id}'})
+            cache.release(topic)
+        cache.close()
+        return ai_calls
+
+    result_queue.put(asyncio.run(run()))
+
+
+def run_processes(target, args_list):
+    processes = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    start_time = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = [p.exitcode for p in processes if p.exitcode != 0]
+    return time.perf_counter() - start_time, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='帖子缓存多进程压力测试')
+    parser.add_argument('--processes', type=int, default=8, help='进程数（默认: 8）')
+    parser.add_argument('--writes', type=int, default=300, help='每个进程的写入次数（默认: 300）')
+    parser.add_argument('--shared-keys', type=int, default=20, help='共享条目数（默认: 20）')
+    parser.add_argument('--topics', type=int, default=30, help='模拟分析的帖子数（默认: 30）')
+    parser.add_argument('--ai-seconds', type=float, default=0.05, help='模拟每次 AI 调用耗时（默认: 0.05）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = str(Path(tmp_dir) / 'linuxdo_topics.db')
+        TopicCache(db_file).close()
+
+        print("=" * 60)
+        print(f"并发写入: {args.processes} 个进程 × {args.writes} 次")
+        print("=" * 60)
+        elapsed, failed = run_processes(
+            write_worker,
+            [(db_file, worker, args.writes, args.shared_keys) for worker in range(args.processes)]
+        )
+
+        cache = TopicCache(db_file)
+        lost = 0
+        for worker in range(args.processes):
+            for i in range(args.writes):
+                cached = cache.get(make_topic(100000 + worker * args.writes + i))
+                if not cached or cached['analysis'] != {'worker': worker, 'seq': i}:
+                    lost += 1
+        torn = 0
+        for key in range(1, args.shared_keys + 1):
+            cached = cache.get(make_topic(key))
+            analysis = cached['analysis'] if cached else {}
+            if not (0 <= analysis.get('worker', -1) < args.processes and 0 <= analysis.get('seq', -1) < args.writes):
+                torn += 1
+        cache.close()
+
+        total_writes = args.processes * args.writes * 2
+        print(f"耗时 {elapsed:.2f}s（{total_writes / elapsed:.0f} 次写入/秒），进程失败 {len(failed)} 个")
+        print(f"独有条目丢失 {lost} / {args.processes * args.writes}，共享条目异常 {torn} / {args.shared_keys}")
+
+        print("=" * 60)
+        print(f"结果共享: {args.processes} 个进程同时分析 {args.topics} 个帖子")
+        print("=" * 60)
+        result_queue = multiprocessing.Queue()
+        elapsed, failed = run_processes(
+            analyze_worker,
+            [(db_file, args.topics, args.ai_seconds, result_queue) for _ in range(args.processes)]
+        )
+        ai_calls = sum(result_queue.get() for _ in range(args.processes - len(failed)))
+        print(f"耗时 {elapsed:.2f}s，进程失败 {len(failed)} 个")
+        print(f"AI 调用 {ai_calls} 次（不共享时为 {args.processes * args.topics} 次，理想值 {args.topics} 次）")
+
+        ok = not failed and lost == 0 and torn == 0
+        print("-" * 60)
+        print("通过" if ok else "失败")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
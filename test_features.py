@@ -13,7 +13,7 @@ print("Automation Hub - 功能测试")
 print("=" * 60)
 
 # 1. 测试模块导入
-print("\n[1/5] 测试模块导入...")
+print("\n[1/7] 测试模块导入...")
 try:
     from modules.forum.linuxdo.adapter import LinuxDoAdapter
     from modules.forum.linuxdo.ai_analyzer import AIAnalyzer
@@ -25,7 +25,7 @@ except Exception as e:
     sys.exit(1)
 
 # 2. 测试LinuxDo适配器方法
-print("\n[2/5] 测试 LinuxDo 核心方法...")
+print("\n[2/7] 测试 LinuxDo 核心方法...")
 adapter_methods = dir(LinuxDoAdapter)
 required_methods = [
     'login',
@@ -44,7 +44,7 @@ for method in required_methods:
         print(f"  ❌ {method} - 缺失")
 
 # 3. 检查删除的功能
-print("\n[3/5] 确认互动功能已删除...")
+print("\n[3/7] 确认互动功能已删除...")
 removed_methods = ['simulate_reading', 'like_topic', 'comment_on_topic']
 all_removed = True
 for method in removed_methods:
@@ -58,7 +58,7 @@ if all_removed:
     print("  ✅ 所有互动功能已正确删除")
 
 # 4. 测试配置文件
-print("\n[4/5] 检查配置文件...")
+print("\n[4/7] 检查配置文件...")
 config_files = [
     'modules/forum/linuxdo/config.yaml.example',
     'modules/checkin/anyrouter/config.yaml.example'
@@ -78,7 +78,7 @@ for config_file in config_files:
         print(f"  ⚠️  {config_file} - 不存在")
 
 # 5. 测试文档
-print("\n[5/5] 检查文档...")
+print("\n[5/7] 检查文档...")
 doc_files = [
     'README.md',
     'CHANGELOG.md',
@@ -92,6 +92,91 @@ for doc_file in doc_files:
     else:
         print(f"  ⚠️  {doc_file} - 不存在")
 
+# 6. 测试帖子链接解析（带楼层号的链接与帖子链接对应同一帖子）
+print("\n[6/7] 检查帖子链接解析...")
+from modules.forum.linuxdo.discourse_api import parse_topic_id
+
+link_cases = {
+    '/t/123': 123,
+    '/t/123/4': 123,
+    '/t/some-topic/123': 123,
+    '/t/some-topic/123/4': 123,
+    'https://linux.do/t/2024-review/123/4?u=someone': 123,
+}
+for link, expected in link_cases.items():
+    parsed = parse_topic_id(link)
+    if parsed == expected:
+        print(f"  ✅ {link} -> {parsed}")
+    else:
+        print(f"  ❌ {link} -> {parsed}（应为 {expected}）")
+
+# 7. 测试增量抓取：正文过短而不分析的帖子记为已处理，下次运行视为未变化；读取失败的帖子下次仍会读取
+print("\n[7/7] 检查增量抓取记录...")
+import asyncio
+import logging
+import tempfile
+from modules.forum.linuxdo.crawl_state import CrawlState, STATUS_UNCHANGED, STATUS_NEW
+from modules.forum.linuxdo.pipeline import TopicPipeline
+from modules.forum.linuxdo.topic_cache import TopicCache
+
+
+class _FakeAnalyzer:
+    async def summarize_topic(self, topic, content):
+        return {'summary': topic['title']}
+
+
+class _FakeAdapter:
+    logger = logging.getLogger('test_features')
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.ai_analyzer = _FakeAnalyzer()
+
+    def _filter_quality_topics(self, topics):
+        return topics
+
+    async def get_topic_content(self, link):
+        if link.endswith('/3'):
+            raise RuntimeError('页面加载失败')
+        text = '很短的帖子' if link.endswith('/2') else '足够长的正文内容。' * 20
+        return {'first_post': text, 'key_points': []}
+
+
+def _crawl_twice(storage):
+    topics = [
+        {'title': f'帖子 {i}', 'link': f'/t/topic/{i}', 'topic_id': i, 'posts_count': 3, 'quality_score': 10 - i}
+        for i in (1, 2, 3)
+    ]
+    statuses = []
+    for _ in range(2):
+        crawl_state = CrawlState(str(Path(storage) / 'crawl.json'))
+        cache = TopicCache(str(Path(storage) / 'topics.db'))
+        pipeline = TopicPipeline(_FakeAdapter(cache), read_limit=10, ai_limit=10, read_interval=0, crawl_state=crawl_state)
+
+        async def source():
+            return [dict(t) for t in topics]
+
+        outcome = asyncio.run(pipeline.run([('latest', source)]))
+        crawl_state.record(outcome['processed'])
+        crawl_state.save()
+        cache.close()
+        statuses.append({t['topic_id']: t.get('crawl_status') for t in outcome['all_topics']})
+    return statuses[-1]
+
+
+with tempfile.TemporaryDirectory() as storage:
+    second_run = _crawl_twice(storage)
+crawl_cases = [
+    (1, STATUS_UNCHANGED, '已分析的帖子'),
+    (2, STATUS_UNCHANGED, '正文过短的帖子'),
+    (3, STATUS_NEW, '读取失败的帖子'),
+]
+for topic_id, expected, label in crawl_cases:
+    if second_run.get(topic_id) == expected:
+        print(f"  ✅ {label}第二次运行为 {expected}")
+    else:
+        print(f"  ❌ {label}第二次运行为 {second_run.get(topic_id)}（应为 {expected}）")
+
 # 总结
 print("\n" + "=" * 60)
 print("测试完成！")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+本地模拟的 OpenAI 兼容接口
+用于在不消耗额度的情况下测试 AI 分析：多接口路由、对冲请求、调用期限、限流重试和响应缓存。
+
+回复按提示词类型生成（单帖总结、批量总结、分段要点、兴趣推荐），格式与真实模型的回复一致；
+可以模拟基础延迟、长尾延迟、服务端错误和 429 限流。
+
+用法:
+    python3 tools/mock_openai_server.py --port 18080 --latency 0.5 --slow-rate 0.1 --slow-latency 5
+    # config.yaml 中设置 ai.api_base: http://127.0.0.1:18080/v1，api_key 任意
+
+在测试脚本中使用:
+    server = start_server(latency=0.2, error_rate=0.1)
+    api_base = f"http://127.0.0.1:{server.server_port}/v1"
+    ...
+    server.shutdown()
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+
+
+def build_reply(messages: List[Dict[str, str]]) -> str:
+    """
+    按提示词类型生成模拟回复
+
+    Args:
+        messages: 请求中的消息列表
+
+    Returns:
+        回复文本
+    """
+    prompt = messages[-1].get('content', '') if messages else ''
+
+    topic_ids = re.findall(r'^### 帖子 (\S+)', prompt, re.MULTILINE)
+    if topic_ids:
+        return json.dumps([
+            {
+                'id': topic_id,
+                'summary': f'模拟总结 {topic_id}',
+                'key_points': ['要点一', '要点二'],
+                'tags': ['模拟'],
+                'sentiment': 'neutral',
+                'category': '技术讨论',
+            }
+            for topic_id in topic_ids
+        ], ensure_ascii=False)
+
+    if '请提炼这部分内容的要点' in prompt:
+        return '- 模拟要点一\n- 模拟要点二'
+
+    if '"index"' in prompt:
+        count = len(re.findall(r'^\d+\. 【', prompt, re.MULTILINE))
+        return json.dumps([
+            {'index': i + 1, 'relevance_score': 90 - i, 'reason': '模拟推荐理由', 'tags': ['模拟']}
+            for i in range(min(count, 10))
+        ], ensure_ascii=False)
+
+    title = re.search(r'^标题：(.*)$', prompt, re.MULTILINE)
+    return json.dumps({
+        'summary': f"模拟总结：{title.group(1) if title else ''}"[:50],
+        'key_points': ['要点一', '要点二', '要点三'],
+        'tags': ['模拟'],
+        'sentiment': 'neutral',
+        'category': '技术讨论',
+    }, ensure_ascii=False)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """处理 /v1/chat/completions 请求"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已取消请求（对冲请求的落选方）
+            pass
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/stats'):
+            self._send_json(200, self.server.stats)
+        else:
+            self._send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'invalid json'}})
+            return
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+
+        behavior = self.server.behavior
+        stats = self.server.stats
+        with self.server.lock:
+            stats['requests'] += 1
+
+        roll = random.random()
+        if roll < behavior['rate_limit_rate']:
+            with self.server.lock:
+                stats['rate_limited'] += 1
+            self._send_json(429, {'error': {'message': 'rate limited'}}, {'Retry-After': '1'})
+            return
+        if roll < behavior['rate_limit_rate'] + behavior['error_rate']:
+            with self.server.lock:
+                stats['errors'] += 1
+            self._send_json(500, {'error': {'message': 'mock server error'}})
+            return
+
+        delay = behavior['latency'] + random.uniform(0, behavior['jitter'])
+        if random.random() < behavior['slow_rate']:
+            delay = behavior['slow_latency']
+            with self.server.lock:
+                stats['slow'] += 1
+        time.sleep(delay)
+
+        content = build_reply(request.get('messages', []))
+        prompt_tokens = sum(len(m.get('content', '')) for m in request.get('messages', [])) // 2
+        completion_tokens = len(content) // 2
+        self._send_json(200, {
+            'id': f"chatcmpl-mock-{stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': behavior['model'] or request.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+        with self.server.lock:
+            stats['completed'] += 1
+
+
+def start_server(
+    host: str = '127.0.0.1',
+    port: int = 0,
+    latency: float = 0.2,
+    jitter: float = 0.1,
+    slow_rate: float = 0.0,
+    slow_latency: float = 5.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    model: str = ''
+) -> ThreadingHTTPServer:
+    """
+    在后台线程中启动模拟接口
+
+    Args:
+        host: 监听地址
+        port: 监听端口（0 为随机端口，启动后从 server.server_port 读取）
+        latency: 基础延迟（秒）
+        jitter: 附加的随机延迟上限（秒）
+        slow_rate: 长尾请求比例
+        slow_latency: 长尾请求的延迟（秒）
+        error_rate: 返回 HTTP 500 的比例
+        rate_limit_rate: 返回 HTTP 429（Retry-After: 1）的比例
+        model: 回复中的模型名称（默认与请求相同）
+
+    Returns:
+        服务器对象（server.stats 为请求统计，server.shutdown() 停止）
+    """
+    server = ThreadingHTTPServer((host, port), MockOpenAIHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.behavior = {
+        'latency': latency,
+        'jitter': jitter,
+        'slow_rate': slow_rate,
+        'slow_latency': slow_latency,
+        'error_rate': error_rate,
+        'rate_limit_rate': rate_limit_rate,
+        'model': model,
+    }
+    server.stats = {'requests': 0, 'completed': 0, 'slow': 0, 'errors': 0, 'rate_limited': 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟的 OpenAI 兼容接口')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=18080, help='监听端口')
+    parser.add_argument('--latency', type=float, default=0.2, help='基础延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.1, help='附加的随机延迟上限（秒）')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='长尾请求比例')
+    parser.add_argument('--slow-latency', type=float, default=5.0, help='长尾请求的延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 HTTP 500 的比例')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='返回 HTTP 429 的比例')
+    parser.add_argument('--model', default='', help='回复中的模型名称（默认与请求相同）')
+    args = parser.parse_args()
+
+    server = start_server(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        model=args.model
+    )
+    print(f"模拟接口已启动: http://{args.host}:{server.server_port}/v1（统计: /v1/stats），按 Ctrl+C 停止")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n请求统计: {json.dumps(server.stats, ensure_ascii=False)}")
+        server.shutdown()
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())